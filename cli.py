@@ -0,0 +1,458 @@
+"""
+Sistema de Detecção de Pessoas usando YOLO
+Ponto de entrada não interativo (lotes, cron, systemd e contêineres)
+
+Exemplos:
+    python cli.py video --input ./data/input/videos --workers 4 --skip 3
+    python cli.py image --input ./fotos --batch-size 16 --no-output
+    python cli.py live --url rtmp://localhost:1935/live --backend openvino
+
+O progresso é impresso na saída de erro; a saída padrão recebe apenas o resumo
+final em JSON (uma linha), para ser lido por scripts.
+"""
+import argparse
+import contextlib
+import json
+import os
+import signal
+import sys
+import time
+
+# Início da aplicação, antes dos imports do projeto (tempo até o primeiro frame)
+START_TIME = time.perf_counter()
+
+# Adicionar src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.utils.config_loader import load_config, validate_config
+from src.core.backends import BACKENDS
+from src.utils.video_writer import WRITER_BACKENDS
+
+
+# Códigos de saída
+EXIT_OK = 0
+EXIT_FAILED = 1          # Alguma entrada falhou
+EXIT_CONFIG = 2          # Argumentos ou configuração inválidos
+EXIT_NO_INPUT = 3        # Nenhuma entrada encontrada ou fonte indisponível
+EXIT_REGRESSION = 4      # Benchmark com regressão em relação à baseline
+EXIT_INTERRUPTED = 130   # Interrompido (Ctrl+C ou SIGTERM)
+
+
+def positive_int(value):
+    """Converte um argumento em inteiro positivo (tipo do argparse)"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"inteiro inválido: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"deve ser maior que zero: {value}")
+    return number
+
+
+def build_parser():
+    """
+    Monta o parser de argumentos
+    
+    Returns:
+        argparse.ArgumentParser: Parser com os subcomandos video, image, live e benchmark
+    """
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Detecção de pessoas sem interação (o resumo em JSON vai para a saída padrão)"
+    )
+    parser.add_argument("--config", default="./configs/config.json", help="arquivo de configuração")
+    
+    # Ajustes de desempenho comuns a todos os subcomandos
+    overrides = argparse.ArgumentParser(add_help=False)
+    group = overrides.add_argument_group("ajustes da configuração")
+    group.add_argument("--workers", type=positive_int, help="processos paralelos (processing.workers)")
+    group.add_argument("--batch-size", type=positive_int,
+                       help="tamanho do lote de inferência (processing e image_processing)")
+    group.add_argument("--backend", choices=list(BACKENDS), help="backend de inferência (model.backend)")
+    group.add_argument("--imgsz", type=positive_int, help="resolução de entrada do modelo (model.imgsz)")
+    group.add_argument("--skip", type=positive_int, metavar="N",
+                       help="detector a cada N frames, rastreador nos demais (processing.detect_interval)")
+    group.add_argument("--writer", choices=WRITER_BACKENDS,
+                       help="codificação do vídeo de saída (video_writer.backend)")
+    group.add_argument("--no-output", action="store_true",
+                       help="não gera vídeos nem imagens anotados, apenas as estatísticas")
+    
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    video_parser = subparsers.add_parser("video", parents=[overrides], help="processa vídeos")
+    video_parser.add_argument("--input", help="vídeo ou pasta de vídeos (padrão: video_input_directory)")
+    video_parser.add_argument("--output", help="pasta de saída (padrão: video_output_directory)")
+    
+    image_parser = subparsers.add_parser("image", parents=[overrides], help="processa imagens")
+    image_parser.add_argument("--input", help="imagem ou pasta de imagens (padrão: image_input_directory)")
+    image_parser.add_argument("--output", help="pasta de saída (padrão: image_output_directory)")
+    
+    live_parser = subparsers.add_parser("live", parents=[overrides], help="processa uma transmissão ao vivo")
+    live_parser.add_argument("--url", help="URL ou caminho da fonte (padrão: livestream.url)")
+    live_parser.add_argument("--publish", metavar="DESTINO",
+                             help="republica a transmissão anotada (rtmp:// ou pasta/playlist HLS)")
+    live_parser.add_argument("--output", help="pasta de saída (padrão: video_output_directory)")
+    
+    cameras_parser = subparsers.add_parser("cameras", parents=[overrides],
+                                           help="processa várias câmeras com inferência em lote compartilhada")
+    cameras_parser.add_argument("--source", action="append", metavar="URL",
+                                help="fonte de uma câmera; repetir para cada câmera (padrão: multi_camera.sources)")
+    cameras_parser.add_argument("--fps", type=float, help="FPS alvo de inferência por câmera (multi_camera.fps)")
+    cameras_parser.add_argument("--duration", type=float, help="tempo máximo em segundos (padrão: até as fontes terminarem)")
+    cameras_parser.add_argument("--output", help="pasta de saída (padrão: video_output_directory)")
+    
+    subparsers.add_parser("benchmark", parents=[overrides], help="executa o benchmark de desempenho")
+    
+    return parser
+
+
+def apply_overrides(config, args):
+    """
+    Aplica os argumentos da linha de comando sobre a configuração
+    
+    Args:
+        config (dict): Configurações do projeto (alteradas no lugar)
+        args (argparse.Namespace): Argumentos lidos
+    """
+    processing = config.setdefault("processing", {})
+    image_processing = config.setdefault("image_processing", {})
+    
+    if args.workers is not None:
+        processing["workers"] = args.workers
+    if args.batch_size is not None:
+        processing["batch_size"] = args.batch_size
+        image_processing["batch_size"] = args.batch_size
+        config.setdefault("multi_camera", {})["batch_size"] = args.batch_size
+    if args.backend is not None:
+        config["model"]["backend"] = args.backend
+    if args.imgsz is not None:
+        config["model"]["imgsz"] = args.imgsz
+    if args.skip is not None:
+        processing["detect_interval"] = args.skip
+    if args.writer is not None:
+        config.setdefault("video_writer", {})["backend"] = args.writer
+    if args.no_output:
+        processing["write_video"] = False
+        image_processing["write_images"] = False
+    
+    fps = getattr(args, "fps", None)
+    if fps is not None:
+        config.setdefault("multi_camera", {})["fps"] = fps
+    
+    publish = getattr(args, "publish", None)
+    if publish:
+        publish_config = config.setdefault("livestream", {}).setdefault("publish", {})
+        publish_config.update(enabled=True, url=publish)
+    
+    output = getattr(args, "output", None)
+    if output:
+        key = "image_output_directory" if args.command == "image" else "video_output_directory"
+        config[key] = output
+    
+    # Arquivo avulso: a pasta dele vira a entrada (nomes de saída relativos a ela)
+    source = getattr(args, "input", None)
+    if source:
+        key = "image_input_directory" if args.command == "image" else "video_input_directory"
+        config[key] = source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))
+
+
+def run_video(config, args):
+    """
+    Processa um vídeo ou a pasta de vídeos
+    
+    Returns:
+        dict: Resultados ("processed", "failed", "skipped") e total de frames
+    """
+    from src.processors.video_processor import VideoProcessor
+    
+    processor = VideoProcessor(config)
+    if args.input and os.path.isfile(args.input):
+        result = processor.process_single(args.input)
+        summary = {
+            "processed": [result] if result else [],
+            "failed": [] if result else [os.path.basename(args.input)],
+            "skipped": []
+        }
+    else:
+        summary = processor.process_all()
+    
+    first_frames = [r["first_frame_at"] for r in summary["processed"] if r.get("first_frame_at") is not None]
+    return {
+        "processed": len(summary["processed"]),
+        "failed": len(summary["failed"]),
+        "skipped": len(summary["skipped"]),
+        "failed_inputs": summary["failed"],
+        "frames": sum(r["stats"].frame_count for r in summary["processed"]),
+        "first_frame_at": min(first_frames) if first_frames else None
+    }
+
+
+def run_image(config, args):
+    """
+    Processa uma imagem ou a pasta de imagens
+    
+    Returns:
+        dict: Resultados ("processed", "failed") e total de frames (imagens)
+    """
+    from src.processors.image_processor import ImageProcessor
+    
+    processor = ImageProcessor(config)
+    if args.input and os.path.isfile(args.input):
+        result = processor.process_single(args.input)
+        summary = {
+            "processed_count": 1 if result else 0,
+            "failed": [] if result else [os.path.basename(args.input)],
+            "first_result_at": time.perf_counter() if result else None
+        }
+    else:
+        summary = processor.process_all()
+    
+    return {
+        "processed": summary["processed_count"],
+        "failed": len(summary["failed"]),
+        "skipped": 0,
+        "failed_inputs": summary["failed"],
+        "frames": summary["processed_count"],
+        "first_frame_at": summary["first_result_at"]
+    }
+
+
+def run_live(config, args):
+    """
+    Processa uma transmissão até o fim da fonte, Ctrl+C ou SIGTERM
+    
+    Returns:
+        dict: Frames processados, descartados e latência (ou None se a fonte não abrir)
+    """
+    from src.processors.video_processor import VideoProcessor
+    
+    processor = VideoProcessor(config)
+    result = processor.process_livestream(args.url)
+    if result is None:
+        return None
+    
+    return {
+        "processed": 1,
+        "failed": 0,
+        "skipped": 0,
+        "failed_inputs": [],
+        "frames": result["stats"].frame_count,
+        "first_frame_at": result["first_frame_at"],
+        "frames_dropped": result["frames_dropped"],
+        "average_latency_ms": result["average_latency"] * 1000,
+        "max_latency_ms": result["max_latency"] * 1000,
+        "publish": result["publish"]
+    }
+
+
+def run_cameras(config, args):
+    """
+    Processa as câmeras até todas terminarem, o tempo acabar, Ctrl+C ou SIGTERM
+    
+    Returns:
+        dict: Frames e lotes processados e resumo por câmera (ou None sem câmeras)
+    """
+    from src.processors.multi_camera import MultiCameraProcessor
+    
+    processor = MultiCameraProcessor(config)
+    result = processor.run(args.source, args.duration)
+    if result is None:
+        return None
+    
+    streams = result["streams"]
+    first_frames = [camera["first_frame_at"] for camera in streams if camera["first_frame_at"] is not None]
+    return {
+        "processed": sum(1 for camera in streams if camera["frames_processed"]),
+        "failed": sum(1 for camera in streams if not camera["frames_processed"]),
+        "skipped": 0,
+        "failed_inputs": [camera["name"] for camera in streams if not camera["frames_processed"]],
+        "frames": sum(camera["frames_processed"] for camera in streams),
+        "first_frame_at": min(first_frames, default=None),
+        "batches": result["batches"],
+        "cameras": [
+            {
+                "name": camera["name"],
+                "frames_captured": camera["frames_captured"],
+                "frames_processed": camera["frames_processed"],
+                "frames_overwritten": camera["frames_overwritten"],
+                "fps": round(camera["fps"], 2),
+                "average_latency_ms": camera["average_latency"] * 1000,
+                "max_latency_ms": camera["max_latency"] * 1000
+            }
+            for camera in streams
+        ]
+    }
+
+
+def run_benchmark(config, args):
+    """
+    Executa o benchmark e compara com a baseline
+    
+    Returns:
+        dict: Casos executados, falhas e regressões
+    """
+    from src.processors.benchmark import Benchmark
+    
+    report = Benchmark(config).run()
+    cases = report["results"]["cases"]
+    failed_cases = [case["name"] for case in cases if "error" in case]
+    return {
+        "processed": len(cases) - len(failed_cases),
+        "failed": len(failed_cases),
+        "skipped": 0,
+        "failed_inputs": failed_cases,
+        "frames": 0,
+        "first_frame_at": None,
+        "results_path": report["results_path"],
+        "regressions": report["regressions"],
+        "passed": report["passed"]
+    }
+
+
+COMMANDS = {
+    "video": run_video,
+    "image": run_image,
+    "live": run_live,
+    "cameras": run_cameras,
+    "benchmark": run_benchmark
+}
+
+
+def exit_code(command, outcome):
+    """
+    Define o código de saída a partir do resultado de um comando
+    
+    Args:
+        command (str): Subcomando executado
+        outcome (dict): Resultado do comando (None se a fonte não abriu)
+    
+    Returns:
+        int: Código de saída
+    """
+    if outcome is None:
+        return EXIT_NO_INPUT
+    if outcome["failed"]:
+        return EXIT_FAILED
+    if command == "benchmark" and not outcome["passed"]:
+        return EXIT_REGRESSION
+    if not outcome["processed"] and not outcome["skipped"]:
+        return EXIT_NO_INPUT
+    return EXIT_OK
+
+
+@contextlib.contextmanager
+def stdout_to_stderr():
+    """
+    Envia a saída padrão para a saída de erro durante o bloco
+    
+    O descritor 1 é redirecionado (e não apenas sys.stdout), então processos
+    worker iniciados no bloco também escrevem na saída de erro. Ao sair, a
+    saída padrão original é restaurada para o resumo em JSON.
+    """
+    sys.stdout.flush()
+    saved_stdout = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+    finally:
+        sys.stderr.flush()
+        os.dup2(saved_stdout, 1)
+        os.close(saved_stdout)
+
+
+def handle_sigterm(signum, frame):
+    """Trata SIGTERM como Ctrl+C (a transmissão é finalizada e as estatísticas salvas)"""
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    """
+    Função principal da linha de comando
+    
+    Args:
+        argv (list): Argumentos (padrão: sys.argv[1:])
+    
+    Returns:
+        int: Código de saída
+    """
+    args = build_parser().parse_args(argv)
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    
+    summary = {"command": args.command, "status": "ok"}
+    code = EXIT_OK
+    
+    source = getattr(args, "input", None)
+    if source and not os.path.exists(source):
+        print(f"✗ Entrada não encontrada: {source}", file=sys.stderr)
+        summary.update({"status": "no_input", "exit_code": EXIT_NO_INPUT, "error": f"Entrada não encontrada: {source}"})
+        print(json.dumps(summary, ensure_ascii=False), flush=True)
+        return EXIT_NO_INPUT
+    
+    try:
+        # Mensagens de progresso (inclusive dos workers) vão para a saída de erro
+        with stdout_to_stderr():
+            config = load_config(args.config)
+            apply_overrides(config, args)
+            validate_config(config)
+            
+            started_at = time.perf_counter()
+            outcome = COMMANDS[args.command](config, args)
+            finished_at = time.perf_counter()
+        
+        code = exit_code(args.command, outcome)
+        if outcome is not None:
+            from src.core.registry import loaded_detectors
+            
+            elapsed = finished_at - started_at
+            first_frame_at = outcome.pop("first_frame_at")
+            load_times = [detector.load_time for detector in loaded_detectors()]
+            summary.update(outcome)
+            summary.update({
+                "elapsed_s": round(finished_at - START_TIME, 3),
+                "processing_s": round(elapsed, 3),
+                "fps": round(outcome["frames"] / elapsed, 2) if elapsed > 0 else 0.0,
+                "startup_s": round(started_at - START_TIME, 3),
+                "model_load_s": round(sum(load_times), 3) if load_times else None,
+                "time_to_first_frame_s": (
+                    round(first_frame_at - START_TIME, 3) if first_frame_at is not None else None
+                )
+            })
+    
+    except FileNotFoundError as e:
+        print(f"✗ Erro: {e}", file=sys.stderr)
+        summary["error"] = str(e)
+        code = EXIT_CONFIG
+    
+    except ValueError as e:
+        print(f"✗ Erro de configuração: {e}", file=sys.stderr)
+        summary["error"] = str(e)
+        code = EXIT_CONFIG
+    
+    except KeyboardInterrupt:
+        print("\nProcessamento interrompido.", file=sys.stderr)
+        code = EXIT_INTERRUPTED
+    
+    except Exception as e:
+        print(f"✗ Erro inesperado: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc()
+        summary["error"] = str(e)
+        code = EXIT_FAILED
+    
+    summary["status"] = {
+        EXIT_OK: "ok",
+        EXIT_FAILED: "failed",
+        EXIT_CONFIG: "config_error",
+        EXIT_NO_INPUT: "no_input",
+        EXIT_REGRESSION: "regression",
+        EXIT_INTERRUPTED: "interrupted"
+    }[code]
+    summary["exit_code"] = code
+    print(json.dumps(summary, ensure_ascii=False), flush=True)
+    
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,10 @@ Ponto de entrada principal da aplicação
 """
 import sys
 import os
+import time
+
+# Início da aplicação, antes dos imports do projeto (tempo até o menu)
+START_TIME = time.perf_counter()
 
 # Adicionar src ao path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
@@ -11,6 +15,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from src.utils.config_loader import load_config, validate_config
 from src.processors.video_processor import VideoProcessor
 from src.processors.image_processor import ImageProcessor
+from src.processors.quantization_report import QuantizationReport
+from src.processors.benchmark import Benchmark
+from src.processors.multi_camera import MultiCameraProcessor
 
 
 def print_header():
@@ -25,22 +32,24 @@ def display_menu():
     """Exibe opções de menu para o usuário e retorna a escolha"""
     print("Atualmente, apenas o processamento de pessoas está configurado, para processar outras coisas, modifique no config.json.")
     print("\nOpções de Menu:")
-    print("1. Iniciar processamento de Livestream | Não implementado")
+    print("1. Iniciar processamento de Livestream | Implementado")
     print("2. Iniciar processamento de vídeos | Implementado")
     print("3. Iniciar processamento de imagens | Não implementado")
-    print("4. Sair")
+    print("4. Gerar relatório de quantização INT8 | Implementado")
+    print("5. Executar benchmark de desempenho | Implementado")
+    print("6. Processar múltiplas câmeras | Implementado")
+    print("7. Sair")
     
     while True:
-        choice = input("\nEscolha uma opção (1-4): ").strip()
-        if choice in ('1', '2', '3', '4'):
+        choice = input("\nEscolha uma opção (1-7): ").strip()
+        if choice in ('1', '2', '3', '4', '5', '6', '7'):
             return choice
-        print("Opção inválida. Por favor, escolha uma opção válida (1-4).")
+        print("Opção inválida. Por favor, escolha uma opção válida (1-7).")
 
 
 def process_livestream(processor):
     """Processamento de livestream"""
     print("\nIniciando processamento de Livestream...")
-    # Implementar lógica específica para livestream
     processor.process_livestream()
 
 
@@ -57,6 +66,24 @@ def process_images(processor):
     processor.process_all()
 
 
+def generate_quantization_report(config):
+    """Comparação entre os modelos INT8 e FP32"""
+    print("\nGerando relatório de quantização INT8...")
+    QuantizationReport(config).run()
+
+
+def run_benchmark(config):
+    """Benchmark com dados sintéticos comparado à baseline"""
+    print("\nExecutando benchmark de desempenho...")
+    return Benchmark(config).run()
+
+
+def process_cameras(config):
+    """Várias câmeras com inferência em lote compartilhada"""
+    print("\nIniciando processamento de múltiplas câmeras...")
+    return MultiCameraProcessor(config).run()
+
+
 def main():
     """Função principal da aplicação"""
     print_header()
@@ -68,22 +95,28 @@ def main():
         validate_config(config)
         print("✓ Configurações carregadas com sucesso\n")
         
-        # Criar processador de vídeos
+        # Criar processadores (o modelo, compartilhado, só é carregado na primeira detecção)
         video_processor = VideoProcessor(config)
         image_processor = ImageProcessor(config)
+        print(f"✓ Pronto em {time.perf_counter() - START_TIME:.2f}s\n")
         
         # Loop principal do menu
         while True:
             choice = display_menu()
             
             if choice == '1':
-                # process_livestream(processor)
-                print("\nProcessamento de Livestream não implementado.")
+                process_livestream(video_processor)
             elif choice == '2':
                 process_videos(video_processor)
             elif choice == '3':
                 process_images(image_processor)
-            else:  # Opção 4 (Sair)
+            elif choice == '4':
+                generate_quantization_report(config)
+            elif choice == '5':
+                run_benchmark(config)
+            elif choice == '6':
+                process_cameras(config)
+            else:  # Opção 7 (Sair)
                 print("\nSaindo da aplicação...")
                 break
                 
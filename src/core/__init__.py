@@ -2,5 +2,27 @@
 Módulos centrais de detecção
 """
 from .detector import PeopleDetector
+from .registry import get_detector
+from .detections import Detections, box_iou, match_boxes, non_max_suppression
+from .tracker import BoxTracker, KeyframeScheduler
+from .motion import MotionGate
+from .zones import ZoneSet
+from .tiling import TileScheduler
+from .detection_cache import DetectionCache, DetectionSequence, create_detection_cache
 
-__all__ = ["PeopleDetector"]
+__all__ = [
+    "PeopleDetector",
+    "get_detector",
+    "Detections",
+    "box_iou",
+    "match_boxes",
+    "non_max_suppression",
+    "BoxTracker",
+    "KeyframeScheduler",
+    "MotionGate",
+    "ZoneSet",
+    "TileScheduler",
+    "DetectionCache",
+    "DetectionSequence",
+    "create_detection_cache"
+]
@@ -0,0 +1,205 @@
+"""
+Módulo para carregar o modelo YOLO no backend de inferência configurado
+"""
+import hashlib
+import importlib
+import os
+import shutil
+import yaml
+from .detection_cache import sha256_file
+
+# ultralytics (e torch) são importados só ao carregar o modelo: o menu e os
+# modos que não executam o detector não pagam esse custo
+
+
+# Backend -> (formato de exportação do ultralytics, pacote necessário, sufixo do artefato)
+BACKENDS = {
+    "torch": (None, None, None),
+    "onnxruntime": ("onnx", "onnxruntime", ".onnx"),
+    "openvino": ("openvino", "openvino", "_openvino_model"),
+}
+
+
+# Precisões suportadas pelos modelos exportados
+PRECISIONS = ("fp32", "int8")
+
+
+def load_model(weights, backend="torch", imgsz=640, batch_size=1, export_directory="./data/cache/models",
+               precision="fp32", calibration_directory=None):
+    """
+    Carrega o modelo YOLO no backend informado
+    
+    Para backends diferentes de "torch", o modelo é exportado uma única vez e
+    guardado em export_directory, com nome derivado do hash dos pesos, do
+    tamanho de entrada e do tamanho do lote. Execuções seguintes carregam o
+    artefato exportado diretamente.
+    
+    Na precisão "int8", a exportação aplica quantização pós-treinamento,
+    calibrada com as imagens de calibration_directory.
+    
+    Args:
+        weights (str): Caminho (ou nome) dos pesos .pt
+        backend (str): "torch", "onnxruntime" ou "openvino"
+        imgsz (int): Tamanho de entrada do modelo exportado
+        batch_size (int): Tamanho do lote do modelo exportado
+        export_directory (str): Pasta dos modelos exportados
+        precision (str): "fp32" ou "int8"
+        calibration_directory (str): Pasta de imagens para calibração INT8
+    
+    Returns:
+        YOLO: Modelo pronto para inferência
+    
+    Raises:
+        ValueError: Se o backend ou a precisão não forem suportados
+        ImportError: Se o pacote do backend não estiver instalado
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de inferência não suportado: {backend} (opções: {', '.join(BACKENDS)})")
+    
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precisão não suportada: {precision} (opções: {', '.join(PRECISIONS)})")
+    
+    from ultralytics import YOLO
+    
+    export_format, package, _ = BACKENDS[backend]
+    if export_format is None:
+        if precision != "fp32":
+            raise ValueError("A precisão int8 requer o backend onnxruntime ou openvino")
+        return YOLO(weights)
+    
+    if precision == "int8" and not (calibration_directory and os.path.isdir(calibration_directory)):
+        raise ValueError(f"Pasta de calibração INT8 não encontrada: {calibration_directory}")
+    
+    try:
+        importlib.import_module(package)
+    except ImportError as e:
+        raise ImportError(f"O backend '{backend}' requer o pacote '{package}' (pip install {package})") from e
+    
+    export_path = get_export_path(
+        weights, backend, imgsz, batch_size, export_directory, precision, calibration_directory
+    )
+    if not os.path.exists(export_path):
+        export_model(weights, export_format, imgsz, batch_size, export_path, precision, calibration_directory)
+    
+    return YOLO(export_path, task="detect")
+
+
+def get_export_path(weights, backend, imgsz, batch_size, export_directory, precision="fp32",
+                    calibration_directory=None):
+    """
+    Retorna o caminho do modelo exportado em cache
+    
+    Args:
+        weights (str): Caminho dos pesos .pt
+        backend (str): Backend de inferência
+        imgsz (int): Tamanho de entrada
+        batch_size (int): Tamanho do lote
+        export_directory (str): Pasta dos modelos exportados
+        precision (str): "fp32" ou "int8"
+        calibration_directory (str): Pasta de imagens para calibração INT8
+    
+    Returns:
+        str: Caminho do arquivo (ou pasta) exportado
+    """
+    _, _, suffix = BACKENDS[backend]
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    
+    # Pesos inexistentes localmente são baixados pelo ultralytics na primeira carga
+    if not os.path.isfile(weights):
+        from ultralytics import YOLO
+        YOLO(weights)
+    weights_hash = sha256_file(weights)[:16]
+    
+    # Modelos INT8 dependem também das imagens usadas na calibração
+    variant = ""
+    if precision == "int8":
+        variant = f"_int8_{_directory_fingerprint(calibration_directory)[:8]}"
+    
+    return os.path.join(export_directory, f"{stem}_{weights_hash}_{imgsz}_b{batch_size}{variant}{suffix}")
+
+
+def _directory_fingerprint(directory):
+    """
+    Calcula uma identificação do conteúdo de uma pasta (nomes, tamanhos e datas)
+    
+    Args:
+        directory (str): Pasta a identificar
+    
+    Returns:
+        str: Hash hexadecimal
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            file_stat = os.stat(os.path.join(root, name))
+            relative_path = os.path.relpath(os.path.join(root, name), directory)
+            digest.update(f"{relative_path}|{file_stat.st_size}|{file_stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def export_model(weights, export_format, imgsz, batch_size, export_path, precision="fp32",
+                 calibration_directory=None):
+    """
+    Exporta os pesos para o formato do backend e move o artefato para o cache
+    
+    Args:
+        weights (str): Caminho dos pesos .pt
+        export_format (str): Formato de exportação do ultralytics
+        imgsz (int): Tamanho de entrada
+        batch_size (int): Tamanho do lote
+        export_path (str): Caminho final do artefato exportado
+        precision (str): "fp32" ou "int8"
+        calibration_directory (str): Pasta de imagens para calibração INT8
+    """
+    print(f"Exportando {os.path.basename(weights)} para {export_format} {precision.upper()} "
+          f"(imgsz={imgsz}, lote={batch_size}), apenas na primeira execução...")
+    
+    from ultralytics import YOLO
+    model = YOLO(weights)
+    os.makedirs(os.path.dirname(export_path) or ".", exist_ok=True)
+    
+    if precision == "int8":
+        dataset_path = _write_calibration_dataset(model, calibration_directory, f"{export_path}.data.yaml")
+        try:
+            exported = model.export(
+                format=export_format, imgsz=imgsz, batch=batch_size, int8=True, data=dataset_path
+            )
+        finally:
+            os.remove(dataset_path)
+    else:
+        exported = model.export(format=export_format, imgsz=imgsz, batch=batch_size)
+    
+    temp_path = f"{export_path}.tmp"
+    shutil.move(str(exported), temp_path)
+    
+    # Artefato só aparece no caminho final quando completo
+    os.replace(temp_path, export_path)
+
+
+def _write_calibration_dataset(model, calibration_directory, dataset_path):
+    """
+    Escreve o arquivo de dataset que aponta a calibração INT8 para uma pasta de imagens
+    
+    As imagens não precisam de rótulos: a calibração usa apenas as ativações.
+    
+    Args:
+        model (YOLO): Modelo a quantizar (fornece os nomes das classes)
+        calibration_directory (str): Pasta de imagens
+        dataset_path (str): Caminho do arquivo YAML a criar
+    
+    Returns:
+        str: Caminho do arquivo criado
+    """
+    image_directory = os.path.abspath(calibration_directory)
+    dataset = {
+        "path": image_directory,
+        "train": image_directory,
+        "val": image_directory,
+        "names": dict(model.names)
+    }
+    
+    with open(dataset_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(dataset, f)
+    
+    return dataset_path
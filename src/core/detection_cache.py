@@ -0,0 +1,375 @@
+"""
+Módulo de cache persistente de detecções
+"""
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from .detections import Detections
+
+
+# Tamanho mínimo para memorizar o hash de um arquivo no índice
+HASH_INDEX_MIN_SIZE = 64 * 1024 * 1024
+
+
+def sha256_file(file_path):
+    """
+    Calcula o hash SHA-256 do conteúdo de um arquivo, lendo em blocos
+    
+    Args:
+        file_path (str): Caminho do arquivo
+    
+    Returns:
+        str: Hash hexadecimal do conteúdo
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DetectionSequence:
+    """Sequência compacta de detecções por frame em buffers NumPy contíguos"""
+    
+    def __init__(self, capacity=1024):
+        """
+        Inicializa a sequência vazia
+        
+        Args:
+            capacity (int): Capacidade inicial de caixas (cresce conforme necessário)
+        """
+        capacity = max(1, int(capacity))
+        self.offsets = [0]
+        self.xyxy = np.zeros((capacity, 4), dtype=np.float32)
+        self.conf = np.zeros(capacity, dtype=np.float32)
+        self.cls = np.zeros(capacity, dtype=np.int16)
+    
+    @classmethod
+    def from_arrays(cls, offsets, xyxy, conf, cls_ids):
+        """
+        Reconstrói a sequência a partir dos arrays salvos
+        
+        Args:
+            offsets: Índice da primeira caixa de cada frame (N + 1 valores)
+            xyxy: Caixas de todos os frames (M, 4)
+            conf: Confianças (M,)
+            cls_ids: Classes (M,)
+        
+        Returns:
+            DetectionSequence: Sequência carregada
+        """
+        sequence = cls(capacity=1)
+        sequence.offsets = [int(offset) for offset in offsets]
+        sequence.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        sequence.conf = np.asarray(conf, dtype=np.float32)
+        sequence.cls = np.asarray(cls_ids, dtype=np.int16)
+        return sequence
+    
+    def append(self, detections):
+        """
+        Acrescenta as detecções de um frame
+        
+        Args:
+            detections (Detections): Detecções do frame
+        """
+        start = self.offsets[-1]
+        end = start + len(detections)
+        
+        if end > len(self.xyxy):
+            # Dobrar capacidade (custo amortizado constante por caixa)
+            capacity = max(end, len(self.xyxy) * 2)
+            self.xyxy = np.resize(self.xyxy, (capacity, 4))
+            self.conf = np.resize(self.conf, capacity)
+            self.cls = np.resize(self.cls, capacity)
+        
+        self.xyxy[start:end] = detections.xyxy
+        self.conf[start:end] = detections.conf
+        self.cls[start:end] = detections.cls
+        self.offsets.append(end)
+    
+    def __len__(self):
+        """Retorna o número de frames"""
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, index):
+        """Retorna as detecções de um frame"""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return Detections(self.xyxy[start:end], self.conf[start:end], self.cls[start:end])
+    
+    def to_arrays(self):
+        """
+        Retorna os arrays compactos da sequência
+        
+        Returns:
+            dict: Arrays "offsets", "xyxy", "conf" e "cls"
+        """
+        used = self.offsets[-1]
+        return {
+            "offsets": np.asarray(self.offsets, dtype=np.int64),
+            "xyxy": self.xyxy[:used],
+            "conf": self.conf[:used],
+            "cls": self.cls[:used]
+        }
+
+
+class DetectionCache:
+    """Cache em disco de detecções por arquivo de entrada, com remoção LRU por tamanho"""
+    
+    def __init__(self, cache_directory, max_size_mb=2048):
+        """
+        Inicializa o cache
+        
+        Args:
+            cache_directory (str): Pasta onde os arquivos de cache são salvos
+            max_size_mb (float): Tamanho máximo do cache em MB
+        """
+        self.cache_directory = cache_directory
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self._hash_index_path = os.path.join(cache_directory, "file_hashes.json")
+        self._lock = threading.Lock()
+        self._total_size = None
+        # Hash dos pesos por (caminho, tamanho, modificação), calculado uma vez por processo
+        self._weights_hashes = {}
+        
+        os.makedirs(cache_directory, exist_ok=True)
+        
+        try:
+            with open(self._hash_index_path, "r", encoding="utf-8") as f:
+                self._hash_index = json.load(f)
+        except (OSError, ValueError):
+            self._hash_index = {}
+    
+    def file_hash(self, file_path):
+        """
+        Calcula o hash SHA-256 do conteúdo de um arquivo
+        
+        Para arquivos grandes (vídeos), o resultado é memorizado por caminho,
+        tamanho e data de modificação, para não relê-los a cada execução.
+        
+        Args:
+            file_path (str): Caminho do arquivo
+        
+        Returns:
+            str: Hash hexadecimal do conteúdo
+        """
+        file_stat = os.stat(file_path)
+        index_key = f"{os.path.abspath(file_path)}|{file_stat.st_size}|{file_stat.st_mtime_ns}"
+        
+        with self._lock:
+            if index_key in self._hash_index:
+                return self._hash_index[index_key]
+        
+        content_hash = sha256_file(file_path)
+        
+        # Arquivos pequenos (imagens) são rápidos de reler e não entram no índice
+        if file_stat.st_size >= HASH_INDEX_MIN_SIZE:
+            with self._lock:
+                self._hash_index[index_key] = content_hash
+                self._save_hash_index()
+        
+        return content_hash
+    
+    def _save_hash_index(self):
+        """Salva o índice de hashes de arquivos"""
+        temp_path = self._hash_index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._hash_index, f)
+        os.replace(temp_path, self._hash_index_path)
+    
+    def make_key(self, file_path, parameters):
+        """
+        Gera a chave de cache de um arquivo de entrada
+        
+        Args:
+            file_path (str): Caminho do arquivo de entrada
+            parameters (dict): Parâmetros que afetam as detecções (pesos, conf,
+                iou, classes, dimensões...)
+        
+        Returns:
+            str: Chave no formato "<hash do conteúdo>_<hash dos parâmetros>"
+        """
+        content_hash = self.file_hash(file_path)
+        parameters_json = json.dumps(parameters, sort_keys=True, default=str)
+        parameters_hash = hashlib.sha256(parameters_json.encode("utf-8")).hexdigest()
+        return f"{content_hash[:32]}_{parameters_hash[:16]}"
+    
+    def detector_parameters(self, signature):
+        """
+        Retorna os parâmetros do detector para compor a chave de cache
+        
+        Os pesos entram pelo hash do conteúdo quando o arquivo existe localmente;
+        o hash é memorizado enquanto o arquivo não muda (chamado a cada entrada).
+        
+        Args:
+            signature (dict): Assinatura do modelo (detector_signature), obtida do
+                config sem carregar o modelo
+            
+        Returns:
+            dict: Parâmetros do detector
+        """
+        parameters = dict(signature)
+        weights_path = str(parameters["weights"])
+        if os.path.isfile(weights_path):
+            file_stat = os.stat(weights_path)
+            weights_key = (os.path.abspath(weights_path), file_stat.st_size, file_stat.st_mtime_ns)
+            weights_hash = self._weights_hashes.get(weights_key)
+            if weights_hash is None:
+                weights_hash = self.file_hash(weights_path)
+                self._weights_hashes[weights_key] = weights_hash
+            parameters["weights"] = weights_hash
+        return parameters
+    
+    def _entry_path(self, key):
+        """Retorna o caminho do arquivo de uma entrada"""
+        return os.path.join(self.cache_directory, f"{key}.npz")
+    
+    def load(self, key):
+        """
+        Carrega as detecções de uma entrada
+        
+        Args:
+            key (str): Chave gerada por make_key
+        
+        Returns:
+            DetectionSequence: Detecções por frame ou None se não houver entrada
+        """
+        entry_path = self._entry_path(key)
+        if not os.path.exists(entry_path):
+            return None
+        
+        try:
+            with np.load(entry_path) as data:
+                sequence = DetectionSequence.from_arrays(
+                    data["offsets"], data["xyxy"], data["conf"], data["cls"]
+                )
+        except (OSError, ValueError, KeyError):
+            # Entrada corrompida: descartar
+            os.remove(entry_path)
+            return None
+        
+        # Marcar como usada recentemente (LRU)
+        os.utime(entry_path)
+        
+        return sequence
+    
+    def save(self, key, sequence):
+        """
+        Salva as detecções de uma entrada e aplica o limite de tamanho
+        
+        Args:
+            key (str): Chave gerada por make_key
+            sequence (DetectionSequence): Detecções por frame
+        """
+        entry_path = self._entry_path(key)
+        temp_path = f"{entry_path}.{threading.get_ident()}.tmp.npz"
+        
+        np.savez(temp_path, **sequence.to_arrays())
+        
+        with self._lock:
+            # Uma entrada sobrescrita deixa de contar no tamanho total
+            previous_size = os.path.getsize(entry_path) if os.path.exists(entry_path) else 0
+            os.replace(temp_path, entry_path)
+            
+            # Tamanho total mantido em memória; a pasta só é varrida ao exceder o limite
+            if self._total_size is None:
+                self._total_size = self._scan_size()
+            else:
+                self._total_size += os.path.getsize(entry_path) - previous_size
+            
+            if self._total_size > self.max_bytes:
+                self._evict()
+    
+    def _list_entries(self):
+        """
+        Lista as entradas do cache
+        
+        Returns:
+            list: Tuplas (último uso, tamanho, caminho)
+        """
+        entries = []
+        for entry in os.scandir(self.cache_directory):
+            if entry.name.endswith(".npz") and not entry.name.endswith(".tmp.npz"):
+                entry_stat = entry.stat()
+                entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+        return entries
+    
+    def _scan_size(self):
+        """Retorna o tamanho total das entradas em disco"""
+        return sum(size for _, size, _ in self._list_entries())
+    
+    def _evict(self):
+        """Remove as entradas usadas há mais tempo até respeitar o tamanho máximo"""
+        entries = self._list_entries()
+        
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            os.remove(path)
+            total_size -= size
+        
+        self._total_size = total_size
+    
+    def invalidate(self, key):
+        """
+        Remove uma entrada do cache
+        
+        Args:
+            key (str): Chave gerada por make_key
+        """
+        entry_path = self._entry_path(key)
+        with self._lock:
+            if os.path.exists(entry_path):
+                self._remove_entry(entry_path)
+    
+    def invalidate_file(self, file_path):
+        """
+        Remove todas as entradas de um arquivo de entrada, com quaisquer parâmetros
+        
+        Args:
+            file_path (str): Caminho do arquivo de entrada
+        """
+        prefix = self.file_hash(file_path)[:32] + "_"
+        with self._lock:
+            for entry in os.scandir(self.cache_directory):
+                if entry.name.startswith(prefix) and entry.name.endswith(".npz"):
+                    self._remove_entry(entry.path)
+    
+    def _remove_entry(self, entry_path):
+        """Remove o arquivo de uma entrada e desconta o tamanho (chamado com o lock)"""
+        size = os.path.getsize(entry_path)
+        os.remove(entry_path)
+        if self._total_size is not None:
+            self._total_size -= size
+    
+    def clear(self):
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            for entry in os.scandir(self.cache_directory):
+                if entry.name.endswith(".npz") or entry.name == "file_hashes.json":
+                    os.remove(entry.path)
+            
+            self._hash_index = {}
+            self._total_size = 0
+
+
+def create_detection_cache(config):
+    """
+    Cria o cache de detecções conforme a seção "cache" do config
+    
+    Args:
+        config (dict): Configurações do projeto
+    
+    Returns:
+        DetectionCache: Cache configurado ou None se desabilitado
+    """
+    cache_config = config.get("cache", {})
+    if not cache_config.get("enabled", False):
+        return None
+    
+    return DetectionCache(
+        cache_config.get("directory", "./data/cache/detections"),
+        cache_config.get("max_size_mb", 2048)
+    )
@@ -0,0 +1,279 @@
+"""
+Módulo com a representação compacta das detecções
+"""
+import numpy as np
+
+
+class Detections:
+    """Detecções de um frame em arrays NumPy (caixas, confianças e classes)"""
+    
+    def __init__(self, xyxy=None, conf=None, cls=None):
+        """
+        Inicializa as detecções
+        
+        Args:
+            xyxy: Caixas no formato (N, 4) com x1, y1, x2, y2
+            conf: Confianças no formato (N,)
+            cls: Classes no formato (N,)
+        """
+        if xyxy is None:
+            xyxy = np.zeros((0, 4), dtype=np.float32)
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        
+        if conf is None:
+            conf = np.zeros(len(self.xyxy), dtype=np.float32)
+        self.conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+        
+        if cls is None:
+            cls = np.zeros(len(self.xyxy), dtype=np.int32)
+        self.cls = np.asarray(cls, dtype=np.int32).reshape(-1)
+    
+    @classmethod
+    def from_results(cls, results):
+        """
+        Converte um resultado YOLO com uma única transferência por array
+        
+        Args:
+            results: Resultado da detecção YOLO
+        
+        Returns:
+            Detections: Detecções do frame
+        """
+        boxes = results.boxes
+        return cls(
+            boxes.xyxy.cpu().numpy(),
+            boxes.conf.cpu().numpy(),
+            boxes.cls.cpu().numpy()
+        )
+    
+    def __len__(self):
+        """Retorna o número de detecções"""
+        return len(self.xyxy)
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Calcula a matriz de IoU entre dois conjuntos de caixas
+    
+    Args:
+        boxes_a: Caixas no formato (N, 4)
+        boxes_b: Caixas no formato (M, 4)
+    
+    Returns:
+        numpy.ndarray: Matriz (N, M) de IoU
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    
+    area_a = np.prod(np.clip(boxes_a[:, 2:] - boxes_a[:, :2], 0, None), axis=1)
+    area_b = np.prod(np.clip(boxes_b[:, 2:] - boxes_b[:, :2], 0, None), axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+
+def match_boxes(boxes_a, boxes_b, iou_threshold=0.3):
+    """
+    Associa caixas de forma gulosa pela maior IoU
+    
+    Args:
+        boxes_a: Caixas no formato (N, 4)
+        boxes_b: Caixas no formato (M, 4)
+        iou_threshold (float): IoU mínima para considerar uma associação
+    
+    Returns:
+        list: Pares (índice em boxes_a, índice em boxes_b, IoU)
+    """
+    iou = box_iou(boxes_a, boxes_b)
+    if iou.size == 0:
+        return []
+    
+    matches = []
+    used_a = set()
+    used_b = set()
+    
+    # Percorrer pares em ordem decrescente de IoU
+    order = np.argsort(-iou, axis=None)
+    for flat_index in order:
+        i, j = np.unravel_index(flat_index, iou.shape)
+        if iou[i, j] < iou_threshold:
+            break
+        if i in used_a or j in used_b:
+            continue
+        
+        used_a.add(i)
+        used_b.add(j)
+        matches.append((int(i), int(j), float(iou[i, j])))
+    
+    return matches
+
+
+def merge_overlapping(rects):
+    """
+    Une retângulos que se sobrepõem até não haver mais interseções
+    
+    Args:
+        rects (list): Retângulos (x1, y1, x2, y2) em pixels
+    
+    Returns:
+        list: Retângulos (x1, y1, x2, y2) disjuntos, sem os vazios
+    """
+    rects = [list(rect) for rect in rects]
+    
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                a, b = rects[i], rects[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    rects[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del rects[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    
+    return [tuple(rect) for rect in rects if rect[2] > rect[0] and rect[3] > rect[1]]
+
+
+def box_ios(boxes_a, boxes_b):
+    """
+    Calcula a matriz de interseção sobre a área da menor caixa
+    
+    Diferente da IoU, é alta quando uma caixa parcial (cortada na borda de um
+    tile) está contida na caixa completa da mesma pessoa.
+    
+    Args:
+        boxes_a: Caixas no formato (N, 4)
+        boxes_b: Caixas no formato (M, 4)
+    
+    Returns:
+        numpy.ndarray: Matriz (N, M) de interseção / menor área
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    
+    area_a = np.prod(np.clip(boxes_a[:, 2:] - boxes_a[:, :2], 0, None), axis=1)
+    area_b = np.prod(np.clip(boxes_b[:, 2:] - boxes_b[:, :2], 0, None), axis=1)
+    smaller = np.minimum(area_a[:, None], area_b[None, :])
+    
+    return np.where(smaller > 0, intersection / np.maximum(smaller, 1e-9), 0.0)
+
+
+def non_max_suppression(detections, threshold=0.6, metric="ios", merge=False):
+    """
+    Remove detecções duplicadas, mantendo a de maior confiança
+    
+    Args:
+        detections (Detections): Detecções a filtrar
+        threshold (float): Sobreposição a partir da qual a caixa é descartada
+        metric (str): "ios" (interseção sobre a menor caixa) ou "iou"
+        merge (bool): Se True, a caixa mantida passa a envolver as descartadas
+            (une a caixa parcial de um tile com a completa do tile vizinho)
+    
+    Returns:
+        Detections: Detecções sem duplicatas, em ordem decrescente de confiança
+    """
+    if len(detections) < 2:
+        return detections
+    
+    order = np.argsort(-detections.conf, kind="stable")
+    xyxy = detections.xyxy[order]
+    overlap = box_ios(xyxy, xyxy) if metric == "ios" else box_iou(xyxy, xyxy)
+    
+    keep = np.ones(len(order), dtype=bool)
+    merged = xyxy.copy()
+    for i in range(len(order)):
+        if not keep[i]:
+            continue
+        
+        # Caixas de menor confiança sobrepostas à atual são descartadas
+        suppressed = np.flatnonzero(keep[i + 1:] & (overlap[i, i + 1:] >= threshold)) + i + 1
+        keep[suppressed] = False
+        
+        if merge and len(suppressed):
+            merged[i, :2] = np.minimum(xyxy[i, :2], xyxy[suppressed, :2].min(axis=0))
+            merged[i, 2:] = np.maximum(xyxy[i, 2:], xyxy[suppressed, 2:].max(axis=0))
+    
+    kept = order[keep]
+    return Detections(merged[keep], detections.conf[kept], detections.cls[kept])
+
+
+def merge_tile_seams(detections, tile_ids, tiles, threshold=0.6):
+    """
+    Une as caixas da mesma pessoa detectada em tiles vizinhos
+    
+    Só são unidos pares de tiles diferentes com as duas caixas na faixa de
+    sobreposição entre esses tiles; caixas do mesmo tile (pessoas próximas que
+    o NMS do modelo manteve separadas) nunca são unidas. Cada caixa absorve no
+    máximo uma caixa de cada outro tile, a de maior sobreposição.
+    
+    Args:
+        detections (Detections): Detecções de todos os tiles do frame
+        tile_ids: Índice do tile de origem de cada caixa (N,)
+        tiles: Tiles (x1, y1, x2, y2) nas mesmas coordenadas das caixas
+        threshold (float): Interseção sobre a menor caixa a partir da qual o
+            par é considerado a mesma pessoa
+    
+    Returns:
+        Detections: Detecções unidas, em ordem decrescente de confiança
+    """
+    if len(detections) < 2:
+        return detections
+    
+    order = np.argsort(-detections.conf, kind="stable")
+    xyxy = detections.xyxy[order]
+    ids = np.asarray(tile_ids, dtype=np.int64)[order]
+    box_tiles = np.asarray(tiles, dtype=np.float32).reshape(-1, 4)[ids]
+    
+    # Faixa de sobreposição entre os tiles de cada par de caixas
+    band_top_left = np.maximum(box_tiles[:, None, :2], box_tiles[None, :, :2])
+    band_bottom_right = np.minimum(box_tiles[:, None, 2:], box_tiles[None, :, 2:])
+    
+    def touches_band(boxes_top_left, boxes_bottom_right):
+        # Caixa com área em comum com a faixa do par
+        return np.all(
+            (boxes_top_left < band_bottom_right) & (boxes_bottom_right > band_top_left), axis=2
+        )
+    
+    overlap = box_ios(xyxy, xyxy)
+    candidates = (
+        (ids[:, None] != ids[None, :])
+        & (overlap >= threshold)
+        & np.all(band_top_left < band_bottom_right, axis=2)
+        & touches_band(xyxy[:, None, :2], xyxy[:, None, 2:])
+        & touches_band(xyxy[None, :, :2], xyxy[None, :, 2:])
+    )
+    
+    keep = np.ones(len(order), dtype=bool)
+    merged = xyxy.copy()
+    for i in range(len(order)):
+        if not keep[i]:
+            continue
+        
+        matches = np.flatnonzero(keep[i + 1:] & candidates[i, i + 1:]) + i + 1
+        if not len(matches):
+            continue
+        
+        # Uma caixa por tile vizinho: a de maior sobreposição com a atual
+        absorbed = []
+        for tile_id in np.unique(ids[matches]):
+            same_tile = matches[ids[matches] == tile_id]
+            absorbed.append(same_tile[np.argmax(overlap[i, same_tile])])
+        absorbed = np.asarray(absorbed)
+        
+        keep[absorbed] = False
+        merged[i, :2] = np.minimum(xyxy[i, :2], xyxy[absorbed, :2].min(axis=0))
+        merged[i, 2:] = np.maximum(xyxy[i, 2:], xyxy[absorbed, 2:].max(axis=0))
+    
+    kept = order[keep]
+    return Detections(merged[keep], detections.conf[kept], detections.cls[kept])
@@ -1,52 +1,458 @@
 """
 Módulo de detecção de pessoas usando YOLO
 """
-from ultralytics import YOLO
+import time
+import numpy as np
+from .detections import Detections, merge_overlapping, merge_tile_seams
+from .backends import load_model
+from .preprocessing import Letterbox
 
 
 class PeopleDetector:
     """Classe responsável pela detecção de pessoas usando YOLO"""
     
-    def __init__(self, model_config):
+    def __init__(self, model_config, batch_size=1):
         """
         Inicializa o detector YOLO
         
         Args:
             model_config (dict): Configurações do modelo
+            batch_size (int): Tamanho do lote usado na inferência (define o
+                lote do modelo exportado em backends diferentes de "torch")
         """
-        self.model = YOLO(model_config["weights"])
+        start = time.perf_counter()
+        self.model_config = model_config
+        self.weights = model_config["weights"]
+        self.backend = model_config.get("backend", "torch")
+        self.imgsz = int(model_config.get("imgsz", 640))
+        self.batch_size = max(1, int(batch_size))
+        self.precision = model_config.get("precision", "fp32")
+        self.model = load_model(
+            self.weights,
+            self.backend,
+            self.imgsz,
+            self.batch_size,
+            model_config.get("export_directory", "./data/cache/models"),
+            self.precision,
+            model_config.get("calibration_directory")
+        )
         self.conf = model_config.get("conf", 0.25)
         self.iou = model_config.get("iou", 0.7)
         self.classes = model_config.get("classes", [0])  # 0 = pessoa
         self.verbose = model_config.get("verbose", False)
+        
+        # Limite de entradas por chamada ao modelo (tiles e recortes podem somar centenas)
+        self.max_batch = max(self.batch_size, int(model_config.get("max_batch", 32)))
+        
+        # Pré-processamento próprio; modelos exportados exigem entrada quadrada fixa
+        self.letterbox = Letterbox(self.imgsz, rect=self.backend == "torch")
+        
+        # Cascata: um modelo leve propõe regiões e este modelo refina só os recortes
+        cascade_config = model_config.get("cascade", {})
+        self.proposer = None
+        if cascade_config.get("enabled", False):
+            self.proposer = PeopleDetector(_proposer_config(model_config), self.batch_size)
+        self.cascade_expand = cascade_config.get("expand", 0.5)
+        self.cascade_padding = int(cascade_config.get("padding", 32))
+        self.cascade_stats = {"frames": 0, "proposals": 0, "proposal_time": 0.0, "refine_time": 0.0, "area": 0.0}
+        
+        # Instrumentação opcional dos estágios do modelo (ver set_profiler)
+        self.profiler = None
+        self.profile_prefix = ""
+        
+        # Aquecimento: a compilação do grafo não pesa no primeiro frame real
+        if model_config.get("warmup", self.backend != "torch"):
+            self.warmup()
+        
+        # Custo de carregamento (imports, pesos, exportação e aquecimento)
+        self.loaded_at = time.perf_counter()
+        self.load_time = self.loaded_at - start
     
-    def detect(self, frame):
+    def set_profiler(self, profiler, prefix=""):
+        """
+        Define o coletor que recebe as latências de pré-processamento,
+        inferência e pós-processamento
+        
+        Args:
+            profiler (StageProfiler): Coletor (None desliga a instrumentação)
+            prefix (str): Prefixo dos nomes dos estágios
+        """
+        self.profiler = profiler
+        self.profile_prefix = prefix
+        if self.proposer is not None:
+            self.proposer.set_profiler(profiler, f"{prefix}proposta/")
+    
+    def warmup(self):
+        """Executa uma inferência com um lote vazio para inicializar o backend"""
+        frame = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+        self._infer([frame] * self.batch_size)
+    
+    def detect(self, frame, output_size=None, regions=None):
         """
         Detecta pessoas em um frame
         
         Args:
             frame: Frame de vídeo (numpy array)
+            output_size (tuple): (largura, altura) das caixas retornadas
+                (padrão: dimensões do próprio frame)
+            regions (list): Recortes (x1, y1, x2, y2) do frame onde detectar
+                (padrão: frame inteiro)
             
         Returns:
-            Resultado da detecção YOLO
+            Detections: Detecções do frame
         """
-        results = self.model(
-            frame,
-            conf=self.conf,
-            iou=self.iou,
-            classes=self.classes,
-            verbose=self.verbose
-        )
-        return results[0]
+        return self.detect_batch([frame], output_size, regions)[0]
+    
+    def detect_batch(self, frames, output_size=None, regions=None):
+        """
+        Detecta pessoas em um lote de frames com uma única chamada ao modelo
+        
+        Os frames são redimensionados uma única vez, direto para o tamanho de
+        inferência, e as caixas são convertidas de volta para output_size.
+        
+        Args:
+            frames (list): Lista de frames de vídeo (numpy arrays)
+            output_size (tuple): (largura, altura) das caixas retornadas
+                (padrão: dimensões de cada frame)
+            regions (list): Recortes (x1, y1, x2, y2), em pixels dos frames, onde
+                detectar; exige frames do mesmo tamanho (padrão: frame inteiro)
+            
+        Returns:
+            list: Detecções de cada frame (Detections), na mesma ordem dos frames
+        """
+        if not frames:
+            return []
+        
+        if self.proposer is not None:
+            return self._detect_cascade(frames, output_size, regions)
+        
+        if regions:
+            return self._detect_regions(frames, [regions] * len(frames), output_size, keep_scale=True)
+        
+        return self._infer(frames, output_size)
+    
+    def _detect_cascade(self, frames, output_size=None, regions=None):
+        """
+        Detecta em dois estágios: propostas do modelo leve e refino nos recortes
+        
+        As caixas propostas são expandidas, unidas quando se sobrepõem e
+        apenas esses recortes passam pelo modelo configurado.
+        
+        Args:
+            frames (list): Frames originais
+            output_size (tuple): (largura, altura) das caixas retornadas
+            regions (list): Recortes que limitam as propostas (padrão: frame inteiro)
+        
+        Returns:
+            list: Detecções de cada frame (Detections)
+        """
+        start = time.perf_counter()
+        proposals = self.proposer.detect_batch(frames, None, regions)
+        proposal_time = time.perf_counter() - start
+        
+        crops = [
+            self._proposal_crops(frame.shape, frame_proposals)
+            for frame, frame_proposals in zip(frames, proposals)
+        ]
+        
+        start = time.perf_counter()
+        detections = self._detect_regions(frames, crops, output_size, keep_scale=True)
+        refine_time = time.perf_counter() - start
+        
+        stats = self.cascade_stats
+        stats["frames"] += len(frames)
+        stats["proposals"] += sum(len(frame_proposals) for frame_proposals in proposals)
+        stats["proposal_time"] += proposal_time
+        stats["refine_time"] += refine_time
+        for frame, frame_crops in zip(frames, crops):
+            area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in frame_crops)
+            stats["area"] += area / (frame.shape[0] * frame.shape[1])
+        
+        return detections
+    
+    def _proposal_crops(self, frame_shape, proposals):
+        """
+        Converte as propostas do modelo leve em recortes para o refino
+        
+        Args:
+            frame_shape (tuple): Formato (altura, largura, ...) do frame original
+            proposals (Detections): Caixas propostas, em pixels do frame original
+        
+        Returns:
+            list: Recortes (x1, y1, x2, y2) disjuntos
+        """
+        if len(proposals) == 0:
+            return []
+        
+        height, width = frame_shape[:2]
+        boxes = proposals.xyxy
+        
+        # Margem proporcional ao tamanho da caixa, com um mínimo em pixels
+        padding = np.maximum((boxes[:, 2:] - boxes[:, :2]) * self.cascade_expand, self.cascade_padding)
+        expanded = np.concatenate([np.floor(boxes[:, :2] - padding), np.ceil(boxes[:, 2:] + padding)], axis=1)
+        expanded = np.clip(expanded, 0, [width, height, width, height]).astype(int)
+        
+        return merge_overlapping(expanded.tolist())
+    
+    def get_cascade_stats(self):
+        """
+        Retorna os contadores acumulados da cascata
+        
+        Returns:
+            dict: Frames, propostas, tempo de cada estágio (s) e soma das frações
+                de área enviadas ao modelo pesado
+        """
+        return dict(self.cascade_stats)
+    
+    def get_cascade_summary(self, since=None):
+        """
+        Resume a cascata por frame, opcionalmente a partir de um ponto anterior
+        
+        Args:
+            since (dict): Contadores retornados antes por get_cascade_stats
+        
+        Returns:
+            dict: Frames, propostas por frame, tempo médio de cada estágio (ms)
+                e fração média da área enviada ao modelo pesado; None se a
+                cascata estiver desligada ou nenhum frame tiver passado por ela
+        """
+        if self.proposer is None:
+            return None
+        
+        since = since or {}
+        delta = {name: value - since.get(name, 0) for name, value in self.cascade_stats.items()}
+        frames = delta["frames"]
+        if frames == 0:
+            return None
+        
+        return {
+            "frames": frames,
+            "proposals_per_frame": delta["proposals"] / frames,
+            "proposal_ms": delta["proposal_time"] * 1000 / frames,
+            "refine_ms": delta["refine_time"] * 1000 / frames,
+            "area_ratio": delta["area"] / frames
+        }
+    
+    def detect_tiles(self, frames, tiles, output_size=None, merge_threshold=0.6):
+        """
+        Detecta pessoas em tiles na resolução nativa dos frames
+        
+        Cada tile ocupa a entrada do modelo sem redução, preservando pessoas
+        pequenas. Os tiles de todos os frames seguem juntos para o modelo e as
+        caixas da mesma pessoa em tiles vizinhos são unidas nas emendas.
+        
+        Args:
+            frames (list): Frames originais (numpy arrays)
+            tiles (list): Para cada frame, lista de tiles (x1, y1, x2, y2) a inferir
+            output_size (tuple): (largura, altura) das caixas retornadas
+                (padrão: dimensões de cada frame)
+            merge_threshold (float): Interseção sobre a menor caixa a partir da
+                qual caixas de tiles vizinhos são unidas
+            
+        Returns:
+            list: Detecções de cada frame (Detections)
+        """
+        if not frames:
+            return []
+        
+        detections, tile_ids = self._detect_regions(frames, tiles, output_size, with_regions=True)
+        
+        merged = []
+        for frame, frame_tiles, frame_detections, frame_tile_ids in zip(frames, tiles, detections, tile_ids):
+            # Tiles nas coordenadas das caixas retornadas
+            height, width = frame.shape[:2]
+            output_width, output_height = output_size or (width, height)
+            factor = np.array([output_width / width, output_height / height] * 2, dtype=np.float32)
+            tile_boxes = np.asarray(frame_tiles, dtype=np.float32).reshape(-1, 4) * factor
+            merged.append(merge_tile_seams(frame_detections, frame_tile_ids, tile_boxes, merge_threshold))
+        return merged
     
-    def count_people(self, results):
+    def _detect_regions(self, frames, regions, output_size=None, keep_scale=False, with_regions=False):
         """
-        Conta o número de pessoas detectadas
+        Detecta apenas nos recortes e devolve as caixas no frame inteiro
+        
+        Os recortes de todos os frames seguem juntos para o modelo.
         
         Args:
-            results: Resultado da detecção YOLO
+            frames (list): Frames originais
+            regions (list): Para cada frame, recortes (x1, y1, x2, y2) em pixels
+            output_size (tuple): (largura, altura) das caixas retornadas
+            keep_scale (bool): Se True e a entrada for retangular (torch), cada
+                recorte mantém a escala que teria no frame inteiro, então o custo
+                cai na proporção da área recortada; caso contrário (e com entrada
+                fixa), o recorte é ampliado para ocupar a entrada do modelo
+            with_regions (bool): Se True, retorna também o índice do recorte de
+                origem de cada caixa
+        
+        Returns:
+            list: Detecções de cada frame (Detections); com with_regions, a tupla
+                (detecções, índices dos recortes de cada frame)
+        """
+        crops = []
+        scales = []
+        for frame, frame_regions in zip(frames, regions):
+            height, width = frame.shape[:2]
+            scale = min(self.imgsz / width, self.imgsz / height) if keep_scale and self.letterbox.rect else None
+            for x1, y1, x2, y2 in frame_regions:
+                crops.append(frame[y1:y2, x1:x2])
+                scales.append(scale)
+        crop_detections = iter(self._infer(crops, scale=scales))
+        
+        detections = []
+        region_ids = []
+        for frame, frame_regions in zip(frames, regions):
+            height, width = frame.shape[:2]
+            output_width, output_height = output_size or (width, height)
+            factor = np.array([output_width / width, output_height / height] * 2, dtype=np.float32)
+            
+            parts = [next(crop_detections) for _ in frame_regions]
+            if not parts:
+                detections.append(Detections())
+                region_ids.append(np.zeros(0, dtype=np.int64))
+                continue
+            
+            offsets = [np.array([x1, y1, x1, y1], dtype=np.float32) for x1, y1, _, _ in frame_regions]
+            detections.append(Detections(
+                np.concatenate([part.xyxy + offset for part, offset in zip(parts, offsets)]) * factor,
+                np.concatenate([part.conf for part in parts]),
+                np.concatenate([part.cls for part in parts])
+            ))
+            region_ids.append(np.repeat(np.arange(len(parts)), [len(part) for part in parts]))
+        
+        if with_regions:
+            return detections, region_ids
+        return detections
+    
+    def _infer(self, frames, output_size=None, scale=None):
+        """
+        Executa o modelo agrupando frames com a mesma entrada em uma chamada
+        
+        Args:
+            frames (list): Frames ou recortes (numpy arrays)
+            output_size (tuple): (largura, altura) das caixas retornadas
+                (padrão: dimensões de cada frame)
+            scale: Escala fixa do letterbox, única ou uma por frame
+                (padrão: ajustar a imgsz)
+        
+        Returns:
+            list: Detecções de cada frame (Detections)
+        """
+        if not frames:
+            return []
+        
+        scales = scale if isinstance(scale, (list, tuple)) else [scale] * len(frames)
+        
+        # Frames com entradas de tamanhos diferentes formam chamadas separadas
+        groups = {}
+        for index, frame in enumerate(frames):
+            groups.setdefault(self.letterbox.get_input_size(frame.shape, scales[index]), []).append(index)
+        
+        # Grupos grandes são divididos para limitar a memória do tensor de entrada
+        chunks = [
+            indices[start:start + self.max_batch]
+            for indices in groups.values()
+            for start in range(0, len(indices), self.max_batch)
+        ]
+        
+        detections = [None] * len(frames)
+        profiler = self.profiler
+        for indices in chunks:
+            start = time.perf_counter()
+            tensor, transforms = self.letterbox(
+                [frames[index] for index in indices], [scales[index] for index in indices]
+            )
+            preprocessed = time.perf_counter()
+            results = self.model(
+                tensor,
+                imgsz=self.imgsz,
+                conf=self.conf,
+                iou=self.iou,
+                classes=self.classes,
+                verbose=self.verbose
+            )
+            inferred = time.perf_counter()
+            
+            for index, result, transform in zip(indices, results, transforms):
+                frame_detections = Detections.from_results(result)
+                frame_detections.xyxy = Letterbox.map_boxes(
+                    frame_detections.xyxy, transform, frames[index].shape, output_size
+                )
+                detections[index] = frame_detections
+            
+            if profiler is not None:
+                # Latência por entrada do modelo (frame, tile ou recorte)
+                count = len(indices)
+                prefix = self.profile_prefix
+                profiler.record(f"{prefix}pré-processamento", (preprocessed - start) / count, count)
+                profiler.record(f"{prefix}inferência", (inferred - preprocessed) / count, count)
+                profiler.record(f"{prefix}pós-processamento", (time.perf_counter() - inferred) / count, count)
+        
+        return detections
+    
+    @staticmethod
+    def count_people(results):
+        """
+        Conta o número de pessoas detectadas (não exige o modelo carregado)
+        
+        Args:
+            results (Detections): Detecções do frame
             
         Returns:
             int: Número de pessoas detectadas
         """
-        return len(results.boxes)
+        return len(results)
+    
+    def get_signature(self):
+        """
+        Retorna os parâmetros do detector que afetam as detecções
+        
+        Returns:
+            dict: Pesos e parâmetros de inferência
+        """
+        return detector_signature(self.model_config)
+
+
+def _proposer_config(model_config):
+    """Configuração do modelo leve da cascata, derivada da do modelo principal"""
+    cascade_config = model_config.get("cascade", {})
+    return dict(
+        model_config,
+        weights=cascade_config.get("weights", "yolo11n.pt"),
+        imgsz=cascade_config.get("imgsz", 320),
+        conf=cascade_config.get("conf", model_config.get("conf", 0.25)),
+        cascade={"enabled": False}
+    )
+
+
+def detector_signature(model_config):
+    """
+    Retorna os parâmetros que afetam as detecções de uma configuração de modelo
+    
+    Calculado só a partir do config, sem carregar o modelo (chaves de cache e
+    de checkpoint não pagam o carregamento dos pesos).
+    
+    Args:
+        model_config (dict): Configurações do modelo
+    
+    Returns:
+        dict: Pesos e parâmetros de inferência
+    """
+    cascade_config = model_config.get("cascade", {})
+    cascade = None
+    if cascade_config.get("enabled", False):
+        cascade = {
+            "proposer": detector_signature(_proposer_config(model_config)),
+            "expand": cascade_config.get("expand", 0.5),
+            "padding": int(cascade_config.get("padding", 32))
+        }
+    
+    return {
+        "weights": model_config["weights"],
+        "backend": model_config.get("backend", "torch"),
+        "imgsz": int(model_config.get("imgsz", 640)),
+        "precision": model_config.get("precision", "fp32"),
+        "conf": model_config.get("conf", 0.25),
+        "iou": model_config.get("iou", 0.7),
+        "classes": model_config.get("classes", [0]),
+        "cascade": cascade
+    }
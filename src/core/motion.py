@@ -0,0 +1,118 @@
+"""
+Módulo de detecção de movimento para evitar inferências em frames estáticos
+"""
+import cv2
+import numpy as np
+from .detections import Detections
+
+
+class MotionGate:
+    """Compara cada frame com o último frame inferido por energia de movimento em blocos"""
+    
+    def __init__(self, threshold=0.002, pixel_threshold=12, scale_width=320, block_size=8, max_reuse=30):
+        """
+        Inicializa o detector de movimento
+        
+        Args:
+            threshold (float): Fração mínima de blocos alterados para rodar o detector
+            pixel_threshold (float): Diferença média de intensidade (0-255) para
+                considerar um bloco alterado
+            scale_width (int): Largura da versão reduzida usada na comparação
+            block_size (int): Lado dos blocos na versão reduzida, em pixels
+            max_reuse (int): Máximo de frames seguidos reaproveitando detecções
+                (0 = sem limite)
+        """
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.scale_width = int(scale_width)
+        self.block_size = max(1, int(block_size))
+        self.max_reuse = int(max_reuse)
+        
+        self.reference = None
+        self.last_detections = None
+        self.consecutive_reuse = 0
+    
+    def _downscale(self, frame):
+        """Converte o frame para tons de cinza em resolução reduzida"""
+        height, width = frame.shape[:2]
+        scale_width = min(self.scale_width, width)
+        scale_height = max(1, round(height * scale_width / width))
+        
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, (scale_width, scale_height), interpolation=cv2.INTER_AREA)
+    
+    def measure_change(self, small):
+        """
+        Mede a fração de blocos alterados em relação ao último frame inferido
+        
+        Args:
+            small: Frame reduzido em tons de cinza
+        
+        Returns:
+            float: Fração de blocos alterados (0-1)
+        """
+        diff = cv2.absdiff(small, self.reference)
+        
+        # Média da diferença em cada bloco
+        blocks_x = max(1, diff.shape[1] // self.block_size)
+        blocks_y = max(1, diff.shape[0] // self.block_size)
+        block_energy = cv2.resize(diff, (blocks_x, blocks_y), interpolation=cv2.INTER_AREA)
+        
+        return float(np.count_nonzero(block_energy > self.pixel_threshold)) / block_energy.size
+    
+    def is_static(self, frame):
+        """
+        Informa se o frame pode reaproveitar as detecções do último frame inferido
+        
+        Quando o frame não é estático, ele passa a ser a nova referência.
+        
+        Args:
+            frame: Frame redimensionado (BGR)
+        
+        Returns:
+            bool: True se a mudança está abaixo do limite
+        """
+        small = self._downscale(frame)
+        
+        if self.reference is not None and self.reference.shape == small.shape:
+            reuse_allowed = self.max_reuse <= 0 or self.consecutive_reuse < self.max_reuse
+            if reuse_allowed and self.measure_change(small) < self.threshold:
+                self.consecutive_reuse += 1
+                return True
+        
+        self.reference = small
+        self.consecutive_reuse = 0
+        return False
+    
+    def get_state(self):
+        """
+        Retorna o estado do detector de movimento (para checkpoints)
+        
+        Returns:
+            dict: Frame de referência, últimas detecções e contadores
+        """
+        state = {
+            "consecutive_reuse": self.consecutive_reuse,
+            "has_reference": self.reference is not None,
+            "has_detections": self.last_detections is not None
+        }
+        if self.reference is not None:
+            state["reference"] = self.reference
+        if self.last_detections is not None:
+            state["xyxy"] = self.last_detections.xyxy
+            state["conf"] = self.last_detections.conf
+            state["cls"] = self.last_detections.cls
+        return state
+    
+    def set_state(self, state):
+        """
+        Restaura o estado salvo por get_state
+        
+        Args:
+            state (dict): Estado do detector de movimento
+        """
+        self.consecutive_reuse = int(state["consecutive_reuse"])
+        self.reference = np.asarray(state["reference"], dtype=np.uint8) if state["has_reference"] else None
+        self.last_detections = None
+        if state["has_detections"]:
+            self.last_detections = Detections(state["xyxy"], state["conf"], state["cls"])
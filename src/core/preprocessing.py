@@ -0,0 +1,165 @@
+"""
+Módulo de pré-processamento: uma única reamostragem do frame para a entrada do modelo
+"""
+import cv2
+import numpy as np
+
+
+# Cor de preenchimento do letterbox (mesma do ultralytics)
+PAD_VALUE = 114
+
+
+class Letterbox:
+    """Redimensiona frames direto para o tamanho de inferência em buffers reaproveitados"""
+    
+    def __init__(self, imgsz=640, stride=32, rect=True):
+        """
+        Inicializa o pré-processador
+        
+        Args:
+            imgsz (int): Lado maior da entrada do modelo
+            stride (int): Múltiplo exigido pelas dimensões da entrada
+            rect (bool): Se True, usa a menor entrada retangular que contém o frame
+                (menos preenchimento); se False, usa sempre imgsz x imgsz
+                (exigido por modelos exportados com entrada fixa)
+        """
+        self.imgsz = int(imgsz)
+        self.stride = int(stride)
+        self.rect = rect
+        
+        self._images = None
+        self._tensor = None
+        self._transforms = []
+    
+    def get_transform(self, frame_shape, scale=None):
+        """
+        Calcula a escala e o deslocamento do letterbox para um tamanho de frame
+        
+        Args:
+            frame_shape (tuple): Formato (altura, largura, ...) do frame de origem
+            scale (float): Escala fixa (ex.: a do frame inteiro, para recortes);
+                None = maior escala em que o frame cabe em imgsz
+        
+        Returns:
+            tuple: (escala, deslocamento x, deslocamento y, largura redimensionada,
+                altura redimensionada, largura da entrada, altura da entrada)
+        """
+        height, width = frame_shape[:2]
+        if scale is None:
+            scale = min(self.imgsz / width, self.imgsz / height)
+        else:
+            scale = min(scale, self.imgsz / width, self.imgsz / height)
+        resized_width = max(1, round(width * scale))
+        resized_height = max(1, round(height * scale))
+        
+        if self.rect:
+            input_width = -(-resized_width // self.stride) * self.stride
+            input_height = -(-resized_height // self.stride) * self.stride
+        else:
+            input_width = input_height = -(-self.imgsz // self.stride) * self.stride
+        
+        offset_x = (input_width - resized_width) // 2
+        offset_y = (input_height - resized_height) // 2
+        
+        return scale, offset_x, offset_y, resized_width, resized_height, input_width, input_height
+    
+    def _get_buffers(self, transforms):
+        """Retorna os buffers de imagem e tensor, realocando só se o formato mudar"""
+        count = len(transforms)
+        input_width, input_height = transforms[0][5:]
+        shape = (count, input_height, input_width, 3)
+        
+        if self._images is None or self._images.shape[0] < count or self._images.shape[1:] != shape[1:]:
+            import torch  # Importado no primeiro uso (ver backends.load_model)
+            self._images = np.full(shape, PAD_VALUE, dtype=np.uint8)
+            self._tensor = torch.empty((count, 3, input_height, input_width), dtype=torch.float32)
+            self._transforms = [None] * count
+        
+        for slot, transform in enumerate(transforms):
+            if transform != self._transforms[slot]:
+                # Mesma entrada com outro posicionamento: limpar o preenchimento antigo
+                self._images[slot].fill(PAD_VALUE)
+                self._transforms[slot] = transform
+        
+        return self._images[:count], self._tensor[:count]
+    
+    def __call__(self, frames, scale=None):
+        """
+        Converte frames BGR em um tensor RGB normalizado
+        
+        Os frames podem ter tamanhos diferentes, desde que resultem na mesma
+        entrada do modelo (ver get_input_size).
+        
+        Args:
+            frames (list): Frames de origem (numpy arrays BGR)
+            scale: Escala fixa repassada a get_transform (float para todos os
+                frames ou lista com uma escala por frame)
+        
+        Returns:
+            tuple: (tensor (N, 3, H, W) em 0-1, transformações de get_transform por frame)
+        """
+        scales = scale if isinstance(scale, (list, tuple)) else [scale] * len(frames)
+        transforms = [self.get_transform(frame.shape, frame_scale) for frame, frame_scale in zip(frames, scales)]
+        images, tensor = self._get_buffers(transforms)
+        
+        for image, frame, transform in zip(images, frames, transforms):
+            _, offset_x, offset_y, resized_width, resized_height = transform[:5]
+            target = image[offset_y:offset_y + resized_height, offset_x:offset_x + resized_width]
+            
+            if frame.shape[1] == resized_width and frame.shape[0] == resized_height:
+                target[:] = frame
+            elif target.flags["C_CONTIGUOUS"]:
+                # Redimensionar direto no buffer (linhas inteiras, sem cópia extra)
+                cv2.resize(frame, (resized_width, resized_height), dst=target, interpolation=cv2.INTER_LINEAR)
+            else:
+                target[:] = cv2.resize(frame, (resized_width, resized_height), interpolation=cv2.INTER_LINEAR)
+            
+            # BGR -> RGB no próprio buffer (o preenchimento é cinza e não muda)
+            cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+        
+        # HWC uint8 -> CHW float 0-1, no tensor reaproveitado
+        import torch
+        tensor.copy_(torch.from_numpy(images).permute(0, 3, 1, 2)).div_(255)
+        
+        return tensor, transforms
+    
+    def get_input_size(self, frame_shape, scale=None):
+        """
+        Retorna o tamanho da entrada do modelo para um frame (frames com o
+        mesmo tamanho de entrada podem compartilhar um lote)
+        
+        Args:
+            frame_shape (tuple): Formato (altura, largura, ...) do frame de origem
+            scale (float): Escala fixa repassada a get_transform
+        
+        Returns:
+            tuple: (largura, altura) da entrada
+        """
+        return self.get_transform(frame_shape, scale)[5:]
+    
+    @staticmethod
+    def map_boxes(xyxy, transform, frame_shape, output_size=None):
+        """
+        Converte caixas da entrada do modelo para o frame de origem ou de saída
+        
+        Args:
+            xyxy: Caixas (N, 4) nas coordenadas da entrada do modelo
+            transform (tuple): Transformação retornada por get_transform
+            frame_shape (tuple): Formato (altura, largura, ...) do frame de origem
+            output_size (tuple): (largura, altura) de saída; None = frame de origem
+        
+        Returns:
+            numpy.ndarray: Caixas (N, 4) nas coordenadas de destino
+        """
+        scale, offset_x, offset_y = transform[:3]
+        height, width = frame_shape[:2]
+        output_width, output_height = output_size or (width, height)
+        
+        # Desfazer deslocamento e escala em uma única operação por eixo
+        scale_x = output_width / (width * scale)
+        scale_y = output_height / (height * scale)
+        
+        boxes = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4).copy()
+        boxes[:, [0, 2]] = np.clip((boxes[:, [0, 2]] - offset_x) * scale_x, 0, output_width)
+        boxes[:, [1, 3]] = np.clip((boxes[:, [1, 3]] - offset_y) * scale_y, 0, output_height)
+        return boxes
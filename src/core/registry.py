@@ -0,0 +1,57 @@
+"""
+Módulo de registro de detectores compartilhados entre processadores
+"""
+import json
+import threading
+from .detector import PeopleDetector
+
+
+# Detectores já carregados no processo, por configuração de modelo
+_detectors = {}
+_lock = threading.Lock()
+
+
+def get_detector(model_config, batch_size=1):
+    """
+    Retorna o detector de uma configuração de modelo, carregando-o no primeiro uso
+    
+    Processadores com a mesma configuração recebem a mesma instância, então os
+    pesos são carregados uma única vez por processo. No backend "torch" o lote
+    não altera o modelo e não entra na chave; nos exportados, define o lote
+    fixo do artefato e gera um detector próprio.
+    
+    Args:
+        model_config (dict): Configurações do modelo
+        batch_size (int): Tamanho do lote usado na inferência
+    
+    Returns:
+        PeopleDetector: Detector compartilhado
+    """
+    key = json.dumps(
+        [model_config, batch_size if model_config.get("backend", "torch") != "torch" else None],
+        sort_keys=True,
+        default=str
+    )
+    
+    with _lock:
+        detector = _detectors.get(key)
+        if detector is None:
+            detector = _detectors[key] = PeopleDetector(model_config, batch_size)
+        return detector
+
+
+def loaded_detectors():
+    """
+    Retorna os detectores já carregados no processo
+    
+    Returns:
+        list: Detectores, na ordem de carregamento
+    """
+    with _lock:
+        return list(_detectors.values())
+
+
+def clear_detectors():
+    """Descarta os detectores carregados (o próximo get_detector recarrega o modelo)"""
+    with _lock:
+        _detectors.clear()
@@ -0,0 +1,284 @@
+"""
+Módulo de inferência em tiles na resolução nativa, com descarte de tiles ociosos
+"""
+import cv2
+import numpy as np
+
+
+class TileScheduler:
+    """Divide o frame em tiles sobrepostos e escolhe quais passam pelo detector"""
+    
+    def __init__(self, tile_size=640, overlap=0.2, merge_threshold=0.6, skip_idle=True, hold_frames=8,
+                 revisit_interval=15, motion_threshold=0.01, motion_pixel_threshold=12,
+                 scale_width=480, block_size=4):
+        """
+        Inicializa o agendador de tiles
+        
+        Args:
+            tile_size (int): Lado dos tiles, em pixels do frame original
+            overlap (float): Sobreposição entre tiles vizinhos (fração do lado)
+            merge_threshold (float): Interseção sobre a menor caixa a partir da qual
+                caixas de tiles vizinhos são unidas nas emendas
+            skip_idle (bool): Se True, pula tiles sem movimento e sem detecções recentes
+            hold_frames (int): Keyframes em que um tile segue ativo após ter
+                movimento ou detecções (cobre o atraso de um lote entre a
+                escolha dos tiles e o retorno das detecções)
+            revisit_interval (int): Keyframes máximos sem inferir um tile
+                (garante que pessoas paradas que entram na cena sejam vistas)
+            motion_threshold (float): Fração mínima de blocos alterados para
+                considerar o tile em movimento
+            motion_pixel_threshold (float): Diferença média de intensidade (0-255)
+                para considerar um bloco alterado
+            scale_width (int): Largura da versão reduzida usada na comparação
+            block_size (int): Lado dos blocos na versão reduzida, em pixels
+        """
+        self.tile_size = int(tile_size)
+        self.overlap = min(max(float(overlap), 0.0), 0.9)
+        self.merge_threshold = merge_threshold
+        self.skip_idle = skip_idle
+        self.hold_frames = max(1, int(hold_frames))
+        self.revisit_interval = max(1, int(revisit_interval))
+        self.motion_threshold = motion_threshold
+        self.motion_pixel_threshold = motion_pixel_threshold
+        self.scale_width = int(scale_width)
+        self.block_size = max(1, int(block_size))
+        
+        self._grids = {}
+        self.tiles = None
+        self.reference = None
+        self.since_inferred = None
+        self.since_activity = None
+    
+    @classmethod
+    def from_config(cls, config, skip_idle=None):
+        """
+        Cria o agendador conforme a seção "tiling" do config
+        
+        Args:
+            config (dict): Configurações do projeto
+            skip_idle (bool): Sobrescreve tiling.skip_idle (ex.: False para imagens avulsas)
+        
+        Returns:
+            TileScheduler: Agendador configurado ou None se o modo estiver desligado
+        """
+        tiling_config = config.get("tiling", {})
+        if not tiling_config.get("enabled", False):
+            return None
+        
+        return cls(
+            tiling_config.get("tile_size", 640),
+            tiling_config.get("overlap", 0.2),
+            tiling_config.get("merge_threshold", 0.6),
+            tiling_config.get("skip_idle", True) if skip_idle is None else skip_idle,
+            tiling_config.get("hold_frames", 8),
+            tiling_config.get("revisit_interval", 15),
+            tiling_config.get("motion_threshold", 0.01),
+            tiling_config.get("motion_pixel_threshold", 12)
+        )
+    
+    def get_tiles(self, width, height, regions=None):
+        """
+        Retorna a grade de tiles de um tamanho de frame
+        
+        Os tiles da última linha e coluna são alinhados à borda, então todos têm
+        o mesmo tamanho e formam um único lote no detector.
+        
+        Args:
+            width (int): Largura do frame original
+            height (int): Altura do frame original
+            regions (list): Se informado, apenas tiles que intersectam algum
+                destes retângulos (x1, y1, x2, y2)
+        
+        Returns:
+            list: Tiles (x1, y1, x2, y2) em pixels
+        """
+        key = (width, height, tuple(regions) if regions else None)
+        if key in self._grids:
+            return self._grids[key]
+        
+        tile_width = min(self.tile_size, width)
+        tile_height = min(self.tile_size, height)
+        xs = _tile_starts(width, tile_width, self.overlap)
+        ys = _tile_starts(height, tile_height, self.overlap)
+        tiles = [(x, y, x + tile_width, y + tile_height) for y in ys for x in xs]
+        
+        if regions:
+            tiles = [
+                tile for tile in tiles
+                if any(tile[0] < r[2] and r[0] < tile[2] and tile[1] < r[3] and r[1] < tile[3] for r in regions)
+            ]
+        
+        self._grids[key] = tiles
+        return tiles
+    
+    def select(self, frame, regions=None):
+        """
+        Escolhe os tiles de um keyframe que passam pelo detector
+        
+        Um tile é inferido se teve movimento ou detecções nos últimos
+        hold_frames keyframes ou se está há revisit_interval keyframes sem ser
+        inferido.
+        
+        Args:
+            frame: Frame original (BGR)
+            regions (list): Retângulos que limitam a grade (ver get_tiles)
+        
+        Returns:
+            list: Tiles (x1, y1, x2, y2) a inferir
+        """
+        tiles = self.get_tiles(frame.shape[1], frame.shape[0], regions)
+        if not self.skip_idle:
+            return tiles
+        
+        small = self._downscale(frame)
+        if tiles != self.tiles or self.reference is None or self.reference.shape != small.shape:
+            # Primeiro frame (ou nova grade): todos os tiles ativos até haver histórico
+            self.tiles = tiles
+            self.since_inferred = np.zeros(len(tiles), dtype=np.int32)
+            self.since_activity = np.zeros(len(tiles), dtype=np.int32)
+            self.reference = small
+            return tiles
+        
+        motion = self._tile_motion(small, frame.shape, tiles)
+        self.reference = small
+        
+        self.since_inferred += 1
+        self.since_activity += 1
+        self.since_activity[motion] = 0
+        active = (self.since_activity <= self.hold_frames) | (self.since_inferred >= self.revisit_interval)
+        self.since_inferred[active] = 0
+        
+        return [tiles[index] for index in np.flatnonzero(active)]
+    
+    def update(self, detections, frame_shape, output_size=None):
+        """
+        Marca os tiles que contêm detecções (mantidos ativos nos próximos keyframes)
+        
+        Args:
+            detections (Detections): Detecções do keyframe
+            frame_shape (tuple): Formato (altura, largura, ...) do frame original
+            output_size (tuple): (largura, altura) das caixas (padrão: frame original)
+        """
+        if not self.skip_idle or self.tiles is None or len(detections) == 0:
+            return
+        
+        height, width = frame_shape[:2]
+        output_width, output_height = output_size or (width, height)
+        centers = (detections.xyxy[:, :2] + detections.xyxy[:, 2:]) / 2
+        centers *= (width / output_width, height / output_height)
+        
+        tiles = np.asarray(self.tiles, dtype=np.float32)
+        inside = (
+            (centers[:, None, 0] >= tiles[None, :, 0]) & (centers[:, None, 0] < tiles[None, :, 2]) &
+            (centers[:, None, 1] >= tiles[None, :, 1]) & (centers[:, None, 1] < tiles[None, :, 3])
+        )
+        self.since_activity[inside.any(axis=0)] = 0
+    
+    def _downscale(self, frame):
+        """Converte o frame para tons de cinza em resolução reduzida"""
+        height, width = frame.shape[:2]
+        scale_width = min(self.scale_width, width)
+        scale_height = max(1, round(height * scale_width / width))
+        
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, (scale_width, scale_height), interpolation=cv2.INTER_AREA)
+    
+    def _tile_motion(self, small, frame_shape, tiles):
+        """
+        Mede em quais tiles houve movimento em relação ao keyframe anterior
+        
+        Args:
+            small: Frame reduzido em tons de cinza
+            frame_shape (tuple): Formato do frame original
+            tiles (list): Tiles em pixels do frame original
+        
+        Returns:
+            numpy.ndarray: Máscara booleana por tile
+        """
+        diff = cv2.absdiff(small, self.reference)
+        blocks_x = max(1, diff.shape[1] // self.block_size)
+        blocks_y = max(1, diff.shape[0] // self.block_size)
+        changed = cv2.resize(diff, (blocks_x, blocks_y), interpolation=cv2.INTER_AREA) > self.motion_pixel_threshold
+        
+        # Soma acumulada 2D: blocos alterados de cada tile em tempo constante
+        integral = np.pad(changed.astype(np.int32).cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+        scale_x = blocks_x / frame_shape[1]
+        scale_y = blocks_y / frame_shape[0]
+        
+        motion = np.zeros(len(tiles), dtype=bool)
+        for index, (x1, y1, x2, y2) in enumerate(tiles):
+            bx1, by1 = int(x1 * scale_x), int(y1 * scale_y)
+            bx2 = max(bx1 + 1, int(np.ceil(x2 * scale_x)))
+            by2 = max(by1 + 1, int(np.ceil(y2 * scale_y)))
+            count = integral[by2, bx2] - integral[by1, bx2] - integral[by2, bx1] + integral[by1, bx1]
+            motion[index] = count / ((bx2 - bx1) * (by2 - by1)) >= self.motion_threshold
+        
+        return motion
+    
+    def get_state(self):
+        """
+        Retorna o estado do agendador de tiles (para checkpoints)
+        
+        Returns:
+            dict: Grade atual, frame de referência e contadores por tile
+        """
+        state = {"has_reference": self.reference is not None}
+        if self.reference is not None:
+            state["tiles"] = np.asarray(self.tiles, dtype=np.int32)
+            state["reference"] = self.reference
+            state["since_inferred"] = self.since_inferred
+            state["since_activity"] = self.since_activity
+        return state
+    
+    def set_state(self, state):
+        """
+        Restaura o estado salvo por get_state
+        
+        Args:
+            state (dict): Estado do agendador de tiles
+        """
+        if not state["has_reference"]:
+            self.tiles = self.reference = self.since_inferred = self.since_activity = None
+            return
+        
+        self.tiles = [tuple(tile) for tile in np.asarray(state["tiles"]).tolist()]
+        self.reference = np.asarray(state["reference"], dtype=np.uint8)
+        self.since_inferred = np.array(state["since_inferred"], dtype=np.int32)
+        self.since_activity = np.array(state["since_activity"], dtype=np.int32)
+    
+    def get_signature(self):
+        """
+        Retorna os parâmetros que afetam as detecções (para chaves de cache e checkpoints)
+        
+        Returns:
+            dict: Parâmetros do agendador
+        """
+        return {
+            "tile_size": self.tile_size,
+            "overlap": self.overlap,
+            "merge_threshold": self.merge_threshold,
+            "skip_idle": self.skip_idle,
+            "hold_frames": self.hold_frames,
+            "revisit_interval": self.revisit_interval,
+            "motion_threshold": self.motion_threshold,
+            "motion_pixel_threshold": self.motion_pixel_threshold
+        }
+
+
+def _tile_starts(length, tile_length, overlap):
+    """
+    Calcula as posições iniciais dos tiles ao longo de um eixo
+    
+    Args:
+        length (int): Comprimento do eixo
+        tile_length (int): Comprimento do tile
+        overlap (float): Sobreposição entre tiles (fração)
+    
+    Returns:
+        list: Posições iniciais, a última alinhada ao fim do eixo
+    """
+    step = max(1, int(tile_length * (1 - overlap)))
+    starts = list(range(0, max(1, length - tile_length + 1), step))
+    if starts[-1] + tile_length < length:
+        starts.append(length - tile_length)
+    return starts
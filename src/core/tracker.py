@@ -0,0 +1,282 @@
+"""
+Módulo de rastreamento leve para preencher frames entre detecções
+"""
+import numpy as np
+from .detections import Detections, match_boxes
+
+
+class BoxTracker:
+    """Rastreador de caixas por associação de IoU e velocidade constante"""
+    
+    def __init__(self, iou_threshold=0.3, smoothing=0.5):
+        """
+        Inicializa o rastreador
+        
+        Args:
+            iou_threshold (float): IoU mínima para associar detecção a uma trilha
+            smoothing (float): Peso da nova velocidade medida (0-1)
+        """
+        self.iou_threshold = iou_threshold
+        self.smoothing = smoothing
+        self.frame_size = None
+        
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.velocities = np.zeros((0, 4), dtype=np.float32)
+        self.conf = np.zeros(0, dtype=np.float32)
+        self.cls = np.zeros(0, dtype=np.int32)
+        self.frames_since_detection = 0
+        self.initialized = False
+    
+    def update(self, detections):
+        """
+        Substitui as trilhas pelas detecções de um keyframe
+        
+        A velocidade de cada trilha associada é medida pelo deslocamento desde
+        a última detecção, dividido pelo número de frames decorridos.
+        
+        Args:
+            detections (Detections): Detecções do keyframe
+        """
+        velocities = np.zeros((len(detections), 4), dtype=np.float32)
+        
+        if len(self.boxes) and len(detections):
+            # Associar com as posições previstas para o frame atual
+            predicted = self.boxes + self.velocities * self.frames_since_detection
+            gap = max(1, self.frames_since_detection)
+            
+            for track_index, det_index, _ in match_boxes(predicted, detections.xyxy, self.iou_threshold):
+                measured = (detections.xyxy[det_index] - self.boxes[track_index]) / gap
+                velocities[det_index] = (
+                    self.smoothing * measured + (1 - self.smoothing) * self.velocities[track_index]
+                )
+        
+        self.boxes = detections.xyxy.copy()
+        self.velocities = velocities
+        self.conf = detections.conf.copy()
+        self.cls = detections.cls.copy()
+        self.frames_since_detection = 0
+        self.initialized = True
+    
+    def predict(self):
+        """
+        Avança as trilhas um frame e retorna as caixas previstas
+        
+        Returns:
+            Detections: Detecções previstas para o próximo frame
+        """
+        self.frames_since_detection += 1
+        boxes = self.boxes + self.velocities * self.frames_since_detection
+        
+        if self.frame_size is not None:
+            width, height = self.frame_size
+            boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, width)
+            boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, height)
+        
+        # Descartar trilhas que saíram do frame
+        visible = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+        return Detections(boxes[visible], self.conf[visible], self.cls[visible])
+    
+    def get_state(self):
+        """
+        Retorna o estado do rastreador (para checkpoints)
+        
+        Returns:
+            dict: Trilhas, velocidades e contadores
+        """
+        return {
+            "boxes": self.boxes,
+            "velocities": self.velocities,
+            "conf": self.conf,
+            "cls": self.cls,
+            "frames_since_detection": self.frames_since_detection,
+            "initialized": self.initialized
+        }
+    
+    def set_state(self, state):
+        """
+        Restaura o estado salvo por get_state
+        
+        Args:
+            state (dict): Estado do rastreador
+        """
+        self.boxes = np.asarray(state["boxes"], dtype=np.float32).reshape(-1, 4)
+        self.velocities = np.asarray(state["velocities"], dtype=np.float32).reshape(-1, 4)
+        self.conf = np.asarray(state["conf"], dtype=np.float32)
+        self.cls = np.asarray(state["cls"], dtype=np.int32)
+        self.frames_since_detection = int(state["frames_since_detection"])
+        self.initialized = bool(state["initialized"])
+
+
+class KeyframeScheduler:
+    """Decide em quais frames executar o detector e mede o desvio do rastreador"""
+    
+    def __init__(self, interval=1, adaptive=False, max_interval=15, min_iou=0.5):
+        """
+        Inicializa o agendador
+        
+        Args:
+            interval (int): Intervalo inicial (ou fixo) entre keyframes
+            adaptive (bool): Se True, ajusta o intervalo conforme o desvio medido
+            max_interval (int): Intervalo máximo no modo adaptativo
+            min_iou (float): IoU média mínima para considerar a previsão confiável
+        """
+        self.interval = max(1, int(interval))
+        self.adaptive = adaptive
+        self.max_interval = max(self.interval, int(max_interval))
+        self.min_iou = min_iou
+        
+        self.frames = 0
+        self.keyframes = 0
+        self.gated = 0
+        self.tiles_total = 0
+        self.tiles_inferred = 0
+        self._frames_since_keyframe = None
+        
+        # Desvio de contagem entre previsão do rastreador e detecção
+        self.drift_samples = 0
+        self.total_drift = 0
+        self.max_drift = 0
+    
+    @classmethod
+    def merge(cls, schedulers):
+        """
+        Soma as métricas de agendadores de segmentos de um mesmo vídeo
+        
+        Args:
+            schedulers (list): Agendadores dos segmentos
+            
+        Returns:
+            KeyframeScheduler: Agendador com as métricas combinadas
+        """
+        merged = cls()
+        for scheduler in schedulers:
+            merged.frames += scheduler.frames
+            merged.keyframes += scheduler.keyframes
+            merged.gated += scheduler.gated
+            merged.tiles_total += scheduler.tiles_total
+            merged.tiles_inferred += scheduler.tiles_inferred
+            merged.drift_samples += scheduler.drift_samples
+            merged.total_drift += scheduler.total_drift
+            merged.max_drift = max(merged.max_drift, scheduler.max_drift)
+        
+        return merged
+    
+    def get_state(self):
+        """
+        Retorna o estado do agendador (para checkpoints)
+        
+        Returns:
+            dict: Intervalo atual e métricas acumuladas
+        """
+        return {
+            "interval": self.interval,
+            "frames": self.frames,
+            "keyframes": self.keyframes,
+            "gated": self.gated,
+            "tiles_total": self.tiles_total,
+            "tiles_inferred": self.tiles_inferred,
+            "frames_since_keyframe": self._frames_since_keyframe,
+            "drift_samples": self.drift_samples,
+            "total_drift": self.total_drift,
+            "max_drift": self.max_drift
+        }
+    
+    def set_state(self, state):
+        """
+        Restaura o estado salvo por get_state
+        
+        Args:
+            state (dict): Estado do agendador
+        """
+        self.interval = state["interval"]
+        self.frames = state["frames"]
+        self.keyframes = state["keyframes"]
+        self.gated = state.get("gated", 0)
+        self.tiles_total = state.get("tiles_total", 0)
+        self.tiles_inferred = state.get("tiles_inferred", 0)
+        self._frames_since_keyframe = state["frames_since_keyframe"]
+        self.drift_samples = state["drift_samples"]
+        self.total_drift = state["total_drift"]
+        self.max_drift = state["max_drift"]
+    
+    def next_is_keyframe(self):
+        """
+        Registra um novo frame e informa se ele deve passar pelo detector
+        
+        Returns:
+            bool: True se o frame é um keyframe
+        """
+        self.frames += 1
+        
+        if self._frames_since_keyframe is None or self._frames_since_keyframe + 1 >= self.interval:
+            self._frames_since_keyframe = 0
+            self.keyframes += 1
+            return True
+        
+        self._frames_since_keyframe += 1
+        return False
+    
+    def skip_keyframe(self):
+        """Registra que o keyframe atual reaproveitou detecções por falta de movimento"""
+        self.keyframes -= 1
+        self.gated += 1
+    
+    def report_tiles(self, inferred, total):
+        """
+        Registra quantos tiles de um keyframe passaram pelo detector
+        
+        Args:
+            inferred (int): Tiles inferidos
+            total (int): Tiles da grade
+        """
+        self.tiles_inferred += inferred
+        self.tiles_total += total
+    
+    def report(self, predicted, detected):
+        """
+        Compara a previsão do rastreador com a detecção de um keyframe
+        
+        Args:
+            predicted (Detections): Caixas previstas pelo rastreador
+            detected (Detections): Caixas detectadas pelo modelo
+        """
+        drift = abs(len(predicted) - len(detected))
+        self.drift_samples += 1
+        self.total_drift += drift
+        self.max_drift = max(self.max_drift, drift)
+        
+        if not self.adaptive:
+            return
+        
+        matches = match_boxes(predicted.xyxy, detected.xyxy)
+        mean_iou = sum(m[2] for m in matches) / max(len(predicted), len(detected), 1)
+        
+        # Cena estável: espaçar keyframes; cena mudando: aproximar
+        if drift == 0 and (mean_iou >= self.min_iou or len(detected) == 0):
+            self.interval = min(self.max_interval, self.interval + 1)
+        else:
+            self.interval = max(1, self.interval // 2)
+    
+    def get_average_drift(self):
+        """Retorna o desvio médio de contagem nos keyframes"""
+        if self.drift_samples == 0:
+            return 0
+        return self.total_drift / self.drift_samples
+    
+    def get_gated_ratio(self):
+        """Retorna a fração de frames que reaproveitaram detecções por falta de movimento"""
+        if self.frames == 0:
+            return 0
+        return self.gated / self.frames
+    
+    def get_tile_ratio(self):
+        """Retorna a fração de tiles que passaram pelo detector"""
+        if self.tiles_total == 0:
+            return 0
+        return self.tiles_inferred / self.tiles_total
+    
+    def get_inference_ratio(self):
+        """Retorna a fração de frames que passaram pelo detector"""
+        if self.frames == 0:
+            return 0
+        return self.keyframes / self.frames
@@ -0,0 +1,198 @@
+"""
+Módulo de zonas de interesse (ROI) para inferência recortada e contagem por zona
+"""
+import numpy as np
+from .detections import Detections, merge_overlapping
+
+
+class ZoneSet:
+    """Conjunto de polígonos de interesse, em coordenadas normalizadas (0-1) do frame"""
+    
+    def __init__(self, zones, crop_inference=True, margin=0.02):
+        """
+        Inicializa as zonas
+        
+        Args:
+            zones (list): Dicionários com "name" e "polygon" (lista de [x, y] em 0-1)
+            crop_inference (bool): Se True, o detector roda só nos recortes das zonas
+            margin (float): Margem adicionada aos recortes, em fração do frame
+                (evita cortar pessoas na borda da zona)
+        
+        Raises:
+            ValueError: Se alguma zona tiver menos de 3 vértices
+        """
+        self.names = []
+        self.polygons = []
+        for index, zone in enumerate(zones):
+            polygon = np.asarray(zone["polygon"], dtype=np.float32).reshape(-1, 2)
+            if len(polygon) < 3:
+                raise ValueError(f"Zona {zone.get('name', index)} precisa de pelo menos 3 vértices")
+            self.names.append(zone.get("name", f"zona_{index + 1}"))
+            self.polygons.append(np.clip(polygon, 0, 1))
+        
+        self.crop_inference = crop_inference
+        self.margin = margin
+        self._regions = {}
+    
+    @classmethod
+    def from_config(cls, config):
+        """
+        Cria as zonas conforme a seção "zones" do config
+        
+        Args:
+            config (dict): Configurações do projeto
+        
+        Returns:
+            ZoneSet: Zonas configuradas ou None se desabilitadas
+        """
+        zones_config = config.get("zones", {})
+        if not zones_config.get("enabled", False) or not zones_config.get("regions"):
+            return None
+        
+        return cls(
+            zones_config["regions"],
+            zones_config.get("crop_inference", True),
+            zones_config.get("margin", 0.02)
+        )
+    
+    def __len__(self):
+        """Retorna o número de zonas"""
+        return len(self.names)
+    
+    def get_polygons(self, width, height):
+        """
+        Retorna os polígonos em pixels
+        
+        Args:
+            width (int): Largura do frame
+            height (int): Altura do frame
+        
+        Returns:
+            list: Arrays (N, 2) de vértices em pixels
+        """
+        return [polygon * (width, height) for polygon in self.polygons]
+    
+    def get_regions(self, width, height):
+        """
+        Retorna os recortes retangulares que cobrem as zonas, sem sobreposição
+        
+        Retângulos que se sobrepõem são unidos, para que nenhuma pessoa seja
+        detectada duas vezes.
+        
+        Args:
+            width (int): Largura do frame de origem
+            height (int): Altura do frame de origem
+        
+        Returns:
+            list: Retângulos (x1, y1, x2, y2) em pixels
+        """
+        key = (width, height)
+        if key in self._regions:
+            return self._regions[key]
+        
+        rects = []
+        for polygon in self.polygons:
+            x1, y1 = polygon.min(axis=0) - self.margin
+            x2, y2 = polygon.max(axis=0) + self.margin
+            rects.append([
+                max(0, int(np.floor(x1 * width))), max(0, int(np.floor(y1 * height))),
+                min(width, int(np.ceil(x2 * width))), min(height, int(np.ceil(y2 * height)))
+            ])
+        
+        regions = merge_overlapping(rects)
+        self._regions[key] = regions
+        return regions
+    
+    def get_area_ratio(self, width, height):
+        """
+        Retorna a fração do frame coberta pelos recortes de inferência
+        
+        Args:
+            width (int): Largura do frame
+            height (int): Altura do frame
+        
+        Returns:
+            float: Área dos recortes / área do frame
+        """
+        area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in self.get_regions(width, height))
+        return area / (width * height)
+    
+    def assign(self, detections, width, height):
+        """
+        Indica em quais zonas está o centro de cada detecção
+        
+        Args:
+            detections (Detections): Detecções em pixels
+            width (int): Largura do frame das detecções
+            height (int): Altura do frame das detecções
+        
+        Returns:
+            numpy.ndarray: Matriz booleana (detecções, zonas)
+        """
+        centers = (detections.xyxy[:, :2] + detections.xyxy[:, 2:]) / 2 / (width, height)
+        inside = np.zeros((len(detections), len(self.polygons)), dtype=bool)
+        
+        for zone_index, polygon in enumerate(self.polygons):
+            inside[:, zone_index] = _points_in_polygon(centers, polygon)
+        
+        return inside
+    
+    def filter_and_count(self, detections, width, height):
+        """
+        Mantém apenas as detecções dentro de alguma zona e conta por zona
+        
+        Args:
+            detections (Detections): Detecções em pixels
+            width (int): Largura do frame das detecções
+            height (int): Altura do frame das detecções
+        
+        Returns:
+            tuple: (Detections dentro das zonas, lista de contagens por zona)
+        """
+        if len(detections) == 0:
+            return detections, [0] * len(self.names)
+        
+        inside = self.assign(detections, width, height)
+        keep = inside.any(axis=1)
+        filtered = Detections(detections.xyxy[keep], detections.conf[keep], detections.cls[keep])
+        
+        return filtered, inside.sum(axis=0).tolist()
+    
+    def get_signature(self):
+        """
+        Retorna a configuração das zonas (para chaves de cache e checkpoints)
+        
+        Returns:
+            dict: Nomes, polígonos e modo de inferência
+        """
+        return {
+            "names": self.names,
+            "polygons": [polygon.round(4).tolist() for polygon in self.polygons],
+            "crop_inference": self.crop_inference,
+            "margin": self.margin
+        }
+
+
+def _points_in_polygon(points, polygon):
+    """
+    Testa pontos contra um polígono pelo método do raio (vetorizado)
+    
+    Args:
+        points: Pontos (N, 2)
+        polygon: Vértices (M, 2)
+    
+    Returns:
+        numpy.ndarray: Máscara booleana (N,)
+    """
+    x = points[:, 0][:, None]
+    y = points[:, 1][:, None]
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    
+    # Arestas cruzadas por um raio horizontal partindo de cada ponto
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        intersect_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    crossings = crosses & (x < intersect_x)
+    
+    return (crossings.sum(axis=1) % 2) == 1
@@ -0,0 +1,574 @@
+"""
+Módulo de benchmark reprodutível com vídeos e imagens sintéticos
+"""
+import contextlib
+import cv2
+import json
+import multiprocessing
+import os
+import platform
+import time
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: pico de memória não disponível
+    resource = None
+
+
+# Modos avaliados: sobrescritas aplicadas ao config do projeto em cada caso
+MODES = {
+    "padrão": {},
+    "sem_pipeline": {"processing": {"pipeline": False}},
+    "keyframe": {"processing": {"detect_interval": 3}},
+    "movimento": {"processing": {"motion_gating": True}},
+    "tiles": {"tiling": {"enabled": True}},
+    "zonas": {"zones": {"enabled": True}},
+    "cascata": {"model": {"cascade": {"enabled": True}}},
+    "segmentos": {"processing": {"segments": 2}}
+}
+
+# Métricas comparadas com a baseline: (nome, True se maior é melhor)
+COMPARED_METRICS = (("fps", True), ("startup_s", False), ("first_frame_s", False), ("peak_rss_mb", False))
+
+
+class Benchmark:
+    """Mede FPS, latência por estágio, pico de memória e tempo de início em dados sintéticos"""
+    
+    def __init__(self, config):
+        """
+        Inicializa o benchmark
+        
+        Args:
+            config (dict): Configurações do projeto
+        """
+        self.config = config
+        benchmark_config = config.get("benchmark", {})
+        
+        self.directory = benchmark_config.get("directory", "./data/benchmark")
+        self.resolutions = [tuple(size) for size in benchmark_config.get("resolutions", [[640, 360], [1280, 720]])]
+        self.frames = max(1, int(benchmark_config.get("frames", 60)))
+        self.densities = [int(density) for density in benchmark_config.get("densities", [3, 20])]
+        self.images = max(1, int(benchmark_config.get("images", 8)))
+        self.modes = benchmark_config.get("modes", ["padrão", "keyframe", "movimento", "tiles", "zonas"])
+        self.seed = int(benchmark_config.get("seed", 0))
+        self.threads = int(benchmark_config.get("threads", 0)) or os.cpu_count() or 1
+        self.tolerance = float(benchmark_config.get("tolerance", 0.2))
+        self.baseline_path = benchmark_config.get("baseline", os.path.join(self.directory, "baseline.json"))
+        
+        # Arquitetura sem pesos treinados (".yaml") roda sem rede; mede velocidade, não acurácia
+        self.weights = benchmark_config.get("weights", "yolo11n.yaml")
+        
+        unknown = [mode for mode in self.modes if mode not in MODES]
+        if unknown:
+            raise ValueError(f"Modos de benchmark desconhecidos: {', '.join(unknown)}")
+    
+    def run(self):
+        """
+        Gera os dados sintéticos, executa os casos e compara com a baseline
+        
+        Cada caso roda em um processo novo, então o tempo de início e o pico de
+        memória não são afetados pelos casos anteriores. Se não houver baseline,
+        os resultados desta execução (sem casos com erro) passam a ser a baseline.
+        
+        Returns:
+            dict: Resultados, regressões e "passed" (False se algum caso falhou
+                ou regrediu além da tolerância)
+        """
+        cases = self._build_cases()
+        print(f"\nExecutando {len(cases)} caso(s) de benchmark ({self.threads} thread(s))...\n")
+        
+        case_results = []
+        for i, case in enumerate(cases, 1):
+            result = dict(_run_isolated(case), name=case["name"])
+            case_results.append(result)
+            
+            if "error" in result:
+                print(f"  [{i}/{len(cases)}] {case['name']}: ✗ {result['error']}")
+            else:
+                first_frame = f" | 1º frame {result['first_frame_s']:.2f}s" if result["first_frame_s"] is not None else ""
+                print(f"  [{i}/{len(cases)}] {case['name']}: {result['fps']:.1f} FPS | "
+                      f"início {result['startup_s']:.2f}s{first_frame} | pico {result['peak_rss_mb'] or 0:.0f}MB")
+        
+        results = {
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "environment": self._environment(),
+            "cases": case_results
+        }
+        
+        results_path = os.path.join(self.directory, "results.json")
+        _save_json(results_path, results)
+        print(f"\nResultados salvos em: {results_path}")
+        
+        failed = [result["name"] for result in case_results if "error" in result]
+        regressions = []
+        if os.path.exists(self.baseline_path):
+            with open(self.baseline_path, "r", encoding="utf-8") as f:
+                regressions = self.compare(results, json.load(f))
+        elif not failed:
+            _save_json(self.baseline_path, results)
+            print(f"Baseline criada em: {self.baseline_path}")
+        
+        self._print_summary(failed, regressions)
+        
+        return {
+            "results_path": results_path,
+            "results": results,
+            "failed": failed,
+            "regressions": regressions,
+            "passed": not failed and not regressions
+        }
+    
+    def compare(self, results, baseline):
+        """
+        Compara os resultados com a baseline
+        
+        Casos ausentes na baseline (ou com erro nela) não são comparados.
+        
+        Args:
+            results (dict): Resultados desta execução
+            baseline (dict): Resultados de referência
+        
+        Returns:
+            list: Descrição de cada métrica que piorou além da tolerância
+        """
+        baseline_cases = {case["name"]: case for case in baseline.get("cases", []) if "error" not in case}
+        regressions = []
+        
+        for case in results["cases"]:
+            reference = baseline_cases.get(case["name"])
+            if reference is None or "error" in case:
+                continue
+            
+            for metric, higher_is_better in COMPARED_METRICS:
+                value, expected = case.get(metric), reference.get(metric)
+                if value is None or not expected:
+                    continue
+                
+                change = (value - expected) / expected
+                if (-change if higher_is_better else change) > self.tolerance:
+                    regressions.append(
+                        f"{case['name']}: {metric} {value:.2f} (baseline {expected:.2f}, {change * 100:+.1f}%)"
+                    )
+        
+        return regressions
+    
+    def _build_cases(self):
+        """
+        Gera os dados sintéticos (se necessário) e monta a lista de casos
+        
+        Returns:
+            list: Casos (nome, tipo, config e entrada)
+        """
+        cases = []
+        for width, height in self.resolutions:
+            for density in self.densities:
+                suffix = f"{width}x{height}/{density}p"
+                video_path = self._synthetic_video(width, height, density)
+                image_directory = self._synthetic_images(width, height, density)
+                
+                for mode in self.modes:
+                    cases.append({
+                        "name": f"video/{mode}/{suffix}",
+                        "kind": "video",
+                        "config": self._case_config(mode, width, height, f"video_{mode}"),
+                        "input": video_path,
+                        "threads": self.threads
+                    })
+                
+                cases.append({
+                    "name": f"detector/{suffix}",
+                    "kind": "detector",
+                    "config": self._case_config("padrão", width, height, "detector"),
+                    "input": video_path,
+                    "threads": self.threads
+                })
+                
+                config = self._case_config("padrão", width, height, "imagens")
+                config["image_input_directory"] = image_directory
+                cases.append({
+                    "name": f"imagens/{suffix}",
+                    "kind": "images",
+                    "config": config,
+                    "input": image_directory,
+                    "threads": self.threads
+                })
+        
+        return cases
+    
+    def _case_config(self, mode, width, height, output_name):
+        """
+        Monta o config de um caso: modo, pesos do benchmark e saídas isoladas
+        
+        Args:
+            mode (str): Nome do modo em MODES
+            width (int): Largura de saída
+            height (int): Altura de saída
+            output_name (str): Subpasta de saída do caso
+        
+        Returns:
+            dict: Config do caso
+        """
+        config = _merge_config(self.config, MODES[mode])
+        output_directory = os.path.join(self.directory, "output", output_name)
+        
+        config["model"]["weights"] = self.weights
+        config["model"].setdefault("cascade", {})["weights"] = self.weights
+        config["video_output_directory"] = output_directory
+        config["image_output_directory"] = output_directory
+        config["video_dimensions"] = {"width": width, "height": height}
+        config["image_dimensions"] = {"width": width, "height": height}
+        
+        # Medir sempre o processamento completo, sem atalhos entre execuções
+        config["cache"] = dict(config.get("cache", {}), enabled=False)
+        config["processing"] = dict(config.get("processing", {}), checkpoint_interval=0)
+        config["stats"] = dict(config.get("stats", {}), frame_export=[])
+        config["profiling"] = {"enabled": True, "json_report": False}
+        
+        return config
+    
+    def _synthetic_video(self, width, height, density):
+        """
+        Gera (uma única vez) o vídeo sintético de uma resolução e densidade
+        
+        Args:
+            width (int): Largura do vídeo
+            height (int): Altura do vídeo
+            density (int): Pessoas por frame
+        
+        Returns:
+            str: Caminho do vídeo
+        """
+        video_path = os.path.join(
+            self.directory, "inputs", f"video_{width}x{height}_{self.frames}f_{density}p_s{self.seed}.mp4"
+        )
+        if os.path.exists(video_path):
+            return video_path
+        
+        os.makedirs(os.path.dirname(video_path), exist_ok=True)
+        scene = SyntheticScene(width, height, density, self.seed)
+        
+        # Arquivo temporário: uma geração interrompida não vira entrada válida
+        temp_path = f"{video_path}.tmp.mp4"
+        writer = cv2.VideoWriter(temp_path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (width, height))
+        for index in range(self.frames):
+            writer.write(scene.render(index))
+        writer.release()
+        os.replace(temp_path, video_path)
+        
+        return video_path
+    
+    def _synthetic_images(self, width, height, density):
+        """
+        Gera (uma única vez) a pasta de imagens sintéticas de uma resolução e densidade
+        
+        Args:
+            width (int): Largura das imagens
+            height (int): Altura das imagens
+            density (int): Pessoas por imagem
+        
+        Returns:
+            str: Caminho da pasta
+        """
+        image_directory = os.path.join(
+            self.directory, "inputs", f"images_{width}x{height}_{self.images}i_{density}p_s{self.seed}"
+        )
+        if os.path.isdir(image_directory):
+            return image_directory
+        
+        temp_directory = f"{image_directory}.tmp"
+        os.makedirs(temp_directory, exist_ok=True)
+        for index in range(self.images):
+            scene = SyntheticScene(width, height, density, self.seed + 1000 + index)
+            cv2.imwrite(os.path.join(temp_directory, f"img_{index:03d}.jpg"), scene.render(0))
+        os.replace(temp_directory, image_directory)
+        
+        return image_directory
+    
+    def _environment(self):
+        """
+        Descreve a máquina e as versões usadas (para comparar baselines)
+        
+        Returns:
+            dict: Plataforma, versões e parâmetros do benchmark
+        """
+        try:
+            import torch
+            torch_version = torch.__version__
+        except ImportError:
+            torch_version = None
+        
+        return {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "torch": torch_version,
+            "cpu_count": os.cpu_count(),
+            "threads": self.threads,
+            "weights": self.weights,
+            "backend": self.config["model"].get("backend", "torch"),
+            "frames": self.frames,
+            "images": self.images,
+            "seed": self.seed
+        }
+    
+    def _print_summary(self, failed, regressions):
+        """
+        Imprime o resultado da comparação
+        
+        Args:
+            failed (list): Casos que falharam
+            regressions (list): Regressões encontradas
+        """
+        print("\n" + "=" * 60)
+        print("RESUMO DO BENCHMARK")
+        print("=" * 60)
+        
+        if failed:
+            print(f"\n✗ {len(failed)} caso(s) falharam:")
+            for name in failed:
+                print(f"  - {name}")
+        
+        if regressions:
+            print(f"\n✗ {len(regressions)} regressão(ões) acima de {self.tolerance * 100:.0f}%:")
+            for regression in regressions:
+                print(f"  - {regression}")
+        
+        if not failed and not regressions:
+            print(f"\n✓ Nenhuma regressão acima de {self.tolerance * 100:.0f}%")
+        
+        print("=" * 60 + "\n")
+
+
+class SyntheticScene:
+    """Cena sintética determinística: fundo texturizado e pessoas em movimento retilíneo"""
+    
+    def __init__(self, width, height, density, seed=0):
+        """
+        Sorteia o fundo e as pessoas da cena
+        
+        Args:
+            width (int): Largura dos frames
+            height (int): Altura dos frames
+            density (int): Número de pessoas
+            seed (int): Semente do gerador (mesma semente = mesmos frames)
+        """
+        self.width = width
+        self.height = height
+        rng = np.random.default_rng([seed, width, height, density])
+        
+        # Fundo: gradiente com ruído suavizado, parecido com terreno visto de cima
+        gradient = np.linspace(70, 150, width, dtype=np.float32)[None, :, None]
+        noise = cv2.GaussianBlur(rng.normal(0, 25, (height, width, 3)).astype(np.float32), (0, 0), 3)
+        tint = np.array([0.8, 1.0, 0.9], dtype=np.float32)
+        self.background = np.clip(gradient * tint + noise, 0, 255).astype(np.uint8)
+        
+        # Pessoas: posição, velocidade (px/frame), tamanho e cor
+        self.positions = rng.uniform(0, 1, (density, 2)) * (width, height)
+        self.velocities = rng.uniform(-4, 4, (density, 2))
+        self.sizes = rng.uniform(0.04, 0.09, density) * height
+        self.colors = rng.integers(0, 256, (density, 3))
+    
+    def render(self, index):
+        """
+        Desenha o frame de um instante
+        
+        Args:
+            index (int): Índice do frame
+        
+        Returns:
+            numpy.ndarray: Frame BGR
+        """
+        frame = self.background.copy()
+        
+        # Movimento com reflexão nas bordas (onda triangular: sem estado entre frames)
+        limits = np.array([self.width, self.height], dtype=np.float64)
+        positions = np.mod(self.positions + self.velocities * index, 2 * limits)
+        positions = limits - np.abs(positions - limits)
+        
+        for (x, y), size, color in zip(positions, self.sizes, self.colors.tolist()):
+            body = (max(1, int(size * 0.22)), max(1, int(size * 0.4)))
+            head = max(1, int(size * 0.14))
+            cv2.ellipse(frame, (int(x), int(y)), body, 0, 0, 360, color, -1)
+            cv2.circle(frame, (int(x), int(y - body[1] - head)), head, (60, 80, 110), -1)
+        
+        return frame
+
+
+def _merge_config(base, overrides):
+    """
+    Combina dicionários de config recursivamente, sem alterar os originais
+    
+    Args:
+        base (dict): Config base
+        overrides (dict): Valores que substituem os da base
+    
+    Returns:
+        dict: Config combinado
+    """
+    merged = {key: _merge_config(value, {}) if isinstance(value, dict) else value for key, value in base.items()}
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _save_json(output_path, data):
+    """Salva um dicionário em JSON, criando a pasta se necessário"""
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def _peak_rss_mb():
+    """Retorna o pico de memória residente do processo e de seus filhos, em MB"""
+    if resource is None:
+        return None
+    
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024 if platform.system() == "Darwin" else 1024)
+
+
+def _run_isolated(case):
+    """
+    Executa um caso em um processo novo
+    
+    Um Process comum (e não um Pool, cujos workers são daemon) permite que o
+    modo "segmentos" crie seus próprios processos.
+    
+    Args:
+        case (dict): Caso montado por Benchmark._build_cases
+    
+    Returns:
+        dict: Métricas do caso ou {"error": mensagem}
+    """
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_case_worker, args=(case, sender))
+    process.start()
+    sender.close()
+    
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = None
+    process.join()
+    
+    if result is None:
+        return {"error": f"processo encerrado com código {process.exitcode}"}
+    return result
+
+
+def _case_worker(case, sender):
+    """Ponto de entrada do processo de um caso: envia as métricas ou o erro"""
+    try:
+        result = _run_case(case)
+    except Exception as e:
+        result = {"error": f"{type(e).__name__}: {e}"}
+    sender.send(result)
+    sender.close()
+
+
+def _run_case(case):
+    """
+    Mede um caso no processo atual
+    
+    O tempo de início vai da entrada no processo (antes dos imports pesados)
+    até o processador pronto; o tempo até o primeiro frame, até o primeiro
+    frame (ou imagem) escrito, incluindo o carregamento do modelo.
+    
+    Args:
+        case (dict): Caso montado por Benchmark._build_cases
+    
+    Returns:
+        dict: Frames, tempo, FPS, tempos de início e até o primeiro frame, pico
+            de memória e latências por estágio
+    """
+    start = time.perf_counter()
+    
+    from .parallel import limit_threads
+    limit_threads(case["threads"])
+    
+    config = case["config"]
+    
+    # A saída dos processadores não interessa ao benchmark
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if case["kind"] == "video":
+            from .video_processor import VideoProcessor
+            processor = VideoProcessor(config)
+            startup = time.perf_counter() - start
+            
+            run_start = time.perf_counter()
+            result = processor.process_single(case["input"], resume=False)
+            elapsed = time.perf_counter() - run_start
+            
+            if result is None:
+                raise RuntimeError(f"Erro ao abrir vídeo: {case['input']}")
+            frames = result["stats"].frame_count
+            profiler = result["stats"].profiler
+            first_frame_at = processor._first_frame_at
+        elif case["kind"] == "images":
+            from .image_processor import ImageProcessor
+            processor = ImageProcessor(config)
+            startup = time.perf_counter() - start
+            
+            run_start = time.perf_counter()
+            processor.process_all()
+            elapsed = time.perf_counter() - run_start
+            
+            frames = len(processor.get_image_files())
+            profiler = processor.profiler
+            first_frame_at = processor._first_result_at
+        else:
+            from ..core.detector import PeopleDetector
+            from ..utils.profiler import StageProfiler
+            batch_size = max(1, int(config.get("processing", {}).get("batch_size", 1)))
+            detector = PeopleDetector(config["model"], batch_size)
+            startup = time.perf_counter() - start
+            
+            # Apenas o detector: frames decodificados antes da medição
+            video = cv2.VideoCapture(case["input"])
+            decoded = []
+            while True:
+                ret, frame = video.read()
+                if not ret:
+                    break
+                decoded.append(frame)
+            video.release()
+            
+            profiler = StageProfiler()
+            detector.set_profiler(profiler)
+            output_size = (config["video_dimensions"]["width"], config["video_dimensions"]["height"])
+            
+            run_start = time.perf_counter()
+            for index in range(0, len(decoded), batch_size):
+                detector.detect_batch(decoded[index:index + batch_size], output_size)
+            elapsed = time.perf_counter() - run_start
+            
+            # Frames decodificados antes da medição: sem tempo até o primeiro frame
+            first_frame_at = None
+            
+            frames = len(decoded)
+    
+    summary = profiler.summary() if profiler is not None else {"stages": {}, "queues": {}}
+    
+    return {
+        "frames": frames,
+        "elapsed_s": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "startup_s": startup,
+        "first_frame_s": first_frame_at - start if first_frame_at is not None else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "stages": {
+            stage: {key: values[key] for key in ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "count")}
+            for stage, values in summary["stages"].items()
+        },
+        "queues": summary["queues"]
+    }
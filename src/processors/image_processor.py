@@ -3,9 +3,17 @@ Módulo para processamento de imagens
 """
 import cv2
 import os
-from ..core.detector import PeopleDetector
-from ..utils.annotations import draw_detections
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from ..core.detector import PeopleDetector, detector_signature
+from ..core.registry import get_detector
+from ..core.detection_cache import DetectionSequence, create_detection_cache
+from ..core.zones import ZoneSet
+from ..core.tiling import TileScheduler
+from ..utils.annotations import draw_detections, draw_zones
 from ..utils.stats import StatisticsTracker
+from ..utils.profiler import StageProfiler
 
 
 class ImageProcessor:
@@ -19,17 +27,58 @@ class ImageProcessor:
             config (dict): Configurações do projeto
         """
         self.config = config
-        self.detector = PeopleDetector(config["model"])
         self.image_input_directory = config["image_input_directory"]
         self.image_output_directory = config["image_output_directory"]
         self.image_extensions = config["image_extensions"]
         self.width = config["image_dimensions"]["width"]
         self.height = config["image_dimensions"]["height"]
         
+        # Modo streaming para pastas muito grandes
+        image_processing_config = config.get("image_processing", {})
+        self.streaming = image_processing_config.get("streaming", False)
+        self.recursive = image_processing_config.get("recursive", False)
+        self.batch_size = max(1, int(image_processing_config.get("batch_size", 8)))
+        self.decode_threads = max(1, int(image_processing_config.get("decode_threads", 4)))
+        self.encode_threads = max(1, int(image_processing_config.get("encode_threads", 4)))
+        # Sem imagens de saída: apenas contagem e estatísticas (sem anotar nem codificar)
+        self.write_images = image_processing_config.get("write_images", True)
+        self.cache = create_detection_cache(config)
+        
+        # Zonas de interesse (em coordenadas normalizadas, valem para qualquer imagem)
+        self.zones = ZoneSet.from_config(config)
+        
+        # Tiles na resolução nativa; imagens avulsas não têm histórico, então todos são inferidos
+        self.tile_scheduler = TileScheduler.from_config(config, skip_idle=False)
+        
+        # Detector compartilhado entre processadores, carregado só na primeira detecção
+        self._detector = None
+        self._started_at = None
+        self._first_result_at = None
+        self._cascade_start = None
+        
+        # Latências por estágio, acumuladas entre as imagens de uma execução
+        profiling_config = config.get("profiling", {})
+        self.profile_json = profiling_config.get("json_report", False)
+        self.profiler = StageProfiler() if profiling_config.get("enabled", True) else None
+        
         # Criar diretório de saída
         os.makedirs(os.path.join(self.image_output_directory, "images"), exist_ok=True)
         os.makedirs(os.path.join(self.image_output_directory, "stats"), exist_ok=True)
     
+    @property
+    def detector(self):
+        """Detector do modelo configurado (carregado no primeiro acesso)"""
+        if self._detector is None:
+            # Lotes só são usados no modo streaming
+            self._detector = get_detector(self.config["model"], self.batch_size if self.streaming else 1)
+        return self._detector
+    
+    def _start_run(self):
+        """Marca o início de uma execução (tempo até a primeira imagem e cascata)"""
+        self._started_at = time.perf_counter()
+        self._first_result_at = None
+        self._cascade_start = self._detector.get_cascade_stats() if self._detector is not None else None
+    
     def get_image_files(self):
         """
         Busca todas as imagens na pasta de entrada
@@ -37,31 +86,69 @@ class ImageProcessor:
         Returns:
             list: Lista de caminhos de imagens encontradas
         """
+        return list(self.iter_image_files())
+    
+    def iter_image_files(self, recursive=None):
+        """
+        Percorre a pasta de entrada sob demanda, sem montar a lista completa
+        
+        Args:
+            recursive (bool): Se True, entra em subpastas (padrão: image_processing.recursive)
+            
+        Yields:
+            str: Caminho de cada imagem encontrada
+        """
+        recursive = self.recursive if recursive is None else recursive
+        
         if not os.path.exists(self.image_input_directory):
             os.makedirs(self.image_input_directory, exist_ok=True)
-            return []
-        
-        image_files = []
-        for file in os.listdir(self.image_input_directory):
-            if any(file.lower().endswith(ext) for ext in self.image_extensions):
-                image_files.append(os.path.join(self.image_input_directory, file))
+            return
         
-        return image_files
+        directories = [self.image_input_directory]
+        while directories:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            directories.append(entry.path)
+                    elif any(entry.name.lower().endswith(ext) for ext in self.image_extensions):
+                        yield entry.path
     
     def process_all(self):
-        """Processa todas as imagens encontradas na pasta de entrada"""
+        """
+        Processa todas as imagens encontradas na pasta de entrada
+        
+        Returns:
+            dict: Resultados processados ("processed"; None no modo em fluxo, que
+                não os guarda), total de imagens processadas ("processed_count"),
+                nomes das imagens que falharam ("failed") e instante da primeira
+                imagem concluída ("first_result_at", em time.perf_counter)
+        """
+        self._start_run()
+        processed_images = []
+        failed_images = []
+        summary = {
+            "processed": processed_images,
+            "processed_count": 0,
+            "failed": failed_images,
+            "first_result_at": None
+        }
+        
+        if self.streaming:
+            summary["processed"] = None
+            summary["processed_count"] = self._process_all_streaming(failed_images)
+            summary["first_result_at"] = self._first_result_at
+            return summary
+        
         image_files = self.get_image_files()
         
         if not image_files:
             print("Nenhuma imagem encontrada na pasta de entrada.")
             print(f"Coloque imagens em: {self.image_input_directory}")
-            return
+            return summary
         
         print(f"\n{len(image_files)} imagem(ns) encontrada(s).\n")
         
-        processed_images = []
-        failed_images = []
-        
         for i, image_path in enumerate(image_files, 1):
             print(f"[{i}/{len(image_files)}] Processando: {os.path.basename(image_path)}")
             
@@ -74,7 +161,12 @@ class ImageProcessor:
                 failed_images.append(os.path.basename(image_path))
         
         # Resumo final
-        self._print_summary(processed_images, failed_images)
+        self._save_profile()
+        self._print_summary(len(processed_images), failed_images, processed_images)
+        
+        summary["processed_count"] = len(processed_images)
+        summary["first_result_at"] = self._first_result_at
+        return summary
     
     def process_single(self, image_path):
         """
@@ -86,34 +178,176 @@ class ImageProcessor:
         Returns:
             dict: Informações sobre a imagem processada
         """
-        # Carregar imagem
-        image = cv2.imread(image_path)
+        # Carregar imagem (na resolução original)
+        image = self._load_image(image_path)
         if image is None:
             print(f"Erro ao abrir imagem: {os.path.basename(image_path)}")
             return None
         
-        # Redimensionar imagem
-        image_resized = cv2.resize(image, (self.width, self.height))
+        # Detectar pessoas (ou reutilizar detecções de execuções anteriores)
+        cache_key, results = self._lookup_cache(image_path)
+        if results is None:
+            self.detector.set_profiler(self.profiler)
+            results = self._detect_batch([image])[0]
+        else:
+            cache_key = None
         
-        # Detectar pessoas
-        results = self.detector.detect(image_resized)
-        people_count = self.detector.count_people(results)
+        return self._save_result(image_path, image, results, cache_key=cache_key)
+    
+    def _lookup_cache(self, image_path):
+        """
+        Busca as detecções de uma imagem no cache
         
-        # Inicializar estatísticas
-        stats = StatisticsTracker()
-        stats.update(people_count)
+        Args:
+            image_path (str): Caminho da imagem
+            
+        Returns:
+            tuple: (chave de cache, Detections ou None); chave None se o cache
+                estiver desabilitado
+        """
+        if self.cache is None:
+            return None, None
         
-        # Anotar imagem
-        annotated_image = draw_detections(
-            image_resized, 
-            results, 
-            people_count,
-            stats.max_people_in_frame,
-            stats.get_elapsed_time()
-        )
+        parameters = self.cache.detector_parameters(detector_signature(self.config["model"]))
+        parameters.update(width=self.width, height=self.height)
+        if self.zones and self.zones.crop_inference:
+            parameters.update(zones=self.zones.get_signature())
+        if self.tile_scheduler is not None:
+            parameters.update(tiling=self.tile_scheduler.get_signature())
+        
+        cache_key = self.cache.make_key(image_path, parameters)
+        cached_detections = self.cache.load(cache_key)
+        
+        return cache_key, cached_detections[0] if cached_detections else None
+    
+    def _detect_batch(self, images):
+        """
+        Detecta pessoas em um lote de imagens, apenas nos recortes das zonas se configurado
+        
+        Recortes dependem do tamanho da imagem, então imagens de tamanhos
+        diferentes formam chamadas separadas. No modo em tiles, os tiles de
+        todas as imagens seguem juntos para o modelo.
+        
+        Args:
+            images (list): Imagens originais
+            
+        Returns:
+            list: Detecções de cada imagem na resolução de saída (Detections)
+        """
+        output_size = (self.width, self.height)
+        crop_zones = self.zones is not None and self.zones.crop_inference
+        
+        if self.tile_scheduler is not None:
+            tiles = [
+                self.tile_scheduler.get_tiles(
+                    image.shape[1], image.shape[0],
+                    self.zones.get_regions(image.shape[1], image.shape[0]) if crop_zones else None
+                )
+                for image in images
+            ]
+            return self.detector.detect_tiles(images, tiles, output_size, self.tile_scheduler.merge_threshold)
+        
+        if not crop_zones:
+            return self.detector.detect_batch(images, output_size)
+        
+        groups = {}
+        for index, image in enumerate(images):
+            groups.setdefault(image.shape, []).append(index)
+        
+        detections = [None] * len(images)
+        for shape, indices in groups.items():
+            regions = self.zones.get_regions(shape[1], shape[0])
+            group_results = self.detector.detect_batch([images[index] for index in indices], output_size, regions)
+            for index, results in zip(indices, group_results):
+                detections[index] = results
+        
+        return detections
+    
+    def _decode_task(self, image_path):
+        """
+        Carrega a imagem e suas detecções em cache (executado no pool de leitura)
+        
+        Args:
+            image_path (str): Caminho da imagem
+            
+        Returns:
+            tuple: (imagem ou None, chave de cache, Detections ou None)
+        """
+        image = self._load_image(image_path)
+        if image is None:
+            return None, None, None
+        
+        cache_key, cached_detections = self._lookup_cache(image_path)
+        return image, cache_key, cached_detections
+    
+    def _load_image(self, image_path):
+        """
+        Carrega uma imagem na resolução original
         
-        # Gerar caminhos de saída
-        image_name = os.path.splitext(os.path.basename(image_path))[0]
+        O modelo recebe uma única reamostragem feita pelo detector e a imagem
+        de saída só é redimensionada ao salvar o resultado.
+        
+        Args:
+            image_path (str): Caminho da imagem
+            
+        Returns:
+            Imagem ou None se não puder ser aberta
+        """
+        if self.profiler is None:
+            return cv2.imread(image_path)
+        
+        start = time.perf_counter()
+        image = cv2.imread(image_path)
+        self.profiler.record("decodificação", time.perf_counter() - start)
+        return image
+    
+    def _to_output_size(self, image):
+        """
+        Redimensiona a imagem para a resolução de saída, apenas se ela for diferente
+        
+        Args:
+            image: Imagem original
+            
+        Returns:
+            Imagem na resolução de saída
+        """
+        if (image.shape[1], image.shape[0]) != (self.width, self.height):
+            return cv2.resize(image, (self.width, self.height))
+        return image
+    
+    def _save_result(self, image_path, image, results, verbose=True, cache_key=None):
+        """
+        Anota a imagem e salva a imagem processada e suas estatísticas
+        
+        Args:
+            image_path (str): Caminho da imagem original
+            image: Imagem original (redimensionada aqui para a saída, se necessário)
+            results (Detections): Detecções da imagem (na resolução de saída)
+            verbose (bool): Se True, imprime o resumo da imagem
+            cache_key (str): Se informado, salva as detecções no cache com esta chave
+            
+        Returns:
+            dict: Informações sobre a imagem processada
+        """
+        if cache_key is not None:
+            sequence = DetectionSequence(capacity=max(1, len(results)))
+            sequence.append(results)
+            self.cache.save(cache_key, sequence)
+        
+        # Manter apenas as pessoas dentro das zonas de interesse
+        zone_counts = None
+        if self.zones:
+            results, zone_counts = self.zones.filter_and_count(results, self.width, self.height)
+        
+        people_count = PeopleDetector.count_people(results)
+        
+        # Inicializar estatísticas
+        stats = StatisticsTracker(zone_names=self.zones.names if self.zones else None)
+        stats.update(people_count, zone_counts)
+        
+        # Gerar caminhos de saída (subpastas viram prefixo para evitar colisões)
+        relative_path = os.path.relpath(image_path, self.image_input_directory)
+        image_name = os.path.splitext(relative_path)[0].replace(os.sep, "_")
         output_image_path = os.path.join(
             self.image_output_directory, "images", f"result_{image_name}_annotated.jpg"
         )
@@ -121,14 +355,20 @@ class ImageProcessor:
             self.image_output_directory, "stats", f"stats_{image_name}.txt"
         )
         
-        # Salvar imagem processada
-        cv2.imwrite(output_image_path, annotated_image)
+        # Anotar e salvar imagem processada
+        if self.write_images:
+            self._write_image(output_image_path, image, results, people_count, zone_counts, stats)
+        else:
+            output_image_path = None
+        if self._first_result_at is None:
+            self._first_result_at = time.perf_counter()
         
         # Salvar estatísticas
-        stats.save(output_stats_path, image_name, self.width, self.height)
-        stats.print_summary()
+        stats.save(output_stats_path, image_name, self.width, self.height, verbose=verbose)
         
-        print(f"✓ Concluído: {os.path.basename(image_path)}\n")
+        if verbose:
+            stats.print_summary()
+            print(f"✓ Concluído: {os.path.basename(image_path)}\n")
         
         return {
             "input_path": image_path,
@@ -137,21 +377,174 @@ class ImageProcessor:
             "stats": stats
         }
     
-    def _print_summary(self, processed_images, failed_images):
+    def _write_image(self, output_image_path, image, results, people_count, zone_counts, stats):
+        """
+        Redimensiona, anota e codifica a imagem de saída
+        
+        Args:
+            output_image_path (str): Caminho da imagem anotada
+            image: Imagem original
+            results (Detections): Detecções (já filtradas pelas zonas)
+            people_count (int): Pessoas na imagem
+            zone_counts (dict): Contagem por zona (ou None)
+            stats (StatisticsTracker): Estatísticas da imagem
+        """
+        start = time.perf_counter()
+        output_image = self._to_output_size(image)
+        resized = time.perf_counter()
+        
+        # Anotar imagem (direto no buffer de saída, que não é reutilizado)
+        annotated_image = draw_detections(
+            output_image, 
+            results, 
+            people_count,
+            stats.max_people_in_frame,
+            stats.get_elapsed_time(),
+            inplace=True
+        )
+        if self.zones:
+            draw_zones(
+                annotated_image, self.zones.get_polygons(self.width, self.height), self.zones.names, zone_counts
+            )
+        annotated = time.perf_counter()
+        
+        cv2.imwrite(output_image_path, annotated_image)
+        
+        if self.profiler is not None:
+            self.profiler.record("redimensionamento", resized - start)
+            self.profiler.record("anotação", annotated - resized)
+            self.profiler.record("codificação", time.perf_counter() - annotated)
+    
+    def _process_all_streaming(self, failed_images):
+        """
+        Processa a pasta de entrada em fluxo contínuo com memória limitada
+        
+        A listagem é sob demanda, a leitura e a escrita rodam em pools de threads
+        e a inferência é feita em lotes. O número de imagens em memória é limitado
+        pelo tamanho do lote, independente do tamanho da pasta: das imagens
+        processadas só é mantida a contagem.
+        
+        Args:
+            failed_images (list): Recebe os nomes das imagens que falharam
+        
+        Returns:
+            int: Número de imagens processadas
+        """
+        max_pending = self.batch_size * 2
+        processed_count = 0
+        
+        def collect_encoded(pending, limit):
+            # Aguardar as escritas mais antigas até restarem no máximo `limit`
+            nonlocal processed_count
+            while len(pending) > limit:
+                image_path, future = pending.popleft()
+                try:
+                    future.result()
+                    processed_count += 1
+                except Exception as e:
+                    print(f"Erro ao salvar {os.path.basename(image_path)}: {str(e)}")
+                    failed_images.append(os.path.basename(image_path))
+                
+                done = processed_count + len(failed_images)
+                if done % 100 == 0:
+                    print(f"  Imagens processadas: {done}")
+        
+        print(f"\nProcessando imagens em fluxo (lotes de {self.batch_size})...\n")
+        
+        with ThreadPoolExecutor(self.decode_threads) as decode_pool, \
+                ThreadPoolExecutor(self.encode_threads) as encode_pool:
+            decoding = deque()
+            encoding = deque()
+            batch = []
+            
+            def run_batch():
+                # Detectar pessoas em uma única chamada ao modelo
+                self.detector.set_profiler(self.profiler)
+                batch_results = self._detect_batch([image for _, image, _ in batch])
+                for (image_path, image, cache_key), results in zip(batch, batch_results):
+                    submit_encode(image_path, image, results, cache_key)
+                batch.clear()
+            
+            def submit_encode(image_path, image, results, cache_key=None):
+                future = encode_pool.submit(self._save_result, image_path, image, results, False, cache_key)
+                encoding.append((image_path, future))
+                collect_encoded(encoding, max_pending)
+            
+            def collect_decoded():
+                image_path, future = decoding.popleft()
+                try:
+                    image, cache_key, cached_detections = future.result()
+                except Exception:
+                    image = None
+                
+                if image is None:
+                    print(f"Erro ao abrir imagem: {os.path.basename(image_path)}")
+                    failed_images.append(os.path.basename(image_path))
+                    return
+                
+                # Detecções em cache vão direto para a escrita
+                if cached_detections is not None:
+                    submit_encode(image_path, image, cached_detections)
+                    return
+                
+                batch.append((image_path, image, cache_key))
+                if len(batch) >= self.batch_size:
+                    run_batch()
+            
+            for image_path in self.iter_image_files():
+                decoding.append((image_path, decode_pool.submit(self._decode_task, image_path)))
+                if len(decoding) >= max_pending:
+                    collect_decoded()
+            
+            # Processar imagens restantes
+            while decoding:
+                collect_decoded()
+            if batch:
+                run_batch()
+            collect_encoded(encoding, 0)
+        
+        if not processed_count and not failed_images:
+            print("Nenhuma imagem encontrada na pasta de entrada.")
+            print(f"Coloque imagens em: {self.image_input_directory}")
+            return 0
+        
+        # Resumo final
+        self._save_profile()
+        self._print_summary(processed_count, failed_images)
+        return processed_count
+    
+    def _save_profile(self):
+        """Salva as latências por estágio acumuladas (texto e, opcionalmente, JSON)"""
+        if self.profiler is None or not self.profiler.stages:
+            return
+        
+        stats_directory = os.path.join(self.image_output_directory, "stats")
+        output_path = os.path.join(stats_directory, "profile_images.txt")
+        with open(output_path, "w", encoding="utf-8") as f:
+            for line in self.profiler.format_lines():
+                f.write(line + "\n")
+        print(f"Perfil de estágios salvo em: {output_path}")
+        
+        if self.profile_json:
+            self.profiler.save_json(os.path.join(stats_directory, "profile_images.json"))
+    
+    def _print_summary(self, processed_count, failed_images, processed_images=None):
         """
         Imprime resumo do processamento
         
         Args:
-            processed_images (list): Lista de imagens processadas
+            processed_count (int): Número de imagens processadas
             failed_images (list): Lista de imagens que falharam
+            processed_images (list): Imagens processadas, listadas por nome
+                (None no modo em fluxo: apenas a contagem)
         """
         print("\n" + "=" * 60)
         print("RESUMO DO PROCESSAMENTO DE IMAGENS")
         print("=" * 60)
         
-        if processed_images:
-            print(f"\n✓ {len(processed_images)} imagem(ns) processada(s) com sucesso:")
-            for image_info in processed_images:
+        if processed_count:
+            print(f"\n✓ {processed_count} imagem(ns) processada(s) com sucesso" + (":" if processed_images else ""))
+            for image_info in processed_images or []:
                 print(f"  - {os.path.basename(image_info['input_path'])}")
         
         if failed_images:
@@ -159,7 +552,17 @@ class ImageProcessor:
             for image_name in failed_images:
                 print(f"  - {image_name}")
         
-        if not processed_images and not failed_images:
+        if not processed_count and not failed_images:
             print("\nNenhuma imagem processada.")
         
+        if self._started_at is not None and self._first_result_at is not None:
+            print(f"\nTempo até a primeira imagem: {self._first_result_at - self._started_at:.2f}s")
+        if self._detector is not None and self._started_at is not None and self._detector.loaded_at >= self._started_at:
+            print(f"Carregamento do modelo: {self._detector.load_time:.2f}s")
+        
+        cascade = self._detector.get_cascade_summary(self._cascade_start) if self._detector is not None else None
+        if cascade is not None:
+            print(f"\nCascata: propostas {cascade['proposal_ms']:.1f}ms + refino {cascade['refine_ms']:.1f}ms "
+                  f"por imagem; {cascade['area_ratio'] * 100:.1f}% da área enviada ao modelo pesado")
+        
         print("\n" + "=" * 60)
\ No newline at end of file
@@ -0,0 +1,447 @@
+"""
+Módulo de processamento de múltiplas câmeras com um único processo de inferência
+
+Cada fonte é capturada por um processo leve que escreve os frames em um buffer
+circular de memória compartilhada. Este processo lê os frames direto desses
+buffers, monta lotes com frames de várias câmeras e distribui as detecções
+para as estatísticas e o vídeo de cada uma.
+"""
+import multiprocessing
+import os
+import time
+from ..core import ZoneSet
+from ..core.registry import get_detector
+from ..utils.annotations import draw_detections, draw_zones
+from ..utils.profiler import StageProfiler
+from ..utils.shared_frames import SharedFrameRing, capture_to_ring
+from ..utils.stats import StatisticsTracker
+from ..utils.video_writer import VideoWriterManager
+
+
+class FrameScheduler:
+    """
+    Escolhe as câmeras de cada lote respeitando o FPS alvo de cada uma
+    
+    Cada câmera tem um prazo para o próximo frame (1/FPS alvo após o anterior).
+    Entre as câmeras com frame novo e prazo vencido, as de prazo mais antigo
+    entram primeiro, com no máximo um frame por câmera em cada lote. Uma câmera
+    atendida vai para o fim da fila, então uma fonte rápida não deixa as outras
+    sem inferência.
+    """
+    
+    def __init__(self, targets):
+        """
+        Inicializa os prazos
+        
+        Args:
+            targets (list): FPS alvo de cada câmera (0 = o mais rápido possível)
+        """
+        self.intervals = [1.0 / fps if fps and fps > 0 else 0.0 for fps in targets]
+        self.next_due = [0.0] * len(targets)
+    
+    def select(self, ready, now, batch_size):
+        """
+        Seleciona as câmeras do próximo lote
+        
+        Args:
+            ready (list): Índices das câmeras com frame novo
+            now (float): Instante atual (time.perf_counter)
+            batch_size (int): Tamanho máximo do lote
+        
+        Returns:
+            list: Índices escolhidos, em ordem de prazo
+        """
+        due = sorted((i for i in ready if now >= self.next_due[i]), key=lambda i: self.next_due[i])
+        chosen = due[:batch_size]
+        
+        # Sem acumular crédito: uma câmera atrasada volta a concorrer a partir de agora
+        for i in chosen:
+            self.next_due[i] = max(self.next_due[i] + self.intervals[i], now)
+        return chosen
+    
+    def next_deadline(self, ready):
+        """
+        Retorna o menor prazo entre as câmeras com frame novo
+        
+        Args:
+            ready (list): Índices das câmeras com frame novo
+        
+        Returns:
+            float: Instante do próximo prazo (None se nenhuma estiver pronta)
+        """
+        return min((self.next_due[i] for i in ready), default=None)
+
+
+class CameraStream:
+    """Estado de uma câmera: buffer compartilhado, processo de captura e saídas"""
+    
+    def __init__(self, name, source, target_fps, ring, process, stats, writer=None):
+        """
+        Args:
+            name (str): Nome da câmera (usado nos arquivos de saída)
+            source (str): URL ou caminho da fonte
+            target_fps (float): FPS alvo de inferência (0 = sem limite)
+            ring (SharedFrameRing): Buffer de frames da câmera
+            process (multiprocessing.Process): Processo de captura
+            stats (StatisticsTracker): Estatísticas da câmera
+            writer (VideoWriterManager): Vídeo anotado (None sem vídeo de saída)
+        """
+        self.name = name
+        self.source = source
+        self.target_fps = target_fps
+        self.ring = ring
+        self.process = process
+        self.stats = stats
+        self.writer = writer
+        
+        self.last_sequence = 0
+        self.frames_captured = 0
+        self.frames_overwritten = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.first_frame_at = None
+        self.last_frame_at = None
+        self.failed = False
+    
+    def has_new_frame(self):
+        """True se o buffer tem um frame ainda não processado"""
+        return self.ring.latest_sequence > self.last_sequence
+    
+    def is_done(self):
+        """True se a captura terminou (ou o processo morreu) e o último frame já foi processado"""
+        return (self.ring.finished or not self.process.is_alive()) and not self.has_new_frame()
+
+
+class MultiCameraProcessor:
+    """Processador de várias câmeras com inferência em lote compartilhada"""
+    
+    def __init__(self, config):
+        """
+        Inicializa o processador
+        
+        Args:
+            config (dict): Configurações do projeto
+        """
+        self.config = config
+        self.video_output_directory = config["video_output_directory"]
+        self.width = config["video_dimensions"]["width"]
+        self.height = config["video_dimensions"]["height"]
+        
+        multi_config = config.get("multi_camera", {})
+        self.sources = multi_config.get("sources", [])
+        self.default_fps = float(multi_config.get("fps", 0))
+        self.batch_size = int(multi_config.get("batch_size", 0))
+        self.ring_slots = max(3, int(multi_config.get("ring_slots", 4)))
+        self.timeout = multi_config.get("timeout", 10)
+        self.realtime = multi_config.get("realtime", True)
+        self.stats_window = multi_config.get("stats_window", 9000)
+        self.write_video = config.get("processing", {}).get("write_video", True)
+        
+        self.zones = ZoneSet.from_config(config)
+        self.zone_names = self.zones.names if self.zones else None
+        self.zone_polygons = self.zones.get_polygons(self.width, self.height) if self.zones else None
+        
+        profiling_config = config.get("profiling", {})
+        self.profiler = StageProfiler() if profiling_config.get("enabled", True) else None
+        
+        os.makedirs(os.path.join(self.video_output_directory, "videos"), exist_ok=True)
+        os.makedirs(os.path.join(self.video_output_directory, "stats"), exist_ok=True)
+    
+    def run(self, sources=None, duration=None):
+        """
+        Processa as câmeras até todas terminarem, o tempo acabar ou Ctrl+C
+        
+        Args:
+            sources (list): Fontes {"name", "url", "fps"} (padrão: multi_camera.sources)
+            duration (float): Tempo máximo em segundos (padrão: sem limite)
+        
+        Returns:
+            dict: Lotes executados e resumo por câmera (None se não houver fontes)
+        """
+        sources = sources or self.sources
+        if not sources:
+            print("Nenhuma câmera configurada (multi_camera.sources).")
+            return None
+        
+        batch_size = self.batch_size or len(sources)
+        detector = get_detector(self.config["model"], batch_size)
+        # Aquecer antes de iniciar as capturas: o primeiro lote não acumula atraso
+        detector.warmup()
+        detector.set_profiler(self.profiler)
+        
+        context = multiprocessing.get_context("spawn")
+        stop_event = context.Event()
+        streams = []
+        
+        try:
+            for index, source in enumerate(sources):
+                streams.append(self._start_stream(index, source, context, stop_event))
+            
+            print(f"{len(streams)} câmera(s), lotes de até {batch_size} frame(s) (Ctrl+C para encerrar)")
+            batches = self._inference_loop(streams, detector, batch_size, duration)
+        finally:
+            stop_event.set()
+            for stream in streams:
+                stream.process.join(timeout=5)
+                if stream.process.is_alive():
+                    stream.process.terminate()
+                # Uma falha na escrita de uma câmera não impede a liberação das demais
+                try:
+                    if stream.writer is not None:
+                        stream.writer.release()
+                except Exception as e:
+                    print(f"Erro ao finalizar o vídeo de {stream.name}: {str(e)}")
+                finally:
+                    stream.frames_captured = stream.ring.frames_written
+                    stream.failed = stream.ring.failed
+                    stream.ring.close()
+        
+        summary = [self._save_stream(stream) for stream in streams]
+        self._save_profile()
+        self._print_summary(summary, batches)
+        
+        return {"batches": batches, "streams": summary}
+    
+    def _start_stream(self, index, source, context, stop_event):
+        """
+        Cria o buffer e o processo de captura de uma câmera
+        
+        Args:
+            index (int): Posição da câmera na configuração
+            source (dict | str): Fonte {"name", "url", "fps"} ou apenas a URL
+            context: Contexto de multiprocessing
+            stop_event (multiprocessing.Event): Sinal de parada das capturas
+        
+        Returns:
+            CameraStream: Câmera iniciada
+        """
+        if isinstance(source, str):
+            source = {"url": source}
+        name = source.get("name") or f"camera{index + 1}"
+        url = source["url"]
+        realtime = source.get("realtime", self.realtime and os.path.isfile(url))
+        
+        ring = SharedFrameRing.create(self.width, self.height, self.ring_slots)
+        process = context.Process(
+            target=capture_to_ring, args=(ring.get_spec(), url, realtime, stop_event), daemon=True
+        )
+        process.start()
+        
+        stats = StatisticsTracker(ring_size=self.stats_window, zone_names=self.zone_names)
+        writer = None
+        if self.write_video:
+            output_video_path = os.path.join(
+                self.video_output_directory, "videos", f"result_{name}_annotated.mp4"
+            )
+            target_fps = source.get("fps", self.default_fps)
+            writer = VideoWriterManager.from_config(
+                self.config, output_video_path, target_fps or 30, self.width, self.height
+            )
+        
+        return CameraStream(name, url, source.get("fps", self.default_fps), ring, process, stats, writer)
+    
+    def _inference_loop(self, streams, detector, batch_size, duration=None):
+        """
+        Monta lotes entre as câmeras e distribui as detecções
+        
+        Args:
+            streams (list): Câmeras (CameraStream)
+            detector (PeopleDetector): Detector compartilhado
+            batch_size (int): Frames por lote
+            duration (float): Tempo máximo em segundos
+        
+        Returns:
+            int: Número de lotes executados
+        """
+        scheduler = FrameScheduler([stream.target_fps for stream in streams])
+        started_at = time.perf_counter()
+        # O tempo sem frames só conta após o primeiro lote: os processos de captura
+        # ainda podem estar iniciando (spawn) ou abrindo a fonte
+        last_frame_at = None
+        batches = 0
+        
+        try:
+            while True:
+                now = time.perf_counter()
+                if duration and now - started_at >= duration:
+                    break
+                
+                for stream in streams:
+                    if not stream.failed and stream.ring.failed:
+                        stream.failed = True
+                        print(f"Erro ao abrir fonte: {stream.name} ({stream.source})")
+                
+                if all(stream.is_done() for stream in streams):
+                    print("Todas as fontes terminaram.")
+                    break
+                
+                ready = [i for i, stream in enumerate(streams) if stream.has_new_frame()]
+                chosen = scheduler.select(ready, now, batch_size)
+                
+                if not chosen:
+                    if last_frame_at is not None and now - last_frame_at > self.timeout:
+                        print(f"Nenhum frame novo em {self.timeout}s, encerrando.")
+                        break
+                    # Dormir até o próximo prazo (no máximo 2ms, para ver frames novos)
+                    deadline = scheduler.next_deadline(ready)
+                    time.sleep(min(0.002, max(0.0, deadline - now)) if deadline is not None else 0.002)
+                    continue
+                
+                # Frames lidos direto da memória compartilhada (sem cópia)
+                batch = []
+                for i in chosen:
+                    item = streams[i].ring.read_latest(streams[i].last_sequence)
+                    if item is not None:
+                        batch.append((streams[i], *item))
+                if not batch:
+                    continue
+                
+                results = detector.detect_batch(
+                    [frame for _, _, frame, _ in batch],
+                    (self.width, self.height),
+                    self.zones.get_regions(self.width, self.height) if self.zones else None
+                )
+                batches += 1
+                last_frame_at = time.perf_counter()
+                
+                for (stream, sequence, frame, captured_at), detections in zip(batch, results):
+                    self._handle_result(stream, sequence, frame, captured_at, detections, detector)
+        
+        except KeyboardInterrupt:
+            print("\nProcessamento interrompido pelo usuário.")
+        
+        return batches
+    
+    def _handle_result(self, stream, sequence, frame, captured_at, detections, detector):
+        """
+        Atualiza estatísticas e vídeo de uma câmera com as detecções de um frame
+        
+        Args:
+            stream (CameraStream): Câmera do frame
+            sequence (int): Sequência do frame no buffer
+            frame: View do frame na memória compartilhada
+            captured_at (float): Instante de captura (time.time)
+            detections (Detections): Detecções do frame
+            detector (PeopleDetector): Detector (contagem de pessoas)
+        """
+        # O vídeo é codificado depois, então o frame precisa sair do buffer compartilhado
+        output_frame = frame.copy() if stream.writer is not None else None
+        
+        # Frame sobrescrito durante a inferência: resultado descartado
+        if not stream.ring.is_current(sequence):
+            stream.ring.release_read()
+            stream.frames_overwritten += 1
+            return
+        stream.ring.release_read()
+        stream.last_sequence = sequence
+        
+        zone_counts = None
+        if self.zones:
+            detections, zone_counts = self.zones.filter_and_count(detections, self.width, self.height)
+        people_count = detector.count_people(detections)
+        stream.stats.update(people_count, zone_counts)
+        
+        latency = time.time() - captured_at
+        stream.total_latency += latency
+        stream.max_latency = max(stream.max_latency, latency)
+        stream.last_frame_at = time.perf_counter()
+        if stream.first_frame_at is None:
+            stream.first_frame_at = stream.last_frame_at
+        if self.profiler is not None:
+            self.profiler.record("ponta_a_ponta", latency)
+        
+        if output_frame is not None:
+            draw_detections(
+                output_frame,
+                detections,
+                people_count,
+                stream.stats.max_people_in_frame,
+                stream.stats.get_elapsed_time(),
+                inplace=True
+            )
+            if self.zones:
+                draw_zones(output_frame, self.zone_polygons, self.zone_names, zone_counts)
+            stream.writer.write(output_frame)
+    
+    def _save_stream(self, stream):
+        """
+        Salva as estatísticas de uma câmera
+        
+        Args:
+            stream (CameraStream): Câmera finalizada
+        
+        Returns:
+            dict: Resumo da câmera
+        """
+        processed = stream.stats.frame_count
+        captured = stream.frames_captured
+        elapsed = (stream.last_frame_at - stream.first_frame_at) if processed > 1 else 0.0
+        fps = (processed - 1) / elapsed if elapsed > 0 else 0.0
+        average_latency = stream.total_latency / processed if processed else 0.0
+        
+        summary = {
+            "name": stream.name,
+            "source": stream.source,
+            "target_fps": stream.target_fps,
+            "frames_captured": captured,
+            "frames_processed": processed,
+            "frames_overwritten": stream.frames_overwritten,
+            "fps": fps,
+            "average_latency": average_latency,
+            "max_latency": stream.max_latency,
+            "first_frame_at": stream.first_frame_at,
+            "failed": stream.failed,
+            "stats": stream.stats
+        }
+        
+        stats = stream.stats
+        stats.set_parameter("Fonte", stream.source)
+        stats.set_parameter("FPS alvo", stream.target_fps or "sem limite")
+        stats.set_parameter("FPS de inferência", f"{fps:.1f}")
+        stats.set_parameter("Frames capturados", captured)
+        stats.set_parameter("Frames sobrescritos durante a inferência", stream.frames_overwritten)
+        stats.set_parameter("Latência média", f"{average_latency * 1000:.1f}ms")
+        stats.set_parameter("Latência máxima", f"{stream.max_latency * 1000:.1f}ms")
+        
+        output_stats_path = os.path.join(self.video_output_directory, "stats", f"stats_{stream.name}.txt")
+        stats.save(output_stats_path, stream.name, self.width, self.height, verbose=False)
+        
+        return summary
+    
+    def _save_profile(self):
+        """Salva as latências por estágio do processo de inferência"""
+        if self.profiler is None or not self.profiler.stages:
+            return
+        
+        output_path = os.path.join(self.video_output_directory, "stats", "profile_cameras.txt")
+        with open(output_path, "w", encoding="utf-8") as f:
+            for line in self.profiler.format_lines():
+                f.write(line + "\n")
+    
+    def _print_summary(self, summary, batches):
+        """
+        Imprime o resumo por câmera
+        
+        Args:
+            summary (list): Resumos retornados por _save_stream
+            batches (int): Lotes executados
+        """
+        print("\n" + "=" * 60)
+        print("RESUMO DAS CÂMERAS")
+        print("=" * 60)
+        
+        frames = sum(camera["frames_processed"] for camera in summary)
+        print(f"\n{frames} frame(s) em {batches} lote(s) (média {frames / batches if batches else 0:.1f} por lote)")
+        
+        for camera in summary:
+            print(f"\n  {camera['name']} ({camera['source']})")
+            if camera["failed"]:
+                print("    Erro ao abrir a fonte")
+                continue
+            print(f"    Frames: {camera['frames_processed']} processados de {camera['frames_captured']} capturados")
+            print(f"    FPS de inferência: {camera['fps']:.1f} (alvo: {camera['target_fps'] or 'sem limite'})")
+            print(f"    Latência média: {camera['average_latency'] * 1000:.1f}ms "
+                  f"(máx. {camera['max_latency'] * 1000:.1f}ms)")
+            print(f"    Máximo de pessoas: {camera['stats'].max_people_in_frame}")
+        
+        print("\n" + "=" * 60)
@@ -0,0 +1,180 @@
+"""
+Módulo para processamento paralelo em múltiplos processos
+"""
+import os
+import multiprocessing
+import cv2
+
+
+# Processador carregado uma única vez em cada processo worker
+_worker_processor = None
+
+
+def limit_threads(num_threads):
+    """
+    Limita o número de threads usadas por torch, OpenCV e bibliotecas BLAS
+    
+    Args:
+        num_threads (int): Número máximo de threads no processo atual
+    """
+    num_threads = max(1, int(num_threads))
+    
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(num_threads)
+    
+    cv2.setNumThreads(num_threads)
+    
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+
+def _init_video_worker(config, num_threads):
+    """
+    Inicializa um processo worker: limita threads e carrega o modelo uma vez
+    
+    Args:
+        config (dict): Configurações do projeto
+        num_threads (int): Threads permitidas no worker
+    """
+    global _worker_processor
+    
+    limit_threads(num_threads)
+    
+    from .video_processor import VideoProcessor
+    _worker_processor = VideoProcessor(config)
+
+
+def _process_video(video_path):
+    """
+    Processa um vídeo no worker atual
+    
+    Args:
+        video_path (str): Caminho do vídeo
+    
+    Returns:
+        tuple: (caminho, resultado ou None, mensagem de erro ou None)
+    """
+    try:
+        # Workers do pool são daemon e não podem abrir outro pool: sem segmentos aqui
+        return video_path, _worker_processor.process_single(video_path, segments=1), None
+    except Exception as e:
+        return video_path, None, str(e)
+
+
+def process_videos_parallel(config, video_files, workers, threads_per_worker=None):
+    """
+    Processa vídeos em um pool de processos que consomem uma fila compartilhada
+    
+    Args:
+        config (dict): Configurações do projeto
+        video_files (list): Caminhos dos vídeos
+        workers (int): Número de processos worker
+        threads_per_worker (int): Threads por worker (padrão: núcleos / workers)
+    
+    Yields:
+        tuple: (caminho, resultado ou None, mensagem de erro ou None), na ordem
+            em que os vídeos terminam
+    """
+    workers = max(1, min(int(workers), len(video_files)))
+    if not threads_per_worker:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    
+    # "spawn" evita herdar o estado de threads do torch do processo principal
+    context = multiprocessing.get_context("spawn")
+    
+    with context.Pool(
+        processes=workers,
+        initializer=_init_video_worker,
+        initargs=(config, threads_per_worker)
+    ) as pool:
+        # chunksize=1: cada worker retira um vídeo por vez da fila
+        for item in pool.imap_unordered(_process_video, video_files, chunksize=1):
+            yield item
+
+
+def _process_segment(task):
+    """
+    Detecta pessoas em um intervalo de frames no worker atual
+    
+    Args:
+        task (tuple): (caminho do vídeo, frame inicial, frame final)
+    
+    Returns:
+        tuple: (StatisticsTracker, KeyframeScheduler, DetectionSequence) do segmento
+    """
+    video_path, start_frame, end_frame = task
+    return _worker_processor._process_segment(video_path, start_frame, end_frame)
+
+
+def _render_segment(task):
+    """
+    Desenha e codifica um intervalo de frames no worker atual
+    
+    Args:
+        task (tuple): (caminho do vídeo, frame inicial, caminho do segmento,
+            detecções do intervalo, série por frame do intervalo)
+    """
+    _worker_processor._render_segment(*task)
+
+
+def _map_segments(config, function, tasks, threads_per_worker=None):
+    """
+    Executa uma tarefa por segmento em um pool de processos, um processo por tarefa
+    
+    Args:
+        config (dict): Configurações do projeto
+        function (callable): Função executada no worker para cada tarefa
+        tasks (list): Tarefas, uma por segmento
+        threads_per_worker (int): Threads por worker (padrão: núcleos / segmentos)
+    
+    Returns:
+        list: Resultado de cada tarefa, em ordem
+    """
+    workers = max(1, len(tasks))
+    if not threads_per_worker:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    
+    context = multiprocessing.get_context("spawn")
+    
+    with context.Pool(
+        processes=workers,
+        initializer=_init_video_worker,
+        initargs=(config, threads_per_worker)
+    ) as pool:
+        return pool.map(function, tasks, chunksize=1)
+
+
+def process_segments_parallel(config, video_path, ranges, threads_per_worker=None):
+    """
+    Detecta pessoas em intervalos de frames de um mesmo vídeo em processos paralelos
+    
+    Args:
+        config (dict): Configurações do projeto
+        video_path (str): Caminho do vídeo
+        ranges (list): Intervalos (frame inicial, frame final exclusivo)
+        threads_per_worker (int): Threads por worker (padrão: núcleos / segmentos)
+    
+    Returns:
+        list: (StatisticsTracker, KeyframeScheduler, DetectionSequence) de cada
+            segmento, em ordem
+    """
+    tasks = [(video_path, start_frame, end_frame) for start_frame, end_frame in ranges]
+    return _map_segments(config, _process_segment, tasks, threads_per_worker)
+
+
+def render_segments_parallel(config, tasks, threads_per_worker=None):
+    """
+    Desenha e codifica intervalos de frames de um mesmo vídeo em processos paralelos
+    
+    Os workers só decodificam, anotam e codificam: o modelo não é carregado.
+    
+    Args:
+        config (dict): Configurações do projeto
+        tasks (list): (caminho do vídeo, frame inicial, caminho do segmento,
+            detecções do intervalo, série por frame do intervalo) de cada segmento
+        threads_per_worker (int): Threads por worker (padrão: núcleos / segmentos)
+    """
+    _map_segments(config, _render_segment, tasks, threads_per_worker)
@@ -0,0 +1,256 @@
+"""
+Módulo para comparar o modelo INT8 quantizado com o modelo FP32
+"""
+import cv2
+import os
+import time
+import numpy as np
+from ..core.registry import get_detector
+from ..core.detections import match_boxes
+
+
+class QuantizationReport:
+    """Compara contagens, caixas e latência do modelo INT8 com o FP32 em uma pasta de imagens"""
+    
+    def __init__(self, config):
+        """
+        Inicializa o comparador, carregando os dois modelos
+        
+        Args:
+            config (dict): Configurações do projeto
+        """
+        self.config = config
+        self.image_extensions = config["image_extensions"]
+        self.width = config["image_dimensions"]["width"]
+        self.height = config["image_dimensions"]["height"]
+        self.output_directory = os.path.join(config["image_output_directory"], "stats")
+        
+        model_config = config["model"]
+        report_config = config.get("quantization_report", {})
+        self.image_directory = report_config.get(
+            "image_directory",
+            model_config.get("calibration_directory", config["image_input_directory"])
+        )
+        self.match_iou = report_config.get("match_iou", 0.5)
+        self.max_images = int(report_config.get("max_images", 0))
+        
+        # Mesmo backend nas duas precisões: a diferença medida é só a quantização
+        calibration_directory = model_config.get("calibration_directory", self.image_directory)
+        self.fp32_detector = get_detector(dict(model_config, precision="fp32"))
+        self.int8_detector = get_detector(
+            dict(model_config, precision="int8", calibration_directory=calibration_directory)
+        )
+        
+        os.makedirs(self.output_directory, exist_ok=True)
+    
+    def get_image_files(self):
+        """
+        Busca as imagens da pasta de comparação, em ordem
+        
+        Returns:
+            list: Caminhos das imagens (limitados a max_images, se definido)
+        """
+        if not os.path.isdir(self.image_directory):
+            return []
+        
+        image_files = sorted(
+            os.path.join(self.image_directory, name)
+            for name in os.listdir(self.image_directory)
+            if any(name.lower().endswith(ext) for ext in self.image_extensions)
+        )
+        
+        if self.max_images > 0:
+            image_files = image_files[:self.max_images]
+        
+        return image_files
+    
+    def run(self):
+        """
+        Executa a comparação e salva o relatório
+        
+        Returns:
+            dict: Resumo da comparação ou None se não houver imagens
+        """
+        image_files = self.get_image_files()
+        if not image_files:
+            print(f"Nenhuma imagem encontrada em: {self.image_directory}")
+            return None
+        
+        print(f"\nComparando FP32 e INT8 em {len(image_files)} imagem(ns)...\n")
+        
+        rows = []
+        for i, image_path in enumerate(image_files, 1):
+            image = cv2.imread(image_path)
+            if image is None:
+                print(f"Erro ao abrir imagem: {os.path.basename(image_path)}")
+                continue
+            
+            rows.append(self._compare_image(image_path, image))
+            
+            if i % 50 == 0:
+                print(f"  Progresso: {i}/{len(image_files)} imagens")
+        
+        if not rows:
+            return None
+        
+        summary = self._summarize(rows)
+        
+        report_path = os.path.join(self.output_directory, "quantization_report.txt")
+        rows_path = os.path.join(self.output_directory, "quantization_report.csv")
+        self._save_report(summary, report_path)
+        self._save_rows(rows, rows_path)
+        self._print_summary(summary)
+        
+        print(f"Relatório salvo em: {report_path}")
+        print(f"Comparação por imagem salva em: {rows_path}")
+        
+        summary["report_path"] = report_path
+        return summary
+    
+    def _compare_image(self, image_path, image):
+        """
+        Detecta com os dois modelos e compara os resultados de uma imagem
+        
+        Args:
+            image_path (str): Caminho da imagem
+            image: Imagem original
+        
+        Returns:
+            dict: Contagens, caixas associadas, IoU média e latências
+        """
+        start = time.perf_counter()
+        fp32_results = self.fp32_detector.detect(image, (self.width, self.height))
+        fp32_latency = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        int8_results = self.int8_detector.detect(image, (self.width, self.height))
+        int8_latency = time.perf_counter() - start
+        
+        # FP32 é a referência: caixas INT8 associadas por IoU
+        matches = match_boxes(fp32_results.xyxy, int8_results.xyxy, self.match_iou)
+        
+        return {
+            "image": os.path.basename(image_path),
+            "fp32_count": len(fp32_results),
+            "int8_count": len(int8_results),
+            "matched": len(matches),
+            "mean_iou": sum(match[2] for match in matches) / len(matches) if matches else 0.0,
+            "fp32_ms": fp32_latency * 1000,
+            "int8_ms": int8_latency * 1000
+        }
+    
+    def _summarize(self, rows):
+        """
+        Agrega a comparação de todas as imagens
+        
+        Args:
+            rows (list): Resultados de _compare_image
+        
+        Returns:
+            dict: Métricas de contagem, concordância de caixas e velocidade
+        """
+        fp32_counts = np.array([row["fp32_count"] for row in rows])
+        int8_counts = np.array([row["int8_count"] for row in rows])
+        matched = np.array([row["matched"] for row in rows])
+        fp32_ms = np.array([row["fp32_ms"] for row in rows])
+        int8_ms = np.array([row["int8_ms"] for row in rows])
+        
+        count_error = np.abs(int8_counts - fp32_counts)
+        total_fp32 = int(fp32_counts.sum())
+        total_int8 = int(int8_counts.sum())
+        total_matched = int(matched.sum())
+        
+        precision = total_matched / total_int8 if total_int8 else 1.0
+        recall = total_matched / total_fp32 if total_fp32 else 1.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        matched_iou = sum(row["mean_iou"] * row["matched"] for row in rows)
+        
+        return {
+            "images": len(rows),
+            "backend": self.fp32_detector.backend,
+            "match_iou": self.match_iou,
+            "total_fp32": total_fp32,
+            "total_int8": total_int8,
+            "mean_count_error": float(count_error.mean()),
+            "max_count_error": int(count_error.max()),
+            "exact_count_ratio": float((count_error == 0).mean()),
+            "total_count_difference": (total_int8 - total_fp32) / total_fp32 if total_fp32 else 0.0,
+            "box_precision": precision,
+            "box_recall": recall,
+            "box_f1": f1,
+            "mean_iou": matched_iou / total_matched if total_matched else 0.0,
+            "fp32_ms_mean": float(fp32_ms.mean()),
+            "fp32_ms_p95": float(np.percentile(fp32_ms, 95)),
+            "int8_ms_mean": float(int8_ms.mean()),
+            "int8_ms_p95": float(np.percentile(int8_ms, 95)),
+            "speedup": float(fp32_ms.mean() / int8_ms.mean()) if int8_ms.mean() > 0 else 0.0
+        }
+    
+    def _save_report(self, summary, output_path):
+        """
+        Salva o resumo da comparação em arquivo texto
+        
+        Args:
+            summary (dict): Resumo gerado por _summarize
+            output_path (str): Caminho do arquivo de saída
+        """
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write("=" * 60 + "\n")
+            f.write("RELATÓRIO DE QUANTIZAÇÃO INT8 x FP32\n")
+            f.write("=" * 60 + "\n\n")
+            
+            f.write(f"Pasta de imagens: {self.image_directory}\n")
+            f.write(f"Imagens comparadas: {summary['images']}\n")
+            f.write(f"Backend: {summary['backend']}\n")
+            f.write(f"Resolução: {self.width}x{self.height}\n\n")
+            
+            f.write("Contagem de pessoas (referência: FP32):\n")
+            f.write(f"  Total FP32/INT8: {summary['total_fp32']}/{summary['total_int8']} "
+                    f"({summary['total_count_difference'] * 100:+.1f}%)\n")
+            f.write(f"  Erro absoluto por imagem (médio/máximo): "
+                    f"{summary['mean_count_error']:.2f}/{summary['max_count_error']}\n")
+            f.write(f"  Imagens com contagem idêntica: {summary['exact_count_ratio'] * 100:.1f}%\n\n")
+            
+            f.write(f"Concordância de caixas (IoU >= {summary['match_iou']}):\n")
+            f.write(f"  Precisão: {summary['box_precision'] * 100:.1f}%\n")
+            f.write(f"  Revocação: {summary['box_recall'] * 100:.1f}%\n")
+            f.write(f"  F1: {summary['box_f1'] * 100:.1f}%\n")
+            f.write(f"  IoU média das caixas associadas: {summary['mean_iou']:.3f}\n\n")
+            
+            f.write("Latência por imagem (média/p95):\n")
+            f.write(f"  FP32: {summary['fp32_ms_mean']:.1f}ms/{summary['fp32_ms_p95']:.1f}ms\n")
+            f.write(f"  INT8: {summary['int8_ms_mean']:.1f}ms/{summary['int8_ms_p95']:.1f}ms\n")
+            f.write(f"  Aceleração INT8: {summary['speedup']:.2f}x\n")
+            f.write("=" * 60 + "\n")
+    
+    def _save_rows(self, rows, output_path):
+        """
+        Salva a comparação por imagem em CSV
+        
+        Args:
+            rows (list): Resultados de _compare_image
+            output_path (str): Caminho do arquivo de saída
+        """
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write("image,fp32_count,int8_count,matched,mean_iou,fp32_ms,int8_ms\n")
+            for row in rows:
+                f.write(f"{row['image']},{row['fp32_count']},{row['int8_count']},{row['matched']},"
+                        f"{row['mean_iou']:.4f},{row['fp32_ms']:.2f},{row['int8_ms']:.2f}\n")
+    
+    def _print_summary(self, summary):
+        """
+        Imprime o resumo da comparação
+        
+        Args:
+            summary (dict): Resumo gerado por _summarize
+        """
+        print("\n" + "=" * 60)
+        print("RESUMO DA QUANTIZAÇÃO INT8")
+        print("=" * 60)
+        print(f"  Imagens: {summary['images']}")
+        print(f"  Erro médio de contagem: {summary['mean_count_error']:.2f} pessoas/imagem")
+        print(f"  Contagem idêntica: {summary['exact_count_ratio'] * 100:.1f}% das imagens")
+        print(f"  F1 das caixas: {summary['box_f1'] * 100:.1f}%")
+        print(f"  Latência FP32/INT8: {summary['fp32_ms_mean']:.1f}ms/{summary['int8_ms_mean']:.1f}ms "
+              f"({summary['speedup']:.2f}x)")
+        print("=" * 60 + "\n")
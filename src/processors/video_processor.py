@@ -2,11 +2,25 @@
 Módulo para processamento de vídeos
 """
 import cv2
+import json
 import os
-from ..core.detector import PeopleDetector
-from ..utils.annotations import draw_detections
-from ..utils.video_writer import VideoWriterManager
+import shutil
+import time
+from ..core.detector import PeopleDetector, detector_signature
+from ..core.registry import get_detector
+from ..core.tracker import BoxTracker, KeyframeScheduler
+from ..core.motion import MotionGate
+from ..core.zones import ZoneSet
+from ..core.tiling import TileScheduler
+from ..core.detection_cache import DetectionSequence, create_detection_cache
+from ..utils.annotations import draw_detections, draw_zones
+from ..utils.video_writer import VideoWriterManager, concatenate_videos, find_ffmpeg
+from ..utils.stream_publisher import StreamPublisher
 from ..utils.stats import StatisticsTracker
+from ..utils.profiler import StageProfiler
+from ..utils.pipeline import FrameReader, PipelineStage, LatestFrameReader
+from ..utils.checkpoint import save_checkpoint, load_checkpoint
+from .parallel import process_videos_parallel, process_segments_parallel, render_segments_parallel
 
 
 class VideoProcessor:
@@ -20,17 +34,71 @@ class VideoProcessor:
             config (dict): Configurações do projeto
         """
         self.config = config
-        self.detector = PeopleDetector(config["model"])
         self.video_input_directory = config["video_input_directory"]
         self.video_output_directory = config["video_output_directory"]
         self.video_extensions = config["video_extensions"]
         self.width = config["video_dimensions"]["width"]
         self.height = config["video_dimensions"]["height"]
         
+        # Parâmetros de desempenho
+        processing_config = config.get("processing", {})
+        self.batch_size = max(1, int(processing_config.get("batch_size", 1)))
+        self.pipeline = processing_config.get("pipeline", True)
+        self.queue_size = max(1, int(processing_config.get("queue_size", 8)))
+        self.workers = max(1, int(processing_config.get("workers", 1)))
+        self.threads_per_worker = processing_config.get("threads_per_worker")
+        self.segments = max(1, int(processing_config.get("segments", 1)))
+        # Sem vídeo de saída: apenas contagem e estatísticas (sem anotar nem codificar)
+        self.write_video = processing_config.get("write_video", True)
+        self.livestream_config = config.get("livestream", {})
+        self.frame_export_formats = config.get("stats", {}).get("frame_export", [])
+        self.cache = create_detection_cache(config)
+        
+        # Detector compartilhado entre processadores, carregado só na primeira detecção
+        self._detector = None
+        self._first_frame_at = None
+        
+        # Modo keyframe: detector a cada N frames, rastreador nos intermediários
+        self.detect_interval = max(1, int(processing_config.get("detect_interval", 1)))
+        self.adaptive_interval = processing_config.get("adaptive_interval", False)
+        self.max_detect_interval = int(processing_config.get("max_detect_interval", 15))
+        self.keyframe_mode = self.detect_interval > 1 or self.adaptive_interval
+        
+        # Reaproveitar detecções em frames sem movimento
+        self.motion_gating = processing_config.get("motion_gating", False)
+        self.motion_threshold = processing_config.get("motion_threshold", 0.002)
+        self.motion_pixel_threshold = processing_config.get("motion_pixel_threshold", 12)
+        self.motion_max_reuse = int(processing_config.get("motion_max_reuse", 30))
+        
+        # Checkpoints periódicos (a cada N frames; 0 = desabilitado) e retomada
+        self.checkpoint_interval = max(0, int(processing_config.get("checkpoint_interval", 0)))
+        self.resume = processing_config.get("resume", True)
+        self.skip_completed = processing_config.get("skip_completed", True)
+        
+        # Zonas de interesse: contagem por zona e, opcionalmente, inferência só nos recortes
+        self.zones = ZoneSet.from_config(config)
+        self.zone_names = self.zones.names if self.zones else None
+        self.zone_polygons = self.zones.get_polygons(self.width, self.height) if self.zones else None
+        
+        # Inferência em tiles na resolução nativa (pessoas pequenas em frames grandes)
+        self.tiling = config.get("tiling", {}).get("enabled", False)
+        
+        # Latências por estágio no arquivo de estatísticas (e, opcionalmente, em JSON)
+        profiling_config = config.get("profiling", {})
+        self.profiling = profiling_config.get("enabled", True)
+        self.profile_json = profiling_config.get("json_report", False)
+        
         # Criar diretórios de saída
         os.makedirs(os.path.join(self.video_output_directory, "videos"), exist_ok=True)
         os.makedirs(os.path.join(self.video_output_directory, "stats"), exist_ok=True)
     
+    @property
+    def detector(self):
+        """Detector do modelo configurado (carregado no primeiro acesso)"""
+        if self._detector is None:
+            self._detector = get_detector(self.config["model"], self.batch_size)
+        return self._detector
+    
     def get_video_files(self):
         """
         Busca todos os vídeos na pasta de entrada
@@ -49,19 +117,49 @@ class VideoProcessor:
         
         return video_files
     
-    def process_all(self):
-        """Processa todos os vídeos encontrados na pasta de entrada"""
+    def process_all(self, workers=None):
+        """
+        Processa todos os vídeos encontrados na pasta de entrada
+        
+        Args:
+            workers (int): Número de processos paralelos (padrão: processing.workers)
+            
+        Returns:
+            dict: Resultados processados ("processed"), nomes dos vídeos que
+                falharam ("failed") e dos já concluídos ("skipped")
+        """
         video_files = self.get_video_files()
+        workers = workers or self.workers
+        summary = {"processed": [], "failed": [], "skipped": []}
         
         if not video_files:
             print("Nenhum vídeo encontrado na pasta de entrada.")
             print(f"Coloque vídeos em: {self.video_input_directory}")
-            return
+            return summary
         
         print(f"\n{len(video_files)} vídeo(s) encontrado(s).\n")
         
-        processed_videos = []
-        failed_videos = []
+        # Pular vídeos cujas saídas já estão completas
+        if self.skip_completed:
+            completed = [path for path in video_files if self.is_completed(path)]
+            if completed:
+                print(f"{len(completed)} vídeo(s) já processado(s), pulando:")
+                for video_path in completed:
+                    print(f"  - {os.path.basename(video_path)}")
+                print()
+                video_files = [path for path in video_files if path not in completed]
+                summary["skipped"] = [os.path.basename(path) for path in completed]
+            
+            if not video_files:
+                print("Todos os vídeos já foram processados.")
+                return summary
+        
+        if workers > 1 and len(video_files) > 1:
+            summary["processed"], summary["failed"] = self._process_all_parallel(video_files, workers)
+            return summary
+        
+        processed_videos = summary["processed"]
+        failed_videos = summary["failed"]
         
         for i, video_path in enumerate(video_files, 1):
             print(f"[{i}/{len(video_files)}] Processando: {os.path.basename(video_path)}")
@@ -76,17 +174,117 @@ class VideoProcessor:
         
         # Resumo final
         self._print_summary(processed_videos, failed_videos)
+        
+        return summary
     
-    def process_single(self, video_path):
+    def _process_all_parallel(self, video_files, workers):
+        """
+        Processa os vídeos em um pool de processos, cada um com seu próprio modelo
+        
+        Args:
+            video_files (list): Caminhos dos vídeos
+            workers (int): Número de processos worker
+            
+        Returns:
+            tuple: (resultados processados, nomes dos vídeos que falharam)
+        """
+        print(f"Processando com {min(workers, len(video_files))} processo(s) em paralelo.")
+        if self.segments > 1:
+            # Workers do pool não podem abrir outro pool de processos
+            print("processing.segments é ignorado com vários workers: cada vídeo roda em um único processo.")
+        print()
+        
+        processed_videos = []
+        failed_videos = []
+        
+        results = process_videos_parallel(self.config, video_files, workers, self.threads_per_worker)
+        for i, (video_path, result, error) in enumerate(results, 1):
+            if error is not None:
+                print(f"[{i}/{len(video_files)}] Erro ao processar {os.path.basename(video_path)}: {error}")
+                failed_videos.append(os.path.basename(video_path))
+            elif result:
+                print(f"[{i}/{len(video_files)}] Finalizado: {os.path.basename(video_path)}")
+                # Instante medido no relógio do worker, sem referência comum com este processo
+                result["first_frame_at"] = None
+                processed_videos.append(result)
+            else:
+                failed_videos.append(os.path.basename(video_path))
+        
+        # Resumo final agregado de todos os workers
+        self._print_summary(processed_videos, failed_videos)
+        
+        return processed_videos, failed_videos
+    
+    def _output_paths(self, video_path):
+        """
+        Gera os caminhos de saída de um vídeo
+        
+        Args:
+            video_path (str): Caminho do vídeo
+            
+        Returns:
+            tuple: (nome do vídeo, caminho do vídeo anotado, caminho das estatísticas)
+        """
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        output_video_path = os.path.join(
+            self.video_output_directory, "videos", f"result_{video_name}_annotated.mp4"
+        )
+        output_stats_path = os.path.join(
+            self.video_output_directory, "stats", f"stats_{video_name}.txt"
+        )
+        return video_name, output_video_path, output_stats_path
+    
+    def _checkpoint_directory(self, video_name):
+        """Retorna a pasta de checkpoint de um vídeo"""
+        return os.path.join(self.video_output_directory, "videos", f".checkpoint_{video_name}")
+    
+    def is_completed(self, video_path):
+        """
+        Verifica se as saídas de um vídeo já estão completas
+        
+        As estatísticas são salvas por último, então um vídeo está completo se
+        ambas as saídas existem, são mais novas que a entrada e não há
+        checkpoint pendente. Sem vídeo de saída, apenas as estatísticas contam.
+        
+        Args:
+            video_path (str): Caminho do vídeo
+            
+        Returns:
+            bool: True se o vídeo não precisa ser processado novamente
+        """
+        video_name, output_video_path, output_stats_path = self._output_paths(video_path)
+        
+        if os.path.isdir(self._checkpoint_directory(video_name)):
+            return False
+        
+        outputs = [output_video_path, output_stats_path] if self.write_video else [output_stats_path]
+        if not all(os.path.exists(path) for path in outputs):
+            return False
+        
+        input_mtime = os.path.getmtime(video_path)
+        return min(os.path.getmtime(path) for path in outputs) >= input_mtime
+    
+    def process_single(self, video_path, segments=None, resume=None):
         """
         Processa um único vídeo
         
         Args:
             video_path (str): Caminho do vídeo
+            segments (int): Número de segmentos processados em paralelo
+                (padrão: processing.segments)
+            resume (bool): Se True, continua a partir do último checkpoint
+                (padrão: processing.resume)
             
         Returns:
             dict: Informações sobre o vídeo processado
         """
+        started_at = time.perf_counter()
+        self._first_frame_at = None
+        segments = segments or self.segments
+        resume = self.resume if resume is None else resume
+        # Modo em segmentos: a inferência roda nos workers e o modelo não precisa ser carregado aqui
+        cascade_start = self._detector.get_cascade_stats() if self._detector is not None else None
+        
         # Abrir vídeo
         video = cv2.VideoCapture(video_path)
         if not video.isOpened():
@@ -98,68 +296,1153 @@ class VideoProcessor:
         total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
         
         # Gerar caminhos de saída
-        video_name = os.path.splitext(os.path.basename(video_path))[0]
-        output_video_path = os.path.join(
-            self.video_output_directory, "videos", f"result_{video_name}_annotated.mp4"
+        video_name, output_video_path, output_stats_path = self._output_paths(video_path)
+        
+        # Detecções de execuções anteriores: apenas decodificar, anotar e codificar
+        cache_key = None
+        cached_detections = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(video_path, self._cache_parameters())
+            cached_detections = self.cache.load(cache_key)
+        
+        # Vídeos longos podem ser divididos em segmentos processados em paralelo
+        if segments > 1 and cached_detections is None and total_frames >= segments * self.batch_size:
+            video.release()
+            stats, recorder = self._process_segmented(video_path, output_video_path, fps, total_frames, segments)
+        elif self.checkpoint_interval > 0 and cached_detections is None:
+            try:
+                stats, scheduler, recorder = self._process_checkpointed(
+                    video, video_path, output_video_path, fps, total_frames, resume
+                )
+            finally:
+                video.release()
+            
+            self._set_keyframe_parameters(stats, scheduler)
+        else:
+            # Inicializar gerenciadores
+            stats = self._create_stats()
+            writer = self._create_writer(output_video_path, fps, stats)
+            recorder = DetectionSequence() if self.cache is not None and cached_detections is None else None
+            
+            try:
+                scheduler = self._process_frames(
+                    video, writer, stats, total_frames,
+                    cached_detections=cached_detections, recorder=recorder
+                )
+            finally:
+                # Finalizar
+                video.release()
+                if writer is not None:
+                    writer.release()
+            
+            self._set_keyframe_parameters(stats, scheduler)
+            self._set_writer_parameters(stats, writer)
+        
+        if cached_detections is not None:
+            stats.set_parameter("Detecções", "cache")
+        elif recorder is not None:
+            self.cache.save(cache_key, recorder)
+        
+        # Salvar estatísticas
+        stats.set_parameter("Tamanho do lote", self.batch_size)
+        if not self.write_video:
+            stats.set_parameter("Vídeo de saída", "desabilitado")
+        self._set_zone_parameters(stats)
+        self._set_cascade_parameters(stats, cascade_start)
+        self._set_startup_parameters(stats, started_at)
+        stats.save(output_stats_path, video_name, self.width, self.height)
+        self._export_frame_series(stats, video_name)
+        self._save_profile(stats, video_name)
+        stats.print_summary()
+        
+        print(f"✓ Concluído: {os.path.basename(video_path)}\n")
+        
+        return {
+            "input_path": video_path,
+            "output_video_path": output_video_path if self.write_video else None,
+            "output_stats_path": output_stats_path,
+            "first_frame_at": self._first_frame_at,
+            "stats": stats
+        }
+    
+    def _process_frames(self, video, writer, stats, total_frames, max_frames=None, show_info=True,
+                        cached_detections=None, recorder=None, tracker=None, scheduler=None,
+                        motion_gate=None, tile_scheduler=None):
+        """
+        Executa o pipeline de decodificação, inferência, anotação e escrita
+        
+        Args:
+            video (cv2.VideoCapture): Vídeo aberto, posicionado no primeiro frame
+            writer (VideoWriterManager): Gerenciador de escrita do vídeo
+            stats (StatisticsTracker): Rastreador de estatísticas
+            total_frames (int): Total de frames a processar (para progresso)
+            max_frames (int): Limite de frames lidos (None = até o fim)
+            show_info (bool): Se False, não desenha o overlay de informações
+            cached_detections (DetectionSequence): Detecções já conhecidas; se
+                informadas, o detector não é executado
+            recorder (DetectionSequence): Se informado, recebe as detecções de cada frame
+            tracker (BoxTracker): Rastreador a continuar (padrão: um novo)
+            scheduler (KeyframeScheduler): Agendador a continuar (padrão: um novo)
+            motion_gate (MotionGate): Detector de movimento a continuar (padrão: um
+                novo, se processing.motion_gating estiver ativo)
+            tile_scheduler (TileScheduler): Agendador de tiles a continuar (padrão:
+                um novo, se tiling.enabled estiver ativo)
+            
+        Returns:
+            KeyframeScheduler: Agendador com as métricas de keyframes (None ao usar cache)
+        """
+        # Estágios: decodificação -> inferência (thread atual) -> anotação -> escrita
+        # Frames seguem na resolução original: o modelo recebe uma única
+        # reamostragem e o quadro de saída só é redimensionado na anotação.
+        # Com detecções do cache o modelo não é carregado
+        if cached_detections is None:
+            self.detector.set_profiler(stats.profiler)
+        reader = FrameReader(
+            video, self.queue_size,
+            threaded=self.pipeline, max_frames=max_frames, profiler=stats.profiler
         )
-        output_stats_path = os.path.join(
-            self.video_output_directory, "stats", f"stats_{video_name}.txt"
+        annotator = PipelineStage(
+            lambda item: self._annotate_frame(item[0], item[1], stats, writer, total_frames, show_info),
+            self.queue_size,
+            threaded=self.pipeline,
+            name="annotation",
+            profiler=stats.profiler,
+            profile_name="anotação"
         )
         
-        # Inicializar gerenciadores
-        writer = VideoWriterManager(output_video_path, fps, self.width, self.height)
-        stats = StatisticsTracker()
+        # Agendamento de keyframes e rastreador para os frames intermediários
+        if scheduler is None:
+            scheduler = self._create_scheduler()
+        if tracker is None:
+            tracker = self._create_tracker()
+        if motion_gate is None:
+            motion_gate = self._create_motion_gate()
+        if tile_scheduler is None:
+            tile_scheduler = self._create_tile_scheduler()
+        
+        try:
+            if cached_detections is not None:
+                self._annotate_cached(reader, annotator, cached_detections, stats.profiler)
+                annotator.close()
+                return None
+            
+            # Processar frames em lotes de keyframes
+            # Ação de cada frame: "detect" (modelo), "track" (rastreador) ou
+            # "reuse" (keyframe sem movimento, reaproveita a última detecção)
+            batch = []
+            batch_keyframes = 0
+            for frame in reader:
+                action = "track"
+                if scheduler.next_is_keyframe():
+                    action = "detect"
+                    if motion_gate is not None and motion_gate.is_static(frame):
+                        scheduler.skip_keyframe()
+                        action = "reuse"
+                
+                batch.append((frame, action))
+                batch_keyframes += action == "detect"
+                
+                if batch_keyframes >= self.batch_size:
+                    self._process_batch(batch, annotator, tracker, scheduler, recorder, motion_gate, tile_scheduler)
+                    batch = []
+                    batch_keyframes = 0
+            
+            # Processar frames restantes
+            if batch:
+                self._process_batch(batch, annotator, tracker, scheduler, recorder, motion_gate, tile_scheduler)
+            
+            annotator.close()
+        finally:
+            reader.stop()
+            annotator.close()
+        
+        return scheduler
+    
+    def _create_scheduler(self):
+        """Cria o agendador de keyframes conforme o config"""
+        return KeyframeScheduler(
+            self.detect_interval if self.keyframe_mode else 1,
+            self.adaptive_interval,
+            self.max_detect_interval
+        )
+    
+    def _create_motion_gate(self):
+        """Cria o detector de movimento, ou None se processing.motion_gating estiver desligado"""
+        if not self.motion_gating:
+            return None
+        
+        return MotionGate(self.motion_threshold, self.motion_pixel_threshold, max_reuse=self.motion_max_reuse)
+    
+    def _create_tile_scheduler(self):
+        """Cria o agendador de tiles, ou None se tiling.enabled estiver desligado"""
+        return TileScheduler.from_config(self.config)
+    
+    def _create_tracker(self):
+        """Cria o rastreador limitado às dimensões de saída"""
+        tracker = BoxTracker()
+        tracker.frame_size = (self.width, self.height)
+        return tracker
+    
+    def _checkpoint_signature(self, video_path):
+        """
+        Retorna os dados que precisam coincidir para retomar um checkpoint
         
-        # Processar frames
-        while video.isOpened():
-            ret, frame = video.read()
-            if not ret:
+        Args:
+            video_path (str): Caminho do vídeo
+            
+        Returns:
+            dict: Identificação do vídeo e parâmetros que afetam o resultado
+        """
+        file_stat = os.stat(video_path)
+        signature = {
+            "video_size": file_stat.st_size,
+            "video_mtime": file_stat.st_mtime_ns,
+            "detector": detector_signature(self.config["model"]),
+            "width": self.width,
+            "height": self.height,
+            "batch_size": self.batch_size,
+            "checkpoint_interval": self.checkpoint_interval,
+            "detect_interval": self.detect_interval,
+            "adaptive_interval": self.adaptive_interval,
+            "max_detect_interval": self.max_detect_interval,
+            "motion": self._motion_parameters(),
+            "zones": self.zones.get_signature() if self.zones else None,
+            "tiling": self._tiling_parameters()
+        }
+        # Normalizar (tuplas -> listas) para comparar com o JSON salvo
+        return json.loads(json.dumps(signature, default=str))
+    
+    def _process_checkpointed(self, video, video_path, output_video_path, fps, total_frames, resume=True):
+        """
+        Processa um vídeo em trechos de checkpoint_interval frames, salvando um
+        checkpoint ao fim de cada trecho
+        
+        Com o ffmpeg disponível, cada trecho é escrito já anotado em um segmento
+        próprio e os segmentos são juntados no fim sem recodificar; sem ffmpeg,
+        as detecções ficam no checkpoint e o vídeo é desenhado uma única vez no
+        fim. O checkpoint registra o último frame concluído, os segmentos prontos
+        e o estado de estatísticas, rastreador, agendador e detecções. Ao
+        retomar, o vídeo é posicionado no frame seguinte e o estado é
+        restaurado, então o resultado final é o mesmo de uma execução sem
+        interrupção.
+        
+        Args:
+            video (cv2.VideoCapture): Vídeo aberto, posicionado no primeiro frame
+            video_path (str): Caminho do vídeo
+            output_video_path (str): Caminho do vídeo final
+            fps (int): Frames por segundo
+            total_frames (int): Total de frames do vídeo
+            resume (bool): Se True, continua a partir de um checkpoint existente
+            
+        Returns:
+            tuple: (StatisticsTracker, KeyframeScheduler, DetectionSequence ou None)
+        """
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        checkpoint_directory = self._checkpoint_directory(video_name)
+        checkpoint_path = os.path.join(checkpoint_directory, "checkpoint.npz")
+        # Segmentos anotados por trecho só se puderem ser juntados por cópia de streams
+        ffmpeg_path = find_ffmpeg(self.config) if self.write_video else None
+        write_segments = ffmpeg_path is not None
+        signature = dict(self._checkpoint_signature(video_path), segment_videos=write_segments)
+        
+        stats = self._create_stats()
+        tracker = self._create_tracker()
+        scheduler = self._create_scheduler()
+        motion_gate = self._create_motion_gate()
+        tile_scheduler = self._create_tile_scheduler()
+        keep_detections = self.cache is not None or (self.write_video and not write_segments)
+        recorder = DetectionSequence() if keep_detections else None
+        segment_paths = []
+        
+        checkpoint = load_checkpoint(checkpoint_path) if resume else None
+        if checkpoint is not None and self._can_resume(checkpoint, signature, recorder):
+            segment_paths = checkpoint["checkpoint"]["segments"]
+            stats.set_state(checkpoint["stats"])
+            tracker.set_state(checkpoint["tracker"])
+            scheduler.set_state(checkpoint["scheduler"])
+            if motion_gate is not None:
+                motion_gate.set_state(checkpoint["motion"])
+            if tile_scheduler is not None:
+                tile_scheduler.set_state(checkpoint["tiling"])
+            if recorder is not None:
+                detections = checkpoint["detections"]
+                recorder = DetectionSequence.from_arrays(
+                    detections["offsets"], detections["xyxy"], detections["conf"], detections["cls"]
+                )
+            
+            video.set(cv2.CAP_PROP_POS_FRAMES, stats.frame_count)
+            print(f"  Retomando do checkpoint: frame {stats.frame_count}/{total_frames}")
+        elif os.path.isdir(checkpoint_directory):
+            shutil.rmtree(checkpoint_directory)
+        
+        os.makedirs(checkpoint_directory, exist_ok=True)
+        
+        while True:
+            segment_path = os.path.join(checkpoint_directory, f"segment_{len(segment_paths):05d}.mp4")
+            frames_before = stats.frame_count
+            
+            writer = self._create_writer(segment_path, fps, stats) if write_segments else None
+            try:
+                self._process_frames(
+                    video, writer, stats, total_frames,
+                    max_frames=self.checkpoint_interval,
+                    recorder=recorder, tracker=tracker, scheduler=scheduler, motion_gate=motion_gate,
+                    tile_scheduler=tile_scheduler
+                )
+            finally:
+                if writer is not None:
+                    writer.release()
+            
+            frames_read = stats.frame_count - frames_before
+            if frames_read == 0:
+                if writer is not None:
+                    os.remove(segment_path)
                 break
             
-            # Redimensionar frame
-            frame_resized = cv2.resize(frame, (self.width, self.height))
+            if writer is not None:
+                segment_paths.append(segment_path)
             
-            # Detectar pessoas
-            results = self.detector.detect(frame_resized)
-            people_count = self.detector.count_people(results)
+            sections = {
+                "checkpoint": {
+                    "signature": signature,
+                    "segments": segment_paths,
+                    "last_frame": stats.frame_count
+                },
+                "stats": stats.get_state(),
+                "tracker": tracker.get_state(),
+                "scheduler": scheduler.get_state()
+            }
+            if recorder is not None:
+                sections["detections"] = recorder.to_arrays()
+            if motion_gate is not None:
+                sections["motion"] = motion_gate.get_state()
+            if tile_scheduler is not None:
+                sections["tiling"] = tile_scheduler.get_state()
+            save_checkpoint(checkpoint_path, sections)
             
-            # Atualizar estatísticas
-            stats.update(people_count)
+            # Fim do vídeo antes de completar o trecho
+            if frames_read < self.checkpoint_interval:
+                break
+        
+        if write_segments and segment_paths:
+            concatenate_videos(segment_paths, output_video_path, ffmpeg_path)
+        elif self.write_video:
+            self._render_video(video_path, output_video_path, fps, stats, recorder)
+        shutil.rmtree(checkpoint_directory)
+        
+        stats.set_parameter("Intervalo de checkpoint", f"{self.checkpoint_interval} frames")
+        
+        return stats, scheduler, recorder if self.cache is not None else None
+    
+    def _can_resume(self, checkpoint, signature, recorder):
+        """
+        Verifica se um checkpoint pode ser retomado
+        
+        Args:
+            checkpoint (dict): Checkpoint carregado
+            signature (dict): Assinatura da execução atual
+            recorder (DetectionSequence): Gravador de detecções da execução atual
             
-            # Anotar frame
-            annotated_frame = draw_detections(
-                frame_resized, 
-                results, 
-                people_count,
-                stats.max_people_in_frame,
-                stats.get_elapsed_time()
+        Returns:
+            bool: True se o vídeo, os parâmetros e os segmentos coincidem
+        """
+        if checkpoint.get("checkpoint", {}).get("signature") != signature:
+            print("  Checkpoint de outra versão do vídeo ou parâmetros diferentes, reiniciando.")
+            return False
+        
+        if not all(os.path.exists(path) for path in checkpoint["checkpoint"]["segments"]):
+            print("  Segmentos do checkpoint ausentes, reiniciando.")
+            return False
+        
+        if recorder is not None and "detections" not in checkpoint:
+            return False
+        
+        return True
+    
+    def _create_stats(self, ring_size=None):
+        """
+        Cria o rastreador de estatísticas de um vídeo, com as zonas e o profiler
+        
+        Args:
+            ring_size (int): Se definido, mantém apenas os últimos N frames na série
+            
+        Returns:
+            StatisticsTracker: Rastreador de estatísticas
+        """
+        return StatisticsTracker(
+            ring_size=ring_size,
+            zone_names=self.zone_names,
+            profiler=StageProfiler() if self.profiling else None
+        )
+    
+    def _create_writer(self, output_path, fps, stats):
+        """
+        Cria o gerenciador de escrita, se o vídeo de saída estiver habilitado
+        
+        Args:
+            output_path (str): Caminho do vídeo
+            fps (int): Frames por segundo
+            stats (StatisticsTracker): Estatísticas (fornece o coletor de latências)
+            
+        Returns:
+            VideoWriterManager: Gerenciador de escrita (None sem vídeo de saída)
+        """
+        if not self.write_video:
+            return None
+        return VideoWriterManager.from_config(self.config, output_path, fps, self.width, self.height, stats.profiler)
+    
+    def _save_profile(self, stats, video_name):
+        """
+        Salva as latências por estágio em JSON, se profiling.json_report estiver ativo
+        
+        Args:
+            stats (StatisticsTracker): Rastreador de estatísticas
+            video_name (str): Nome do vídeo processado
+        """
+        if not self.profile_json or stats.profiler is None:
+            return
+        
+        output_path = os.path.join(self.video_output_directory, "stats", f"profile_{video_name}.json")
+        stats.profiler.save_json(output_path, video=video_name, frames=stats.frame_count)
+        print(f"Perfil de estágios salvo em: {output_path}")
+    
+    def _export_frame_series(self, stats, video_name):
+        """
+        Exporta a série por frame nos formatos configurados em stats.frame_export
+        
+        Args:
+            stats (StatisticsTracker): Rastreador de estatísticas
+            video_name (str): Nome do vídeo processado
+        """
+        for fmt in self.frame_export_formats:
+            output_path = os.path.join(
+                self.video_output_directory, "stats", f"frames_{video_name}.{fmt}"
             )
+            stats.export_frames(output_path, fmt)
+            print(f"Série por frame salva em: {output_path}")
+    
+    def _set_keyframe_parameters(self, stats, scheduler):
+        """
+        Registra nas estatísticas as métricas do modo keyframe e do detector de movimento
+        
+        Args:
+            stats (StatisticsTracker): Rastreador de estatísticas
+            scheduler (KeyframeScheduler): Agendador com as métricas de keyframes
+        """
+        if scheduler is None:
+            return
+        
+        if self.tiling:
+            stats.set_parameter(
+                "Tiles inferidos",
+                f"{scheduler.tiles_inferred}/{scheduler.tiles_total} ({scheduler.get_tile_ratio() * 100:.1f}%)"
+            )
+        
+        if self.motion_gating:
+            stats.set_parameter("Limite de movimento", f"{self.motion_threshold * 100:.2f}% dos blocos")
+            stats.set_parameter(
+                "Frames sem movimento (detecções reaproveitadas)",
+                f"{scheduler.gated}/{scheduler.frames} ({scheduler.get_gated_ratio() * 100:.1f}%)"
+            )
+        
+        if not self.keyframe_mode:
+            return
+        
+        interval = f"adaptativo (até {self.max_detect_interval})" if self.adaptive_interval else self.detect_interval
+        stats.set_parameter("Intervalo de detecção", interval)
+        stats.set_parameter(
+            "Frames com inferência",
+            f"{scheduler.keyframes}/{scheduler.frames} ({scheduler.get_inference_ratio() * 100:.1f}%)"
+        )
+        stats.set_parameter(
+            "Desvio de contagem nos keyframes (médio/máximo)",
+            f"{scheduler.get_average_drift():.2f}/{scheduler.max_drift}"
+        )
+    
+    def _set_writer_parameters(self, stats, writer):
+        """
+        Registra nas estatísticas o backend de escrita e o tempo bloqueado na fila
+        
+        Args:
+            stats (StatisticsTracker): Estatísticas do vídeo
+            writer (VideoWriterManager): Gerenciador já finalizado (ou None)
+        """
+        if writer is None:
+            return
+        
+        metrics = writer.get_metrics()
+        stats.set_parameter("Escrita", writer.backend)
+        stats.set_parameter(
+            "Fila de escrita",
+            f"bloqueada {metrics['blocked_time']:.2f}s, ocupação média {metrics['mean_depth']:.1f} "
+            f"(máx. {metrics['max_depth']})"
+        )
+    
+    def _set_zone_parameters(self, stats):
+        """
+        Registra nas estatísticas as zonas de interesse e a área inferida
+        
+        Args:
+            stats (StatisticsTracker): Rastreador de estatísticas
+        """
+        if self.zones is None:
+            return
+        
+        stats.set_parameter("Zonas de interesse", ", ".join(self.zone_names))
+        if self.zones.crop_inference:
+            area_ratio = self.zones.get_area_ratio(self.width, self.height)
+            stats.set_parameter("Área inferida (recortes das zonas)", f"{area_ratio * 100:.1f}% do frame")
+    
+    def _set_cascade_parameters(self, stats, since):
+        """
+        Registra nas estatísticas os tempos de cada estágio da cascata
+        
+        Segmentos processados em outros processos não entram na medição.
+        
+        Args:
+            stats (StatisticsTracker): Rastreador de estatísticas
+            since (dict): Contadores da cascata no início do vídeo (None se o
+                modelo ainda não estava carregado)
+        """
+        if self._detector is None:
+            return
+        
+        summary = self.detector.get_cascade_summary(since)
+        if summary is None:
+            return
+        
+        proposer = self.detector.proposer
+        stats.set_parameter(
+            "Cascata (leve -> pesado)",
+            f"{proposer.weights}@{proposer.imgsz} -> {self.detector.weights}@{self.detector.imgsz}"
+        )
+        stats.set_parameter(
+            "Tempo por frame propostas/refino",
+            f"{summary['proposal_ms']:.1f}ms/{summary['refine_ms']:.1f}ms"
+        )
+        stats.set_parameter("Propostas por frame", f"{summary['proposals_per_frame']:.2f}")
+        stats.set_parameter("Área enviada ao modelo pesado", f"{summary['area_ratio'] * 100:.1f}% do frame")
+    
+    def _set_startup_parameters(self, stats, started_at):
+        """
+        Registra nas estatísticas o tempo até o primeiro frame e o carregamento do modelo
+        
+        No modo em segmentos, os frames são anotados nos workers e o tempo até o
+        primeiro frame não é medido.
+        
+        Args:
+            stats (StatisticsTracker): Rastreador de estatísticas
+            started_at (float): Início do processamento (time.perf_counter())
+        """
+        if self._first_frame_at is not None:
+            time_to_first_frame = self._first_frame_at - started_at
+            stats.set_parameter("Tempo até o primeiro frame", f"{time_to_first_frame:.2f}s")
+            print(f"  Tempo até o primeiro frame: {time_to_first_frame:.2f}s")
+        
+        # Modelo carregado durante este processamento (e não por um anterior)
+        if self._detector is not None and self._detector.loaded_at >= started_at:
+            stats.set_parameter("Carregamento do modelo", f"{self.detector.load_time:.2f}s")
+    
+    def _process_segmented(self, video_path, output_video_path, fps, total_frames, segments):
+        """
+        Processa um vídeo dividido em intervalos de frames em processos paralelos
+        
+        Os segmentos rodam só a inferência. Com as estatísticas combinadas, o
+        vídeo final é desenhado a partir das detecções, com o máximo acumulado do
+        vídeo inteiro no overlay (_render_video).
+        
+        Args:
+            video_path (str): Caminho do vídeo
+            output_video_path (str): Caminho do vídeo final
+            fps (int): Frames por segundo
+            total_frames (int): Total de frames do vídeo
+            segments (int): Número de segmentos
             
-            # Escrever frame
-            writer.write(annotated_frame)
+        Returns:
+            tuple: (StatisticsTracker combinado, DetectionSequence combinada ou
+                None se o cache estiver desabilitado)
+        """
+        # Intervalos [início, fim) de tamanho aproximadamente igual
+        bounds = [round(i * total_frames / segments) for i in range(segments + 1)]
+        ranges = list(zip(bounds[:-1], bounds[1:]))
+        
+        print(f"  Dividindo em {segments} segmento(s) processados em paralelo...")
+        
+        segment_results = process_segments_parallel(self.config, video_path, ranges, self.threads_per_worker)
+        
+        # Combinar estatísticas com índice de frame e máximo globais
+        stats = StatisticsTracker.merge([result[0] for result in segment_results])
+        scheduler = KeyframeScheduler.merge([result[1] for result in segment_results])
+        
+        # Combinar detecções dos segmentos, em ordem, para o vídeo final e o cache
+        detections = DetectionSequence()
+        for _, _, segment_detections in segment_results:
+            for index in range(len(segment_detections)):
+                detections.append(segment_detections[index])
+        
+        if self.write_video:
+            self._render_video(video_path, output_video_path, fps, stats, detections, segments)
+        
+        self._set_keyframe_parameters(stats, scheduler)
+        stats.set_parameter("Segmentos paralelos", segments)
+        
+        return stats, detections if self.cache is not None else None
+    
+    def _process_segment(self, video_path, start_frame, end_frame):
+        """
+        Detecta pessoas em um intervalo de frames de um vídeo (executado em um
+        processo worker), sem escrever vídeo
+        
+        Args:
+            video_path (str): Caminho do vídeo
+            start_frame (int): Primeiro frame do intervalo
+            end_frame (int): Frame final do intervalo (exclusivo)
             
-            # Mostrar progresso
-            if stats.frame_count % 100 == 0:
-                progress = (stats.frame_count / total_frames) * 100
-                print(f"  Progresso: {progress:.1f}% ({stats.frame_count}/{total_frames} frames)")
+        Returns:
+            tuple: (StatisticsTracker, KeyframeScheduler, DetectionSequence) do segmento
+        """
+        video = cv2.VideoCapture(video_path)
+        if not video.isOpened():
+            raise RuntimeError(f"Erro ao abrir vídeo: {os.path.basename(video_path)}")
+        
+        video.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        
+        stats = self._create_stats()
+        recorder = DetectionSequence()
+        
+        try:
+            scheduler = self._process_frames(
+                video, None, stats, end_frame - start_frame,
+                max_frames=end_frame - start_frame, recorder=recorder
+            )
+        finally:
+            video.release()
+        
+        return stats, scheduler, recorder
+    
+    def _render_video(self, video_path, output_video_path, fps, stats, detections, segments=1):
+        """
+        Desenha o vídeo final a partir das detecções e da série por frame
+        
+        Com o ffmpeg disponível e mais de um segmento, os intervalos são
+        codificados em paralelo com a mesma configuração de escrita e juntados
+        sem recodificar. Sem ffmpeg, o vídeo é codificado de uma vez neste processo.
+        
+        Args:
+            video_path (str): Caminho do vídeo de entrada
+            output_video_path (str): Caminho do vídeo final
+            fps (int): Frames por segundo
+            stats (StatisticsTracker): Estatísticas do vídeo inteiro
+            detections (DetectionSequence): Detecções de cada frame
+            segments (int): Número de intervalos codificados em paralelo
+        """
+        series = stats.get_frame_series()
+        ffmpeg_path = find_ffmpeg(self.config)
+        
+        if segments <= 1 or ffmpeg_path is None:
+            video = cv2.VideoCapture(video_path)
+            writer = self._create_writer(output_video_path, fps, stats)
+            try:
+                self._render_range(video, writer, detections, series)
+            finally:
+                video.release()
+                writer.release()
+            return
+        
+        video_name = os.path.splitext(os.path.basename(video_path))[0]
+        segment_directory = os.path.join(self.video_output_directory, "videos", f".segments_{video_name}")
+        os.makedirs(segment_directory, exist_ok=True)
+        
+        bounds = [round(i * len(detections) / segments) for i in range(segments + 1)]
+        segment_paths = [
+            os.path.join(segment_directory, f"segment_{i:03d}.mp4") for i in range(segments)
+        ]
+        tasks = []
+        for start_frame, end_frame, segment_path in zip(bounds[:-1], bounds[1:], segment_paths):
+            segment_detections = DetectionSequence()
+            for index in range(start_frame, end_frame):
+                segment_detections.append(detections[index])
+            segment_series = {name: column[start_frame:end_frame] for name, column in series.items()}
+            tasks.append((video_path, start_frame, segment_path, segment_detections, segment_series))
+        
+        try:
+            render_segments_parallel(self.config, tasks, self.threads_per_worker)
+            concatenate_videos(segment_paths, output_video_path, ffmpeg_path)
+        finally:
+            shutil.rmtree(segment_directory)
+    
+    def _render_segment(self, video_path, start_frame, segment_path, detections, series):
+        """
+        Desenha um intervalo de frames em um vídeo próprio (executado em um
+        processo worker, sem carregar o modelo)
+        
+        Args:
+            video_path (str): Caminho do vídeo de entrada
+            start_frame (int): Primeiro frame do intervalo
+            segment_path (str): Caminho do vídeo do segmento
+            detections (DetectionSequence): Detecções de cada frame do intervalo
+            series (dict): Série por frame do intervalo (get_frame_series)
+        """
+        video = cv2.VideoCapture(video_path)
+        if not video.isOpened():
+            raise RuntimeError(f"Erro ao abrir vídeo: {os.path.basename(video_path)}")
+        
+        fps = int(video.get(cv2.CAP_PROP_FPS))
+        video.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        writer = VideoWriterManager.from_config(self.config, segment_path, fps, self.width, self.height)
+        
+        try:
+            self._render_range(video, writer, detections, series)
+        finally:
+            video.release()
+            writer.release()
+    
+    def _render_range(self, video, writer, detections, series):
+        """
+        Decodifica, anota e escreve frames com detecções e overlay já conhecidos
+        
+        Args:
+            video (cv2.VideoCapture): Vídeo aberto, posicionado no primeiro frame
+            writer (VideoWriterManager): Gerenciador de escrita
+            detections (DetectionSequence): Detecções de cada frame
+            series (dict): Série por frame correspondente (get_frame_series)
+        """
+        reader = FrameReader(video, self.queue_size, threaded=self.pipeline, max_frames=len(detections))
+        
+        try:
+            for index, frame in enumerate(reader):
+                results, zone_counts = self._count_zones(detections[index])
+                output_frame = draw_detections(
+                    self._to_output_size(frame),
+                    results,
+                    int(series["people_count"][index]),
+                    int(series["max_people"][index]),
+                    float(series["elapsed_time"][index]),
+                    inplace=True
+                )
+                if self.zones:
+                    draw_zones(output_frame, self.zone_polygons, self.zone_names, zone_counts)
+                writer.write(output_frame)
+        finally:
+            reader.stop()
+    
+    def process_livestream(self, url=None):
+        """
+        Processa uma transmissão ao vivo com baixa latência
+        
+        A captura roda em thread própria e mantém apenas o frame mais recente,
+        descartando os que chegam enquanto a inferência está ocupada. Com
+        livestream.publish habilitado, os frames anotados também são
+        republicados (RTMP ou HLS) sem que a inferência espere pelo envio.
+        
+        Args:
+            url (str): URL ou caminho da fonte (padrão: livestream.url do config)
+            
+        Returns:
+            dict: Informações sobre a transmissão processada
+        """
+        url = url or self.livestream_config.get("url", "rtmp://localhost:1935/live")
+        realtime = self.livestream_config.get("realtime", os.path.isfile(url))
+        timeout = self.livestream_config.get("timeout", 10)
+        
+        try:
+            reader = LatestFrameReader(url, realtime=realtime)
+        except RuntimeError as e:
+            print(str(e))
+            return None
+        
+        fps = int(reader.fps) or 30
+        
+        # Gerar caminhos de saída
+        stream_name = f"livestream_{time.strftime('%Y%m%d_%H%M%S')}"
+        output_video_path = os.path.join(
+            self.video_output_directory, "videos", f"result_{stream_name}_annotated.mp4"
+        )
+        output_stats_path = os.path.join(
+            self.video_output_directory, "stats", f"stats_{stream_name}.txt"
+        )
         
-        # Finalizar
-        video.release()
-        writer.release()
+        # Inicializar gerenciadores
+        started_at = time.perf_counter()
+        self._first_frame_at = None
+        stats = self._create_stats(ring_size=self.livestream_config.get("stats_window", 9000))
+        try:
+            publisher = StreamPublisher.from_config(self.config, fps, stats.profiler)
+        except RuntimeError:
+            reader.release()
+            raise
+        writer = self._create_writer(output_video_path, fps, stats)
+        self.detector.set_profiler(stats.profiler)
+        tile_scheduler = self._create_tile_scheduler()
+        total_latency = 0.0
+        max_latency = 0.0
+        
+        print(f"Conectado a: {url} (Ctrl+C para encerrar)")
+        if publisher is not None:
+            print(f"Publicando em: {publisher.url}")
+        
+        try:
+            while True:
+                item = reader.read(timeout=timeout)
+                if item is None:
+                    print("Transmissão encerrada.")
+                    break
+                
+                frame, captured_at = item
+                
+                # Detectar pessoas (caixas já na resolução de saída)
+                results = self._detect([frame], tile_scheduler=tile_scheduler)[0]
+                results, zone_counts = self._count_zones(results)
+                people_count = self.detector.count_people(results)
+                
+                # Atualizar estatísticas
+                stats.update(people_count, zone_counts)
+                
+                # Anotar frame
+                annotated_frame = None
+                if writer is not None or publisher is not None:
+                    annotated_frame = draw_detections(
+                        self._to_output_size(frame), 
+                        results, 
+                        people_count,
+                        stats.max_people_in_frame,
+                        stats.get_elapsed_time(),
+                        inplace=True
+                    )
+                    if self.zones:
+                        draw_zones(annotated_frame, self.zone_polygons, self.zone_names, zone_counts)
+                
+                # Latência ponta a ponta: da captura até o frame anotado
+                latency = time.perf_counter() - captured_at
+                total_latency += latency
+                max_latency = max(max_latency, latency)
+                if stats.profiler is not None:
+                    stats.profiler.record("ponta_a_ponta", latency)
+                
+                # Escrever e republicar frame (a publicação nunca bloqueia)
+                if writer is not None:
+                    writer.write(annotated_frame)
+                if publisher is not None:
+                    publisher.publish(annotated_frame)
+                if self._first_frame_at is None:
+                    self._first_frame_at = time.perf_counter()
+                
+                # Mostrar progresso
+                if stats.frame_count % 100 == 0:
+                    print(f"  Frames: {stats.frame_count} | Latência: {latency * 1000:.0f}ms | "
+                          f"Descartados: {reader.frames_dropped}")
+        
+        except KeyboardInterrupt:
+            print("\nTransmissão interrompida pelo usuário.")
+        
+        finally:
+            # Finalizar
+            reader.release()
+            if writer is not None:
+                writer.release()
+            if publisher is not None:
+                publisher.release()
+        
+        avg_latency = total_latency / stats.frame_count if stats.frame_count else 0.0
         
         # Salvar estatísticas
-        stats.save(output_stats_path, video_name, self.width, self.height)
+        stats.set_parameter("Fonte", url)
+        stats.set_parameter("Frames capturados", reader.frames_captured)
+        stats.set_parameter("Frames descartados", reader.frames_dropped)
+        stats.set_parameter("Latência média", f"{avg_latency * 1000:.1f}ms")
+        stats.set_parameter("Latência máxima", f"{max_latency * 1000:.1f}ms")
+        self._set_writer_parameters(stats, writer)
+        publish_metrics = publisher.get_metrics() if publisher is not None else None
+        if publish_metrics is not None:
+            stats.set_parameter(
+                "Publicação",
+                f"{publisher.url} ({publish_metrics['frames_published']} publicados, "
+                f"{publish_metrics['frames_dropped']} descartados, {publish_metrics['failures']} falha(s))"
+            )
+        self._set_startup_parameters(stats, started_at)
+        stats.save(output_stats_path, stream_name, self.width, self.height)
+        self._export_frame_series(stats, stream_name)
+        self._save_profile(stats, stream_name)
         stats.print_summary()
         
-        print(f"✓ Concluído: {os.path.basename(video_path)}\n")
+        print(f"  Frames descartados: {reader.frames_dropped}")
+        print(f"  Latência média: {avg_latency * 1000:.1f}ms (máx. {max_latency * 1000:.1f}ms)")
         
         return {
-            "input_path": video_path,
-            "output_video_path": output_video_path,
+            "input_path": url,
+            "output_video_path": output_video_path if self.write_video else None,
             "output_stats_path": output_stats_path,
+            "first_frame_at": self._first_frame_at,
+            "frames_dropped": reader.frames_dropped,
+            "average_latency": avg_latency,
+            "max_latency": max_latency,
+            "publish": publish_metrics,
             "stats": stats
         }
     
+    def _annotate_cached(self, reader, annotator, cached_detections, profiler=None):
+        """
+        Envia os frames para anotação usando detecções do cache
+        
+        Args:
+            reader (FrameReader): Leitor de frames
+            annotator (PipelineStage): Estágio de anotação e escrita
+            cached_detections (DetectionSequence): Detecções por frame
+            profiler (StageProfiler): Coletor do detector, se ele precisar rodar
+        """
+        tile_scheduler = self._create_tile_scheduler()
+        for index, frame in enumerate(reader):
+            if index < len(cached_detections):
+                results = cached_detections[index]
+            else:
+                # Cache mais curto que o vídeo: detectar o restante
+                if index == len(cached_detections):
+                    self.detector.set_profiler(profiler)
+                results = self._detect([frame], tile_scheduler=tile_scheduler)[0]
+            
+            annotator.put((frame, results))
+    
+    def _cache_parameters(self):
+        """
+        Retorna os parâmetros que afetam as detecções do vídeo (chave de cache)
+        
+        Returns:
+            dict: Parâmetros do detector, dimensões e modo keyframe
+        """
+        parameters = self.cache.detector_parameters(detector_signature(self.config["model"]))
+        parameters.update(width=self.width, height=self.height)
+        
+        if self.keyframe_mode:
+            parameters.update(
+                detect_interval=self.detect_interval,
+                adaptive_interval=self.adaptive_interval,
+                max_detect_interval=self.max_detect_interval
+            )
+        
+        if self.motion_gating:
+            parameters.update(motion=self._motion_parameters())
+        
+        # Inferência recortada muda as detecções; só a contagem por zona não muda
+        if self.zones and self.zones.crop_inference:
+            parameters.update(zones=self.zones.get_signature())
+        
+        if self.tiling:
+            parameters.update(tiling=self._tiling_parameters())
+        
+        return parameters
+    
+    def _motion_parameters(self):
+        """
+        Retorna os parâmetros do detector de movimento
+        
+        Returns:
+            dict: Parâmetros ou None se desabilitado
+        """
+        if not self.motion_gating:
+            return None
+        
+        return {
+            "threshold": self.motion_threshold,
+            "pixel_threshold": self.motion_pixel_threshold,
+            "max_reuse": self.motion_max_reuse
+        }
+    
+    def _tiling_parameters(self):
+        """
+        Retorna os parâmetros do modo em tiles
+        
+        Returns:
+            dict: Parâmetros ou None se desabilitado
+        """
+        tile_scheduler = self._create_tile_scheduler()
+        return tile_scheduler.get_signature() if tile_scheduler else None
+    
+    def _process_batch(self, batch, annotator, tracker, scheduler, recorder=None, motion_gate=None,
+                       tile_scheduler=None):
+        """
+        Detecta pessoas nos keyframes de um lote e envia os resultados para anotação, em ordem
+        
+        Frames que não são keyframes recebem as caixas previstas pelo rastreador.
+        Keyframes sem movimento reaproveitam a última detecção do modelo.
+        
+        Args:
+            batch (list): Pares (frame original, ação: "detect", "track" ou "reuse")
+            annotator (PipelineStage): Estágio de anotação e escrita
+            tracker (BoxTracker): Rastreador para os frames intermediários
+            scheduler (KeyframeScheduler): Agendador de keyframes
+            recorder (DetectionSequence): Se informado, recebe as detecções de cada frame
+            motion_gate (MotionGate): Guarda a última detecção para os frames sem movimento
+            tile_scheduler (TileScheduler): Se informado, detecta em tiles na resolução nativa
+        """
+        # Detectar pessoas em uma única chamada ao modelo
+        keyframes = [frame for frame, action in batch if action == "detect"]
+        batch_results = iter(self._detect(keyframes, scheduler, tile_scheduler))
+        
+        for frame, action in batch:
+            if action == "detect":
+                results = next(batch_results)
+                
+                if motion_gate is not None:
+                    motion_gate.last_detections = results
+                
+                if self.keyframe_mode:
+                    # Medir desvio da previsão em relação à detecção
+                    if tracker.initialized:
+                        scheduler.report(tracker.predict(), results)
+                    tracker.update(results)
+            elif action == "reuse":
+                results = motion_gate.last_detections
+                
+                if self.keyframe_mode:
+                    tracker.predict()
+            else:
+                results = tracker.predict()
+            
+            if recorder is not None:
+                recorder.append(results)
+            
+            annotator.put((frame, results))
+    
+    def _detect(self, frames, scheduler=None, tile_scheduler=None):
+        """
+        Detecta pessoas em frames originais, com caixas na resolução de saída
+        
+        Args:
+            frames (list): Frames originais, todos do mesmo tamanho
+            scheduler (KeyframeScheduler): Recebe a contagem de tiles inferidos
+            tile_scheduler (TileScheduler): Se informado, detecta em tiles na
+                resolução nativa, pulando os ociosos
+            
+        Returns:
+            list: Detecções de cada frame (Detections)
+        """
+        if not frames:
+            return []
+        
+        output_size = (self.width, self.height)
+        regions = self._detection_regions(frames[0])
+        if tile_scheduler is None:
+            return self.detector.detect_batch(frames, output_size, regions)
+        
+        tiles = [tile_scheduler.select(frame, regions) for frame in frames]
+        detections = self.detector.detect_tiles(frames, tiles, output_size, tile_scheduler.merge_threshold)
+        
+        grid_size = len(tile_scheduler.get_tiles(frames[0].shape[1], frames[0].shape[0], regions))
+        for frame, frame_tiles, results in zip(frames, tiles, detections):
+            tile_scheduler.update(results, frame.shape, output_size)
+            if scheduler is not None:
+                scheduler.report_tiles(len(frame_tiles), grid_size)
+        
+        return detections
+    
+    def _detection_regions(self, frame):
+        """
+        Retorna os recortes do frame onde o detector deve rodar
+        
+        Args:
+            frame: Frame original
+            
+        Returns:
+            list: Recortes (x1, y1, x2, y2) das zonas ou None para o frame inteiro
+        """
+        if self.zones is None or not self.zones.crop_inference:
+            return None
+        return self.zones.get_regions(frame.shape[1], frame.shape[0])
+    
+    def _count_zones(self, results):
+        """
+        Mantém apenas as pessoas dentro das zonas e conta por zona
+        
+        Args:
+            results (Detections): Detecções na resolução de saída
+            
+        Returns:
+            tuple: (Detections, contagens por zona ou None sem zonas)
+        """
+        if self.zones is None:
+            return results, None
+        return self.zones.filter_and_count(results, self.width, self.height)
+    
+    def _to_output_size(self, frame):
+        """
+        Redimensiona o frame para a resolução de saída, apenas se ela for diferente
+        
+        Args:
+            frame: Frame original
+            
+        Returns:
+            Frame na resolução de saída
+        """
+        if (frame.shape[1], frame.shape[0]) != (self.width, self.height):
+            return cv2.resize(frame, (self.width, self.height))
+        return frame
+    
+    def _annotate_frame(self, frame, results, stats, writer, total_frames, show_info=True):
+        """
+        Atualiza estatísticas, anota e escreve um frame
+        
+        Args:
+            frame: Frame original (redimensionado aqui para a saída, se necessário)
+            results (Detections): Detecções do frame
+            stats (StatisticsTracker): Rastreador de estatísticas do vídeo
+            writer (VideoWriterManager): Gerenciador de escrita do vídeo (None =
+                sem vídeo de saída; apenas as estatísticas são atualizadas)
+            total_frames (int): Total de frames do vídeo (para progresso)
+            show_info (bool): Se False, não desenha o overlay de informações
+        """
+        results, zone_counts = self._count_zones(results)
+        people_count = PeopleDetector.count_people(results)
+        
+        # Atualizar estatísticas
+        stats.update(people_count, zone_counts)
+        
+        if writer is not None:
+            self._write_frame(frame, results, people_count, zone_counts, stats, writer, show_info)
+        if self._first_frame_at is None:
+            self._first_frame_at = time.perf_counter()
+        
+        # Mostrar progresso
+        if stats.frame_count % 100 == 0:
+            progress = (stats.frame_count / total_frames) * 100
+            print(f"  Progresso: {progress:.1f}% ({stats.frame_count}/{total_frames} frames)")
+    
+    def _write_frame(self, frame, results, people_count, zone_counts, stats, writer, show_info=True):
+        """
+        Redimensiona, anota e escreve um frame no vídeo de saída
+        
+        Args:
+            frame: Frame original
+            results (Detections): Detecções do frame (já filtradas pelas zonas)
+            people_count (int): Pessoas no frame
+            zone_counts (dict): Contagem por zona (ou None)
+            stats (StatisticsTracker): Rastreador de estatísticas do vídeo
+            writer (VideoWriterManager): Gerenciador de escrita do vídeo
+            show_info (bool): Se False, não desenha o overlay de informações
+        """
+        start = time.perf_counter()
+        output_frame = self._to_output_size(frame)
+        resized = time.perf_counter()
+        
+        # Anotar frame (direto no buffer de saída, que não é reutilizado)
+        annotated_frame = draw_detections(
+            output_frame, 
+            results, 
+            people_count,
+            stats.max_people_in_frame,
+            stats.get_elapsed_time(),
+            show_info=show_info,
+            inplace=True
+        )
+        if self.zones:
+            draw_zones(annotated_frame, self.zone_polygons, self.zone_names, zone_counts)
+        
+        if stats.profiler is not None:
+            stats.profiler.record("redimensionamento", resized - start)
+            stats.profiler.record("anotação", time.perf_counter() - resized)
+        
+        # Escrever frame
+        writer.write(annotated_frame)
+    
     def _print_summary(self, processed_videos, failed_videos):
         """
         Imprime resumo do processamento
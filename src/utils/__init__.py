@@ -2,15 +2,28 @@
 Utilitários do sistema
 """
 from .config_loader import load_config, validate_config
-from .annotations import draw_detections, draw_info_overlay
+from .annotations import draw_detections, draw_info_overlay, draw_zones
 from .video_writer import VideoWriterManager
+from .stream_publisher import StreamPublisher
+from .shared_frames import SharedFrameRing
 from .stats import StatisticsTracker
+from .profiler import StageProfiler
+from .pipeline import FrameReader, PipelineStage
+from .checkpoint import save_checkpoint, load_checkpoint
 
 __all__ = [
     "load_config",
     "validate_config", 
     "draw_detections",
     "draw_info_overlay",
+    "draw_zones",
     "VideoWriterManager",
-    "StatisticsTracker"
+    "StreamPublisher",
+    "SharedFrameRing",
+    "StatisticsTracker",
+    "StageProfiler",
+    "FrameReader",
+    "PipelineStage",
+    "save_checkpoint",
+    "load_checkpoint"
 ]
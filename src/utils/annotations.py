@@ -2,67 +2,79 @@
 Módulo para desenhar anotações nos frames
 """
 import cv2
+import numpy as np
+from functools import lru_cache
 
 
-def draw_detections(frame, results, people_count, max_people=0, elapsed_time=0.0):
+# Parâmetros das labels das caixas
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_FONT_SCALE = 0.5
+LABEL_THICKNESS = 2
+BOX_COLOR = (0, 128, 0)
+TEXT_COLOR = (255, 255, 255)
+
+
+@lru_cache(maxsize=512)
+def get_label_size(label):
+    """
+    Retorna as dimensões do texto de uma label, com cache
+    
+    As labels variam apenas na confiança com duas casas decimais, então o
+    cache evita chamar cv2.getTextSize a cada caixa.
+    
+    Args:
+        label (str): Texto da label
+        
+    Returns:
+        tuple: (largura, altura) do texto em pixels
+    """
+    return cv2.getTextSize(label, LABEL_FONT, LABEL_FONT_SCALE, LABEL_THICKNESS)[0]
+
+
+def draw_detections(frame, results, people_count, max_people=0, elapsed_time=0.0,
+                    show_info=True, inplace=False):
     """
     Desenha detecções e informações no frame
     
     Args:
         frame: Frame original
-        results: Resultados da detecção YOLO
+        results (Detections): Detecções do frame
         people_count (int): Número de pessoas no frame
         max_people (int): Máximo de pessoas detectado até o momento
         elapsed_time (float): Tempo decorrido de processamento
+        show_info (bool): Se False, desenha apenas as caixas (sem o overlay)
+        inplace (bool): Se True, desenha diretamente no frame recebido, sem cópia
+            (use quando o frame original não for reutilizado)
         
     Returns:
         Frame anotado com as detecções
     """
-    annotated_frame = frame.copy()
+    annotated_frame = frame if inplace else frame.copy()
     
-    # Desenhar caixas delimitadoras e labels
-    for box in results.boxes:
-        # Obter coordenadas e confiança
-        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().astype(int)
-        confidence = box.conf[0].cpu().numpy().astype(float)
-        
-        # Desenhar caixa delimitadora (verde)
-        cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), (0, 128, 0), 2)
-        
-        # Criar label
-        label = f"Person {confidence:.2f}"
+    if len(results):
+        # Extrair caixas e confianças uma única vez
+        boxes = results.xyxy.astype(int)
+        labels = [f"Person {confidence:.2f}" for confidence in results.conf.tolist()]
+        label_sizes = np.array([get_label_size(label) for label in labels], dtype=int).reshape(-1, 2)
         
-        # Calcular tamanho do texto
-        font = cv2.FONT_HERSHEY_SIMPLEX
-        font_scale = 0.5
-        thickness = 2
-        text_size = cv2.getTextSize(label, font, font_scale, thickness)[0]
+        # Posição dos quadradinhos das labels (acima das caixas), calculada em lote
+        label_x2 = boxes[:, 0] + label_sizes[:, 0] + 10
+        label_y1 = np.maximum(0, boxes[:, 1] - label_sizes[:, 1] - 10)
         
-        # Posição do quadradinho (acima da caixa)
-        label_y1 = max(0, y1 - text_size[1] - 10)
-        label_x1 = x1
-        label_x2 = x1 + text_size[0] + 10
-        label_y2 = y1
-        
-        # Ajustar se estiver fora da imagem
-        if label_y1 < 0:
-            label_y1 = 0
-            label_y2 = text_size[1] + 10
-        
-        # Desenhar quadradinho de fundo (preto com borda verde)
-        cv2.rectangle(annotated_frame, (label_x1, label_y1), 
-                     (label_x2, label_y2), (0, 128, 0), -1)
-        cv2.rectangle(annotated_frame, (label_x1, label_y1), 
-                     (label_x2, label_y2), (0, 128, 0), 1)
-        
-        # Desenhar texto (branco)
-        text_x = x1 + 5
-        text_y = y1 - 5
-        cv2.putText(annotated_frame, label, (text_x, text_y),
-                   font, font_scale, (255, 255, 255), thickness)
+        for (x1, y1, x2, y2), label, lx2, ly1 in zip(boxes.tolist(), labels, label_x2.tolist(), label_y1.tolist()):
+            # Desenhar caixa delimitadora (verde)
+            cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), BOX_COLOR, 2)
+            
+            # Desenhar quadradinho de fundo da label (verde)
+            cv2.rectangle(annotated_frame, (x1, ly1), (lx2, y1), BOX_COLOR, -1)
+            
+            # Desenhar texto (branco)
+            cv2.putText(annotated_frame, label, (x1 + 5, y1 - 5),
+                       LABEL_FONT, LABEL_FONT_SCALE, TEXT_COLOR, LABEL_THICKNESS)
     
     # Adicionar informações gerais
-    draw_info_overlay(annotated_frame, people_count, max_people, elapsed_time)
+    if show_info:
+        draw_info_overlay(annotated_frame, people_count, max_people, elapsed_time)
     
     return annotated_frame
 
@@ -90,3 +102,30 @@ def draw_info_overlay(frame, people_count, max_people=0, elapsed_time=0.0):
     if max_people > 0:
         cv2.putText(frame, f"Maximo: {max_people}",
                    (10, 130), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 255), 2)
+
+
+# Cor dos polígonos das zonas de interesse
+ZONE_COLOR = (255, 200, 0)
+
+
+def draw_zones(frame, polygons, names, zone_counts):
+    """
+    Desenha as zonas de interesse e a contagem de pessoas em cada uma
+    
+    Args:
+        frame: Frame a ser anotado (desenhado no próprio frame)
+        polygons (list): Vértices (N, 2) de cada zona, em pixels do frame
+        names (list): Nomes das zonas
+        zone_counts (list): Número de pessoas em cada zona
+    """
+    for polygon, name, count in zip(polygons, names, zone_counts):
+        points = np.round(polygon).astype(np.int32)
+        cv2.polylines(frame, [points], True, ZONE_COLOR, 2)
+        
+        # Label no vértice mais alto da zona
+        x, y = points[np.argmin(points[:, 1])].tolist()
+        label = f"{name}: {count}"
+        label_width, label_height = get_label_size(label)
+        y = max(y, label_height + 10)
+        cv2.rectangle(frame, (x, y - label_height - 10), (x + label_width + 10, y), ZONE_COLOR, -1)
+        cv2.putText(frame, label, (x + 5, y - 5), LABEL_FONT, LABEL_FONT_SCALE, (0, 0, 0), LABEL_THICKNESS)
@@ -0,0 +1,63 @@
+"""
+Módulo para salvar e carregar checkpoints de processamento
+"""
+import json
+import os
+import numpy as np
+
+
+def save_checkpoint(checkpoint_path, sections):
+    """
+    Salva um checkpoint de forma atômica
+    
+    Arrays NumPy são gravados diretamente no arquivo npz; os demais valores
+    (números, textos, listas e dicionários) são gravados como JSON.
+    
+    Args:
+        checkpoint_path (str): Caminho do arquivo de checkpoint (.npz)
+        sections (dict): Seção -> dicionário de valores (ex.: "stats", "tracker")
+    """
+    metadata = {}
+    arrays = {}
+    
+    for section, values in sections.items():
+        metadata[section] = {}
+        for name, value in values.items():
+            if isinstance(value, np.ndarray):
+                arrays[f"{section}/{name}"] = value
+            else:
+                metadata[section][name] = value
+    
+    os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+    
+    # Escrever em arquivo temporário e substituir: um checkpoint nunca fica pela metade
+    temp_path = f"{checkpoint_path}.tmp.npz"
+    np.savez(temp_path, metadata=np.array(json.dumps(metadata)), **arrays)
+    os.replace(temp_path, checkpoint_path)
+
+
+def load_checkpoint(checkpoint_path):
+    """
+    Carrega um checkpoint salvo por save_checkpoint
+    
+    Args:
+        checkpoint_path (str): Caminho do arquivo de checkpoint (.npz)
+    
+    Returns:
+        dict: Seção -> dicionário de valores, ou None se não houver checkpoint válido
+    """
+    if not os.path.exists(checkpoint_path):
+        return None
+    
+    try:
+        with np.load(checkpoint_path) as data:
+            sections = json.loads(str(data["metadata"]))
+            for key in data.files:
+                if key == "metadata":
+                    continue
+                section, name = key.split("/", 1)
+                sections.setdefault(section, {})[name] = data[key]
+    except (OSError, ValueError, KeyError):
+        return None
+    
+    return sections
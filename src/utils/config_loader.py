@@ -47,4 +47,45 @@ def validate_config(config):
         if key not in config:
             raise ValueError(f"Configuração obrigatória ausente: {key}")
     
+    apply_inference_parameters(config)
+    
     return True
+
+
+def apply_inference_parameters(config):
+    """
+    Valida o bloco "inference_parameters" e o aplica às configurações do modelo
+    
+    O detector lê conf, iou, classes e verbose da seção "model"; os valores de
+    "inference_parameters" têm precedência sobre os definidos lá.
+    
+    Args:
+        config (dict): Configurações a validar (alteradas no lugar)
+        
+    Raises:
+        ValueError: Se algum parâmetro for desconhecido ou inválido
+    """
+    parameters = config.get("inference_parameters", {})
+    if not isinstance(parameters, dict):
+        raise ValueError("inference_parameters deve ser um objeto")
+    
+    unknown = set(parameters) - {"conf", "iou", "classes", "verbose"}
+    if unknown:
+        raise ValueError(f"Parâmetros de inferência desconhecidos: {', '.join(sorted(unknown))}")
+    
+    for name in ("conf", "iou"):
+        value = parameters.get(name)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 1):
+            raise ValueError(f"inference_parameters.{name} deve ser um número entre 0 e 1: {value!r}")
+    
+    classes = parameters.get("classes")
+    if classes is not None and (
+        not isinstance(classes, list) or not classes
+        or not all(isinstance(c, int) and not isinstance(c, bool) and c >= 0 for c in classes)
+    ):
+        raise ValueError(f"inference_parameters.classes deve ser uma lista de índices de classe: {classes!r}")
+    
+    if "verbose" in parameters and not isinstance(parameters["verbose"], bool):
+        raise ValueError(f"inference_parameters.verbose deve ser true ou false: {parameters['verbose']!r}")
+    
+    config["model"].update(parameters)
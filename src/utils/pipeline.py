@@ -0,0 +1,307 @@
+"""
+Módulo com estágios de pipeline para processamento de vídeos
+"""
+import cv2
+import time
+import threading
+import queue
+
+
+class FrameReader:
+    """Leitor de frames que decodifica em thread própria"""
+    
+    def __init__(self, video, maxsize=8, threaded=True, max_frames=None, profiler=None):
+        """
+        Inicializa o leitor de frames
+        
+        Args:
+            video (cv2.VideoCapture): Vídeo já aberto (frames na resolução original;
+                o redimensionamento fica com o Letterbox do detector)
+            maxsize (int): Máximo de frames decodificados aguardando consumo
+            threaded (bool): Se False, decodifica na thread de quem itera
+            max_frames (int): Número máximo de frames a ler (None = até o fim)
+            profiler (StageProfiler): Se informado, recebe as latências de
+                decodificação, de espera do consumidor e a ocupação da fila
+        """
+        self.video = video
+        self.threaded = threaded
+        self.max_frames = max_frames
+        self.profiler = profiler
+        self.frames_read = 0
+        self.error = None
+        
+        self._stop_event = threading.Event()
+        self.frame_queue = queue.Queue(maxsize=max(1, maxsize))
+        self.reader_thread = None
+        
+        if self.threaded:
+            self.reader_thread = threading.Thread(target=self._reader_worker, daemon=True)
+            self.reader_thread.start()
+    
+    def _read_frame(self):
+        """
+        Lê o próximo frame
+        
+        Returns:
+            Frame ou None no fim do vídeo
+        """
+        if self.max_frames is not None and self.frames_read >= self.max_frames:
+            return None
+        
+        start = time.perf_counter()
+        ret, frame = self.video.read()
+        if not ret:
+            return None
+        
+        self.frames_read += 1
+        
+        if self.profiler is not None:
+            self.profiler.record("decodificação", time.perf_counter() - start)
+        return frame
+    
+    def _put(self, item):
+        """
+        Coloca item na fila respeitando o sinal de parada
+        
+        Returns:
+            bool: False se o leitor foi parado
+        """
+        while not self._stop_event.is_set():
+            try:
+                self.frame_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _reader_worker(self):
+        """Worker thread para decodificar frames"""
+        try:
+            while not self._stop_event.is_set():
+                frame = self._read_frame()
+                if frame is None:
+                    break
+                if not self._put(frame):
+                    return
+        except Exception as e:
+            self.error = e
+        
+        self._put(None)  # Sinal de fim
+    
+    def __iter__(self):
+        """Itera sobre os frames, em ordem"""
+        profiler = self.profiler
+        while True:
+            if self.threaded and profiler is not None:
+                # Fila vazia e espera longa: a decodificação limita o pipeline
+                profiler.record_depth("decodificação", self.frame_queue.qsize())
+                start = time.perf_counter()
+                frame = self.frame_queue.get()
+                profiler.record("espera_decodificação", time.perf_counter() - start)
+            elif self.threaded:
+                frame = self.frame_queue.get()
+            else:
+                frame = self._read_frame()
+            
+            if frame is None:
+                break
+            
+            yield frame
+        
+        if self.error is not None:
+            raise self.error
+    
+    def stop(self):
+        """Interrompe a leitura e aguarda a thread terminar"""
+        self._stop_event.set()
+        
+        if self.reader_thread is not None:
+            # Esvaziar fila para liberar a thread caso esteja bloqueada
+            while self.reader_thread.is_alive():
+                try:
+                    self.frame_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self.reader_thread.join()
+
+
+class PipelineStage:
+    """Estágio de pipeline que consome itens de uma fila limitada em thread própria"""
+    
+    def __init__(self, handler, maxsize=8, threaded=True, name="pipeline-stage", profiler=None, profile_name=None):
+        """
+        Inicializa o estágio
+        
+        Args:
+            handler (callable): Função chamada para cada item, em ordem
+            maxsize (int): Máximo de itens aguardando processamento
+            threaded (bool): Se False, executa o handler diretamente em put()
+            name (str): Nome da thread do estágio
+            profiler (StageProfiler): Se informado, recebe a ocupação da fila e o
+                tempo que o produtor fica bloqueado em put()
+            profile_name (str): Nome do estágio no profiler (padrão: name)
+        """
+        self.handler = handler
+        self.threaded = threaded
+        self.profiler = profiler
+        self.profile_name = profile_name or name
+        self.error = None
+        
+        self.item_queue = queue.Queue(maxsize=max(1, maxsize))
+        self.stage_thread = None
+        
+        if self.threaded:
+            self.stage_thread = threading.Thread(target=self._stage_worker, name=name, daemon=True)
+            self.stage_thread.start()
+    
+    def _stage_worker(self):
+        """Worker thread do estágio"""
+        while True:
+            item = self.item_queue.get()
+            
+            if item is None:  # Sinal de parada
+                break
+            
+            # Após um erro, apenas esvazia a fila para não bloquear o produtor
+            if self.error is not None:
+                continue
+            
+            try:
+                self.handler(item)
+            except Exception as e:
+                self.error = e
+    
+    def put(self, item):
+        """
+        Envia item ao estágio, bloqueando enquanto a fila estiver cheia
+        
+        Args:
+            item: Item a ser processado
+        """
+        if self.error is not None:
+            raise self.error
+        
+        if self.threaded and self.profiler is not None:
+            # Fila cheia e espera longa: este estágio limita o pipeline
+            self.profiler.record_depth(self.profile_name, self.item_queue.qsize())
+            start = time.perf_counter()
+            self.item_queue.put(item)
+            self.profiler.record(f"espera_{self.profile_name}", time.perf_counter() - start)
+        elif self.threaded:
+            self.item_queue.put(item)
+        else:
+            self.handler(item)
+    
+    def close(self):
+        """Aguarda o processamento dos itens pendentes e finaliza a thread"""
+        if self.stage_thread is not None:
+            self.item_queue.put(None)
+            self.stage_thread.join()
+            self.stage_thread = None
+        
+        if self.error is not None:
+            raise self.error
+
+
+class LatestFrameReader:
+    """Leitor de fonte ao vivo que mantém apenas o frame mais recente"""
+    
+    def __init__(self, source, realtime=False):
+        """
+        Inicializa a captura em thread própria
+        
+        Args:
+            source (str): URL ou caminho de qualquer fonte legível pelo OpenCV
+            realtime (bool): Se True, entrega os frames no ritmo do FPS da fonte
+                (útil para simular uma transmissão a partir de um arquivo local)
+            
+        Raises:
+            RuntimeError: Se a fonte não puder ser aberta
+        """
+        self.source = source
+        self.realtime = realtime
+        self.capture = cv2.VideoCapture(source)
+        
+        if not self.capture.isOpened():
+            raise RuntimeError(f"Erro ao abrir fonte ao vivo: {source}")
+        
+        # Evitar que o backend acumule frames antigos (nem todos suportam)
+        self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 0
+        
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.finished = False
+        self.error = None
+        
+        self._condition = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self._stop_event = threading.Event()
+        
+        self.capture_thread = threading.Thread(target=self._capture_worker, daemon=True)
+        self.capture_thread.start()
+    
+    def _capture_worker(self):
+        """Worker thread que captura frames continuamente"""
+        interval = 1.0 / self.fps if self.realtime and self.fps > 0 else 0.0
+        next_time = time.perf_counter()
+        
+        try:
+            while not self._stop_event.is_set():
+                ret, frame = self.capture.read()
+                if not ret:
+                    break
+                
+                # Simular chegada em tempo real
+                if interval:
+                    next_time += interval
+                    delay = next_time - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                
+                with self._condition:
+                    # Frame anterior não consumido é descartado
+                    if self._frame is not None:
+                        self.frames_dropped += 1
+                    
+                    self._frame = frame
+                    self._timestamp = time.perf_counter()
+                    self.frames_captured += 1
+                    self._condition.notify()
+        except Exception as e:
+            self.error = e
+        
+        with self._condition:
+            self.finished = True
+            self._condition.notify()
+    
+    def read(self, timeout=None):
+        """
+        Retorna o frame mais recente, aguardando se ainda não houver um novo
+        
+        Args:
+            timeout (float): Tempo máximo de espera em segundos
+            
+        Returns:
+            tuple: (frame, timestamp de captura em time.perf_counter()) ou None
+                se a fonte terminou ou o tempo de espera esgotou
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._frame is not None or self.finished, timeout)
+            
+            if self._frame is None:
+                if self.error is not None:
+                    raise self.error
+                return None
+            
+            frame, timestamp = self._frame, self._timestamp
+            self._frame = None
+        
+        return frame, timestamp
+    
+    def release(self):
+        """Interrompe a captura e libera a fonte"""
+        self._stop_event.set()
+        self.capture_thread.join()
+        self.capture.release()
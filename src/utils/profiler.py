@@ -0,0 +1,355 @@
+"""
+Módulo de instrumentação por estágio com histogramas compactos de latência
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Buckets logarítmicos de 1µs a 1000s, 20 por década (~12% de largura cada)
+HISTOGRAM_MIN = 1e-6
+BUCKETS_PER_DECADE = 20
+HISTOGRAM_BUCKETS = 9 * BUCKETS_PER_DECADE + 2
+
+# Percentis reportados
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """Histograma de latências em buckets logarítmicos (memória constante)"""
+    
+    def __init__(self):
+        """Inicializa o histograma vazio"""
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def record(self, seconds, count=1):
+        """
+        Registra uma medição
+        
+        Args:
+            seconds (float): Latência em segundos
+            count (int): Número de frames representados pela medição (ex.: lote
+                de N frames registrado com a latência média por frame)
+        """
+        if seconds <= HISTOGRAM_MIN:
+            index = 0
+        else:
+            index = min(HISTOGRAM_BUCKETS - 1, int(math.log10(seconds / HISTOGRAM_MIN) * BUCKETS_PER_DECADE) + 1)
+        
+        self.counts[index] += count
+        self.count += count
+        self.total += seconds * count
+        if seconds > self.max:
+            self.max = seconds
+    
+    def percentile(self, percentile):
+        """
+        Retorna o limite superior do bucket que contém o percentil
+        
+        Args:
+            percentile (float): Percentil desejado (0-100)
+        
+        Returns:
+            float: Latência em segundos (0 se não houver medições)
+        """
+        if self.count == 0:
+            return 0.0
+        
+        target = math.ceil(self.count * percentile / 100)
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(self.max, HISTOGRAM_MIN * 10 ** (index / BUCKETS_PER_DECADE))
+        return self.max
+    
+    def merge(self, other):
+        """
+        Acrescenta as medições de outro histograma
+        
+        Args:
+            other (LatencyHistogram): Histograma a somar
+        """
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+    
+    def summary(self):
+        """
+        Resume o histograma
+        
+        Returns:
+            dict: Medições, total (s), média, percentis e máximo (ms)
+        """
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_ms": self.total * 1000 / self.count if self.count else 0.0,
+            **{f"p{p}_ms": self.percentile(p) * 1000 for p in PERCENTILES},
+            "max_ms": self.max * 1000
+        }
+    
+    def get_state(self):
+        """Retorna o estado do histograma (valores compatíveis com JSON)"""
+        return {"counts": self.counts, "count": self.count, "total": self.total, "max": self.max}
+    
+    def set_state(self, state):
+        """Restaura o estado salvo por get_state"""
+        self.counts = [int(value) for value in state["counts"]]
+        self.count = int(state["count"])
+        self.total = float(state["total"])
+        self.max = float(state["max"])
+
+
+class DepthHistogram:
+    """Histograma de ocupação de uma fila (um bucket por valor de profundidade)"""
+    
+    def __init__(self):
+        """Inicializa o histograma vazio"""
+        self.counts = []
+        self.count = 0
+    
+    def record(self, depth):
+        """
+        Registra a profundidade observada
+        
+        Args:
+            depth (int): Itens na fila
+        """
+        if depth >= len(self.counts):
+            self.counts.extend([0] * (depth + 1 - len(self.counts)))
+        self.counts[depth] += 1
+        self.count += 1
+    
+    def percentile(self, percentile):
+        """
+        Retorna a profundidade no percentil informado
+        
+        Args:
+            percentile (float): Percentil desejado (0-100)
+        
+        Returns:
+            int: Profundidade (0 se não houver medições)
+        """
+        target = math.ceil(self.count * percentile / 100)
+        cumulative = 0
+        for depth, depth_count in enumerate(self.counts):
+            cumulative += depth_count
+            if cumulative >= target:
+                return depth
+        return 0
+    
+    def merge(self, other):
+        """
+        Acrescenta as medições de outro histograma
+        
+        Args:
+            other (DepthHistogram): Histograma a somar
+        """
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for depth, depth_count in enumerate(other.counts):
+            self.counts[depth] += depth_count
+        self.count += other.count
+    
+    def summary(self):
+        """
+        Resume o histograma
+        
+        Returns:
+            dict: Medições, média, percentis e máximo
+        """
+        total = sum(depth * depth_count for depth, depth_count in enumerate(self.counts))
+        return {
+            "count": self.count,
+            "mean": total / self.count if self.count else 0.0,
+            **{f"p{p}": self.percentile(p) for p in PERCENTILES},
+            "max": len(self.counts) - 1 if self.counts else 0
+        }
+    
+    def get_state(self):
+        """Retorna o estado do histograma (valores compatíveis com JSON)"""
+        return {"counts": self.counts, "count": self.count}
+    
+    def set_state(self, state):
+        """Restaura o estado salvo por get_state"""
+        self.counts = [int(value) for value in state["counts"]]
+        self.count = int(state["count"])
+
+
+class StageProfiler:
+    """Coleta latências por estágio e profundidades de fila de um processamento"""
+    
+    def __init__(self):
+        """Inicializa o coletor vazio"""
+        self.stages = {}
+        self.queues = {}
+        
+        # Estágios são registrados por threads diferentes (leitura, inferência, escrita)
+        self._lock = threading.Lock()
+    
+    def record(self, stage, seconds, count=1):
+        """
+        Registra a latência de um estágio
+        
+        Args:
+            stage (str): Nome do estágio
+            seconds (float): Latência por frame, em segundos
+            count (int): Número de frames representados
+        """
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = LatencyHistogram()
+            histogram.record(seconds, count)
+    
+    def record_depth(self, name, depth):
+        """
+        Registra a profundidade de uma fila
+        
+        Args:
+            name (str): Nome da fila
+            depth (int): Itens na fila
+        """
+        with self._lock:
+            histogram = self.queues.get(name)
+            if histogram is None:
+                histogram = self.queues[name] = DepthHistogram()
+            histogram.record(depth)
+    
+    @contextmanager
+    def measure(self, stage, count=1):
+        """
+        Mede o tempo do bloco e registra como latência do estágio
+        
+        Args:
+            stage (str): Nome do estágio
+            count (int): Número de frames processados no bloco (a latência
+                registrada é por frame)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) / max(1, count), count)
+    
+    @classmethod
+    def merge(cls, profilers):
+        """
+        Combina coletores de segmentos de um mesmo processamento
+        
+        Args:
+            profilers (list): Coletores (valores None são ignorados)
+        
+        Returns:
+            StageProfiler: Coletor combinado
+        """
+        merged = cls()
+        for profiler in profilers:
+            if profiler is None:
+                continue
+            for stage, histogram in profiler.stages.items():
+                merged.stages.setdefault(stage, LatencyHistogram()).merge(histogram)
+            for name, histogram in profiler.queues.items():
+                merged.queues.setdefault(name, DepthHistogram()).merge(histogram)
+        return merged
+    
+    def summary(self):
+        """
+        Resume todos os estágios e filas
+        
+        Returns:
+            dict: "stages" (latências em ms) e "queues" (profundidades)
+        """
+        return {
+            "stages": {stage: histogram.summary() for stage, histogram in self.stages.items()},
+            "queues": {name: histogram.summary() for name, histogram in self.queues.items()}
+        }
+    
+    def format_lines(self):
+        """
+        Formata o resumo para o arquivo de estatísticas
+        
+        Returns:
+            list: Linhas de texto (sem quebra de linha)
+        """
+        summary = self.summary()
+        lines = []
+        
+        if summary["stages"]:
+            lines.append("Latência por estágio (por frame; média/p50/p95/p99/máx em ms; total em s):")
+            for stage, values in summary["stages"].items():
+                lines.append(
+                    f"  {stage}: {values['mean_ms']:.2f}/{values['p50_ms']:.2f}/{values['p95_ms']:.2f}/"
+                    f"{values['p99_ms']:.2f}/{values['max_ms']:.2f} ({values['total_s']:.2f}s, "
+                    f"{values['count']} frames)"
+                )
+        
+        if summary["queues"]:
+            lines.append("Ocupação das filas (média/p50/p95/p99/máx):")
+            for name, values in summary["queues"].items():
+                lines.append(
+                    f"  {name}: {values['mean']:.1f}/{values['p50']}/{values['p95']}/"
+                    f"{values['p99']}/{values['max']}"
+                )
+        
+        return lines
+    
+    def save_json(self, output_path, **extra):
+        """
+        Salva o resumo em JSON
+        
+        Args:
+            output_path (str): Caminho do arquivo de saída
+            **extra: Campos adicionais (ex.: nome do vídeo)
+        """
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(dict(extra, **self.summary()), f, indent=2, ensure_ascii=False)
+    
+    def __getstate__(self):
+        """Estado para pickle (o lock não é serializável; usado entre processos)"""
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+    
+    def __setstate__(self, state):
+        """Restaura o estado do pickle recriando o lock"""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def get_state(self):
+        """
+        Retorna o estado do coletor (para checkpoints; valores compatíveis com JSON)
+        
+        Returns:
+            dict: Estado de cada histograma
+        """
+        return {
+            "stages": {stage: histogram.get_state() for stage, histogram in self.stages.items()},
+            "queues": {name: histogram.get_state() for name, histogram in self.queues.items()}
+        }
+    
+    def set_state(self, state):
+        """
+        Restaura o estado salvo por get_state
+        
+        Args:
+            state (dict): Estado do coletor
+        """
+        self.stages = {}
+        for stage, histogram_state in state["stages"].items():
+            self.stages[stage] = LatencyHistogram()
+            self.stages[stage].set_state(histogram_state)
+        
+        self.queues = {}
+        for name, histogram_state in state["queues"].items():
+            self.queues[name] = DepthHistogram()
+            self.queues[name].set_state(histogram_state)
@@ -0,0 +1,283 @@
+"""
+Módulo de buffers circulares de frames em memória compartilhada entre processos
+"""
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+
+
+# Campos do cabeçalho (int64)
+_LATEST_SLOT = 0
+_LATEST_SEQUENCE = 1
+_READING_SLOT = 2
+_FINISHED = 3
+_FRAMES_WRITTEN = 4
+_FAILED = 5
+_HEADER_FIELDS = 6
+
+# Sequência de um slot em escrita (leitores descartam o frame)
+_WRITING = -1
+
+
+class SharedFrameRing:
+    """
+    Buffer circular de frames de tamanho fixo em multiprocessing.shared_memory
+    
+    Um único produtor (processo de captura) escreve e um único consumidor
+    (processo de inferência) lê os frames direto da memória compartilhada, sem
+    pickle nem cópia entre processos. O produtor nunca escreve no slot mais
+    recente nem no slot em leitura; cada slot tem um número de sequência,
+    marcado como em escrita durante a cópia, que o consumidor confere antes e
+    depois de usar o frame (como um seqlock).
+    """
+    
+    def __init__(self, shm, width, height, slots, owner):
+        """
+        Mapeia o bloco de memória compartilhada (use create ou attach)
+        
+        Args:
+            shm (SharedMemory): Bloco de memória compartilhada
+            width (int): Largura dos frames
+            height (int): Altura dos frames
+            slots (int): Número de frames no buffer
+            owner (bool): Se True, o bloco é removido em close()
+        """
+        self.shm = shm
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.owner = owner
+        
+        header_size = (_HEADER_FIELDS + slots) * 8
+        timestamps_offset = _align(header_size)
+        frames_offset = _align(timestamps_offset + slots * 8)
+        
+        self._header = np.ndarray((_HEADER_FIELDS,), np.int64, shm.buf, 0)
+        self._sequences = np.ndarray((slots,), np.int64, shm.buf, _HEADER_FIELDS * 8)
+        self._timestamps = np.ndarray((slots,), np.float64, shm.buf, timestamps_offset)
+        self.frames = np.ndarray((slots, height, width, 3), np.uint8, shm.buf, frames_offset)
+        
+        # Sequência do próximo frame escrito (produtor) e slot reservado (consumidor)
+        self._next_sequence = int(self._header[_LATEST_SEQUENCE]) + 1
+        self._reading_slot = -1
+    
+    @classmethod
+    def create(cls, width, height, slots=4):
+        """
+        Cria um buffer novo (processo dono)
+        
+        Args:
+            width (int): Largura dos frames
+            height (int): Altura dos frames
+            slots (int): Número de frames no buffer (mínimo 3)
+        
+        Returns:
+            SharedFrameRing: Buffer criado, com todos os slots vazios
+        """
+        slots = max(3, int(slots))
+        size = _align(_align((_HEADER_FIELDS + slots) * 8) + slots * 8) + slots * height * width * 3
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        
+        ring = cls(shm, width, height, slots, owner=True)
+        ring._header[:] = 0
+        ring._header[_LATEST_SLOT] = -1
+        ring._header[_READING_SLOT] = -1
+        ring._sequences[:] = 0
+        ring._next_sequence = 1
+        return ring
+    
+    @classmethod
+    def attach(cls, spec):
+        """
+        Abre um buffer criado em outro processo
+        
+        Args:
+            spec (dict): Descrição retornada por get_spec()
+        
+        Returns:
+            SharedFrameRing: Buffer mapeado (não é removido em close())
+        """
+        shm = shared_memory.SharedMemory(name=spec["name"])
+        return cls(shm, spec["width"], spec["height"], spec["slots"], owner=False)
+    
+    def get_spec(self):
+        """
+        Retorna a descrição do buffer para outro processo (valores simples, picklable)
+        
+        Returns:
+            dict: Nome do bloco, dimensões e número de slots
+        """
+        return {"name": self.shm.name, "width": self.width, "height": self.height, "slots": self.slots}
+    
+    def write(self, frame, timestamp=None):
+        """
+        Escreve um frame no próximo slot livre (produtor)
+        
+        O frame é redimensionado direto para o slot quando o tamanho difere.
+        
+        Args:
+            frame: Frame BGR
+            timestamp (float): Instante de captura em time.time() (padrão: agora)
+        """
+        latest = int(self._header[_LATEST_SLOT])
+        reading = int(self._header[_READING_SLOT])
+        
+        slot = (latest + 1) % self.slots
+        while slot == latest or slot == reading:
+            slot = (slot + 1) % self.slots
+        
+        self._sequences[slot] = _WRITING
+        target = self.frames[slot]
+        if frame.shape == target.shape:
+            np.copyto(target, frame)
+        else:
+            cv2.resize(frame, (self.width, self.height), dst=target)
+        
+        sequence = self._next_sequence
+        self._next_sequence += 1
+        self._timestamps[slot] = time.time() if timestamp is None else timestamp
+        self._sequences[slot] = sequence
+        self._header[_LATEST_SLOT] = slot
+        self._header[_FRAMES_WRITTEN] += 1
+        self._header[_LATEST_SEQUENCE] = sequence
+    
+    def read_latest(self, after_sequence=0):
+        """
+        Reserva o frame mais recente para leitura (consumidor)
+        
+        O frame retornado é uma view da memória compartilhada, válida até a
+        próxima chamada; confira is_current() depois de usá-lo.
+        
+        Args:
+            after_sequence (int): Sequência do último frame já consumido
+        
+        Returns:
+            tuple: (sequência, frame, timestamp) ou None se não houver frame novo
+        """
+        sequence = int(self._header[_LATEST_SEQUENCE])
+        if sequence <= after_sequence:
+            return None
+        
+        slot = int(self._header[_LATEST_SLOT])
+        self._header[_READING_SLOT] = slot
+        self._reading_slot = slot
+        
+        # O produtor pode ter reaproveitado o slot antes da reserva: tentar na próxima chamada
+        if int(self._sequences[slot]) != sequence:
+            self.release_read()
+            return None
+        
+        return sequence, self.frames[slot], float(self._timestamps[slot])
+    
+    def is_current(self, sequence):
+        """
+        Verifica se o frame reservado ainda não foi sobrescrito
+        
+        Args:
+            sequence (int): Sequência retornada por read_latest
+        
+        Returns:
+            bool: True se o conteúdo usado corresponde à sequência lida
+        """
+        return self._reading_slot >= 0 and int(self._sequences[self._reading_slot]) == sequence
+    
+    def release_read(self):
+        """Libera o slot reservado para leitura"""
+        self._header[_READING_SLOT] = -1
+        self._reading_slot = -1
+    
+    @property
+    def latest_sequence(self):
+        """Sequência do frame mais recente (0 se nenhum foi escrito)"""
+        return int(self._header[_LATEST_SEQUENCE])
+    
+    @property
+    def frames_written(self):
+        """Total de frames escritos pelo produtor"""
+        return int(self._header[_FRAMES_WRITTEN])
+    
+    @property
+    def finished(self):
+        """True se o produtor sinalizou o fim da fonte"""
+        return bool(self._header[_FINISHED])
+    
+    def finish(self):
+        """Sinaliza o fim da fonte (produtor)"""
+        self._header[_FINISHED] = 1
+    
+    @property
+    def failed(self):
+        """True se o produtor não conseguiu abrir a fonte"""
+        return bool(self._header[_FAILED])
+    
+    def fail(self):
+        """Sinaliza que a fonte não pôde ser aberta (produtor)"""
+        self._header[_FAILED] = 1
+    
+    def close(self):
+        """Desmapeia o buffer e, no processo dono, remove o bloco"""
+        # Views precisam ser descartadas antes de fechar o mmap
+        self._header = self._sequences = self._timestamps = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # Ainda há views em uso; o mapeamento é liberado quando forem coletadas
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+def capture_to_ring(spec, source, realtime, stop_event):
+    """
+    Captura uma fonte e escreve os frames em um buffer compartilhado (processo de captura)
+    
+    Executado em um processo próprio por fonte: a decodificação e o
+    redimensionamento para o tamanho do buffer não disputam o processo de
+    inferência. Ao terminar (fim da fonte, erro ou parada), o buffer é marcado
+    como finalizado; se a fonte não abrir, também como falho.
+    
+    Args:
+        spec (dict): Descrição do buffer (SharedFrameRing.get_spec)
+        source (str): URL ou caminho de qualquer fonte legível pelo OpenCV
+        realtime (bool): Se True, entrega os frames no ritmo do FPS da fonte
+            (simula uma câmera a partir de um arquivo)
+        stop_event (multiprocessing.Event): Sinal de parada
+    """
+    cv2.setNumThreads(1)
+    ring = SharedFrameRing.attach(spec)
+    capture = cv2.VideoCapture(source)
+    
+    try:
+        if not capture.isOpened():
+            ring.fail()
+            return
+        
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0
+        interval = 1.0 / fps if realtime and fps > 0 else 0.0
+        next_time = time.perf_counter()
+        
+        while not stop_event.is_set():
+            ret, frame = capture.read()
+            if not ret:
+                break
+            
+            # Simular chegada em tempo real
+            if interval:
+                next_time += interval
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            
+            ring.write(frame)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        capture.release()
+        ring.finish()
+        ring.close()
+
+
+def _align(offset, alignment=64):
+    """Arredonda o deslocamento para o próximo múltiplo do alinhamento"""
+    return (offset + alignment - 1) // alignment * alignment
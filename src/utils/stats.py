@@ -1,39 +1,327 @@
 """
 Módulo para rastreamento e salvamento de estatísticas
 """
+import json
 import time
 import os
+import numpy as np
+from .profiler import StageProfiler
+
+
+# Colunas da série por frame e seus tipos
+FRAME_COLUMNS = (
+    ("frame", np.int64),
+    ("people_count", np.int32),
+    ("max_people", np.int32),
+    ("elapsed_time", np.float64),
+)
 
 
 class StatisticsTracker:
     """Rastreador de estatísticas de processamento"""
     
-    def __init__(self):
-        """Inicializa o rastreador"""
+    def __init__(self, capacity=1024, ring_size=None, zone_names=None, profiler=None):
+        """
+        Inicializa o rastreador
+        
+        Args:
+            capacity (int): Capacidade inicial da série por frame (cresce conforme necessário)
+            ring_size (int): Se definido, mantém apenas os últimos N frames na série
+                (memória constante, para livestreams)
+            zone_names (list): Nomes das zonas de interesse contadas separadamente
+            profiler (StageProfiler): Latências por estágio do processamento,
+                incluídas no arquivo de estatísticas
+        """
         self.frame_count = 0
         self.total_people_detected = 0
         self.max_people_in_frame = 0
         self.start_time = time.time()
-        self.frame_stats = []
+        self.parameters = {}
+        self.profiler = profiler
+        
+        # Série por frame em colunas NumPy pré-alocadas
+        self.ring_size = int(ring_size) if ring_size else None
+        size = self.ring_size or max(1, int(capacity))
+        self._columns = {name: np.zeros(size, dtype=dtype) for name, dtype in FRAME_COLUMNS}
+        self._stored = 0
+        self._set_zones(zone_names, size)
+    
+    def _set_zones(self, zone_names, size):
+        """Cria os contadores e a coluna (frames, zonas) das contagens por zona"""
+        self.zone_names = list(zone_names or [])
+        self.zone_totals = np.zeros(len(self.zone_names), dtype=np.int64)
+        self.zone_max = np.zeros(len(self.zone_names), dtype=np.int32)
+        
+        self._columns.pop("zone_counts", None)
+        if self.zone_names:
+            self._columns["zone_counts"] = np.zeros((size, len(self.zone_names)), dtype=np.int32)
+    
+    def set_parameter(self, name, value):
+        """
+        Registra um parâmetro de processamento para ser salvo nas estatísticas
+        
+        Args:
+            name (str): Nome do parâmetro
+            value: Valor utilizado na execução
+        """
+        self.parameters[name] = value
     
-    def update(self, people_count):
+    def update(self, people_count, zone_counts=None):
         """
         Atualiza estatísticas com novo frame
         
         Args:
             people_count (int): Número de pessoas no frame
+            zone_counts (list): Número de pessoas em cada zona (na ordem de zone_names)
         """
         self.frame_count += 1
         self.total_people_detected += people_count
         self.max_people_in_frame = max(self.max_people_in_frame, people_count)
         
+        if self.zone_names and zone_counts is not None:
+            self.zone_totals += zone_counts
+            np.maximum(self.zone_max, zone_counts, out=self.zone_max)
+        
         # Armazenar estatísticas do frame
-        self.frame_stats.append({
-            "frame": self.frame_count,
-            "people_count": people_count,
-            "max_people": self.max_people_in_frame,
-            "elapsed_time": time.time() - self.start_time
-        })
+        self._append(
+            self.frame_count, people_count, self.max_people_in_frame, time.time() - self.start_time, zone_counts
+        )
+    
+    def _append(self, frame, people_count, max_people, elapsed_time, zone_counts=None):
+        """Acrescenta uma linha à série por frame"""
+        if self.ring_size:
+            index = self._stored % self.ring_size
+        else:
+            index = self._stored
+            capacity = len(self._columns["frame"])
+            if index >= capacity:
+                # Dobrar capacidade (custo amortizado constante por frame)
+                for name, column in self._columns.items():
+                    grown = np.zeros((capacity * 2,) + column.shape[1:], dtype=column.dtype)
+                    grown[:capacity] = column
+                    self._columns[name] = grown
+        
+        self._columns["frame"][index] = frame
+        self._columns["people_count"][index] = people_count
+        self._columns["max_people"][index] = max_people
+        self._columns["elapsed_time"][index] = elapsed_time
+        if self.zone_names:
+            self._columns["zone_counts"][index] = zone_counts if zone_counts is not None else 0
+        self._stored += 1
+    
+    def get_state(self):
+        """
+        Retorna o estado do rastreador (para checkpoints)
+        
+        Returns:
+            dict: Contadores, parâmetros, tempo decorrido e série por frame
+        """
+        state = {
+            "frame_count": self.frame_count,
+            "total_people_detected": self.total_people_detected,
+            "max_people_in_frame": self.max_people_in_frame,
+            "elapsed_time": self.get_elapsed_time(),
+            "parameters": dict(self.parameters),
+            "zone_names": self.zone_names,
+            "zone_totals": self.zone_totals,
+            "zone_max": self.zone_max,
+            "profiler": self.profiler.get_state() if self.profiler is not None else None
+        }
+        for name, column in self.get_frame_series().items():
+            state[f"series_{name}"] = column
+        return state
+    
+    def set_state(self, state):
+        """
+        Restaura o estado salvo por get_state
+        
+        O tempo decorrido continua a partir do valor salvo.
+        
+        Args:
+            state (dict): Estado do rastreador
+        """
+        self.frame_count = int(state["frame_count"])
+        self.total_people_detected = int(state["total_people_detected"])
+        self.max_people_in_frame = int(state["max_people_in_frame"])
+        self.start_time = time.time() - float(state["elapsed_time"])
+        self.parameters = dict(state["parameters"])
+        
+        if state.get("profiler") is not None:
+            self.profiler = StageProfiler()
+            self.profiler.set_state(state["profiler"])
+        
+        columns = list(FRAME_COLUMNS)
+        zone_names = state.get("zone_names", [])
+        if zone_names:
+            columns.append(("zone_counts", np.int32))
+        
+        series = {name: np.asarray(state[f"series_{name}"]) for name, _ in columns}
+        if self.ring_size:
+            series = {name: column[-self.ring_size:] for name, column in series.items()}
+        
+        length = len(series["frame"])
+        size = self.ring_size or max(1, length, len(self._columns["frame"]))
+        self._set_zones(zone_names, size)
+        if zone_names:
+            self.zone_totals[:] = state["zone_totals"]
+            self.zone_max[:] = state["zone_max"]
+        
+        for name, dtype in columns:
+            column = np.zeros((size,) + series[name].shape[1:], dtype=dtype)
+            column[:length] = series[name]
+            self._columns[name] = column
+        self._stored = length
+    
+    def get_frame_series(self):
+        """
+        Retorna a série por frame armazenada, em ordem cronológica
+        
+        Returns:
+            dict: Arrays "frame", "people_count", "max_people" e "elapsed_time"
+                (e "zone_counts", com uma coluna por zona, se houver zonas)
+        """
+        if self.ring_size and self._stored > self.ring_size:
+            # Reordenar o buffer circular a partir do frame mais antigo
+            start = self._stored % self.ring_size
+            return {
+                name: np.concatenate((column[start:], column[:start]))
+                for name, column in self._columns.items()
+            }
+        
+        length = min(self._stored, len(self._columns["frame"]))
+        return {name: column[:length] for name, column in self._columns.items()}
+    
+    def get_rolling_average(self, window=None):
+        """
+        Retorna a média de pessoas por frame nos últimos frames armazenados
+        
+        Args:
+            window (int): Número de frames (padrão: todos os armazenados)
+            
+        Returns:
+            float: Média de pessoas na janela
+        """
+        counts = self.get_frame_series()["people_count"]
+        if window:
+            counts = counts[-int(window):]
+        if len(counts) == 0:
+            return 0
+        return float(counts.mean())
+    
+    def get_percentiles(self, percentiles=(50, 95), window=None):
+        """
+        Retorna percentis do número de pessoas por frame
+        
+        Args:
+            percentiles (tuple): Percentis desejados (0-100)
+            window (int): Número de frames mais recentes (padrão: todos os armazenados)
+            
+        Returns:
+            dict: Percentil -> valor
+        """
+        counts = self.get_frame_series()["people_count"]
+        if window:
+            counts = counts[-int(window):]
+        if len(counts) == 0:
+            return {p: 0 for p in percentiles}
+        
+        values = np.percentile(counts, percentiles)
+        return {p: float(v) for p, v in zip(percentiles, values)}
+    
+    def export_frames(self, output_path, fmt=None):
+        """
+        Exporta a série por frame em CSV, NPZ ou JSON Lines
+        
+        Args:
+            output_path (str): Caminho do arquivo de saída
+            fmt (str): "csv", "npz" ou "jsonl" (padrão: extensão do arquivo)
+            
+        Raises:
+            ValueError: Se o formato não for suportado
+        """
+        fmt = (fmt or os.path.splitext(output_path)[1].lstrip(".")).lower()
+        series = self.get_frame_series()
+        names = [name for name, _ in FRAME_COLUMNS]
+        
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        
+        # Contagens por zona acompanham cada linha (lista vazia sem zonas)
+        zone_rows = series["zone_counts"].tolist() if self.zone_names else [[]] * len(series["frame"])
+        
+        if fmt == "npz":
+            if self.zone_names:
+                series = dict(series, zone_names=np.array(self.zone_names))
+            np.savez(output_path, **series)
+        elif fmt == "csv":
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(",".join(names + [f"zone_{name}" for name in self.zone_names]) + "\n")
+                for row, zones in zip(zip(*(series[name].tolist() for name in names)), zone_rows):
+                    zone_fields = "".join(f",{count}" for count in zones)
+                    f.write(f"{row[0]},{row[1]},{row[2]},{row[3]:.4f}{zone_fields}\n")
+        elif fmt == "jsonl":
+            with open(output_path, "w", encoding="utf-8") as f:
+                for row, zones in zip(zip(*(series[name].tolist() for name in names)), zone_rows):
+                    record = dict(zip(names, row))
+                    if self.zone_names:
+                        record["zones"] = dict(zip(self.zone_names, zones))
+                    f.write(json.dumps(record) + "\n")
+        else:
+            raise ValueError(f"Formato de exportação não suportado: {fmt}")
+    
+    @classmethod
+    def merge(cls, trackers):
+        """
+        Combina estatísticas de segmentos consecutivos de um mesmo vídeo
+        
+        O índice de frame, o máximo acumulado e o tempo decorrido de cada frame
+        passam a ser relativos ao vídeo inteiro.
+        
+        Args:
+            trackers (list): Rastreadores dos segmentos, em ordem
+            
+        Returns:
+            StatisticsTracker: Estatísticas combinadas
+        """
+        merged = cls(
+            capacity=sum(tracker.frame_count for tracker in trackers) or 1,
+            zone_names=trackers[0].zone_names if trackers else None
+        )
+        if not trackers:
+            return merged
+        
+        merged.start_time = min(tracker.start_time for tracker in trackers)
+        if any(tracker.profiler is not None for tracker in trackers):
+            merged.profiler = StageProfiler.merge([tracker.profiler for tracker in trackers])
+        
+        for tracker in trackers:
+            time_offset = tracker.start_time - merged.start_time
+            merged.parameters.update(tracker.parameters)
+            
+            series = tracker.get_frame_series()
+            counts = series["people_count"]
+            if len(counts) == 0:
+                continue
+            
+            # Índice e máximo acumulado globais, calculados em lote
+            start = merged._stored
+            end = start + len(counts)
+            running_max = np.maximum.accumulate(np.maximum(counts, merged.max_people_in_frame))
+            
+            merged._columns["frame"][start:end] = np.arange(start + 1, end + 1)
+            merged._columns["people_count"][start:end] = counts
+            merged._columns["max_people"][start:end] = running_max
+            merged._columns["elapsed_time"][start:end] = series["elapsed_time"] + time_offset
+            if merged.zone_names:
+                merged._columns["zone_counts"][start:end] = series["zone_counts"]
+                merged.zone_totals += tracker.zone_totals
+                np.maximum(merged.zone_max, tracker.zone_max, out=merged.zone_max)
+            merged._stored = end
+            
+            merged.frame_count = end
+            merged.total_people_detected += tracker.total_people_detected
+            merged.max_people_in_frame = int(running_max[-1])
+        
+        return merged
     
     def get_elapsed_time(self):
         """Retorna tempo decorrido em segundos"""
@@ -52,7 +340,7 @@ class StatisticsTracker:
             return 0
         return self.frame_count / elapsed
     
-    def save(self, output_path, video_name, width, height):
+    def save(self, output_path, video_name, width, height, verbose=True):
         """
         Salva estatísticas em arquivo
         
@@ -61,6 +349,7 @@ class StatisticsTracker:
             video_name (str): Nome do vídeo processado
             width (int): Largura do vídeo
             height (int): Altura do vídeo
+            verbose (bool): Se True, informa o caminho salvo
         """
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
@@ -77,15 +366,38 @@ class StatisticsTracker:
             f.write(f"Resolução: {width}x{height}\n")
             f.write(f"Total de frames: {self.frame_count}\n\n")
             
+            if self.parameters:
+                f.write("Parâmetros de processamento:\n")
+                for name, value in self.parameters.items():
+                    f.write(f"  {name}: {value}\n")
+                f.write("\n")
+            
             f.write(f"Tempo total de processamento: {processing_time:.2f}s\n")
             f.write(f"FPS de processamento: {processing_fps:.2f}\n\n")
             
             f.write(f"Total de pessoas detectadas: {self.total_people_detected}\n")
             f.write(f"Máximo de pessoas em um frame: {self.max_people_in_frame}\n")
             f.write(f"Média de pessoas por frame: {avg_people:.2f}\n")
+            
+            if self._stored:
+                percentiles = self.get_percentiles((50, 95))
+                window = f" (últimos {self.ring_size} frames)" if self.ring_size and self._stored > self.ring_size else ""
+                f.write(f"Pessoas por frame p50/p95{window}: {percentiles[50]:.1f}/{percentiles[95]:.1f}\n")
+            
+            if self.zone_names:
+                f.write("\nContagem por zona (total/máximo/média por frame):\n")
+                for name, total, maximum in zip(self.zone_names, self.zone_totals.tolist(), self.zone_max.tolist()):
+                    average = total / self.frame_count if self.frame_count else 0
+                    f.write(f"  {name}: {total}/{maximum}/{average:.2f}\n")
+            
+            if self.profiler is not None and (self.profiler.stages or self.profiler.queues):
+                f.write("\n")
+                for line in self.profiler.format_lines():
+                    f.write(line + "\n")
             f.write("=" * 60 + "\n")
         
-        print(f"Estatísticas salvas em: {output_path}")
+        if verbose:
+            print(f"Estatísticas salvas em: {output_path}")
     
     def print_summary(self):
         """Imprime resumo das estatísticas"""
@@ -96,3 +408,5 @@ class StatisticsTracker:
         print(f"  Total de pessoas: {self.total_people_detected}")
         print(f"  Máximo simultâneo: {self.max_people_in_frame}")
         print(f"  Média por frame: {self.get_average_people():.2f}")
+        for name, total, maximum in zip(self.zone_names, self.zone_totals.tolist(), self.zone_max.tolist()):
+            print(f"  Zona {name}: {total} pessoas (máximo {maximum})")
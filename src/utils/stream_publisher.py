@@ -0,0 +1,269 @@
+"""
+Módulo para republicar a transmissão anotada (RTMP ou HLS) sem bloquear a inferência
+"""
+import os
+import shutil
+import threading
+import time
+from .video_writer import FFmpegEncoder
+
+
+class StreamPublisher:
+    """
+    Publica frames anotados por um processo ffmpeg em thread própria
+    
+    Apenas o frame mais recente fica pendente: se o encoder ou a rede atrasam,
+    os frames que chegam nesse intervalo são descartados e publish() nunca
+    espera. Se o ffmpeg encerrar (ex.: servidor fora do ar), um novo processo é
+    iniciado após reconnect_interval segundos.
+    """
+    
+    def __init__(self, url, fps, width, height, bitrate="2500k", codec="libx264", preset="veryfast",
+                 keyframe_interval=2.0, reconnect_interval=5.0, hls_time=2, hls_list_size=6,
+                 ffmpeg_path="ffmpeg", profiler=None):
+        """
+        Inicia a publicação
+        
+        Args:
+            url (str): Destino rtmp:// (ex.: o nginx-rtmp do projeto) ou, para HLS,
+                uma pasta local ou o caminho de uma playlist .m3u8
+            fps (float): Frames por segundo da transmissão
+            width (int): Largura publicada
+            height (int): Altura publicada
+            bitrate (str): Taxa de bits do vídeo (ex.: "2500k")
+            codec (str): Encoder do ffmpeg
+            preset (str): Preset do encoder
+            keyframe_interval (float): Segundos entre keyframes (limita o atraso
+                para um player entrar na transmissão)
+            reconnect_interval (float): Segundos até reiniciar o ffmpeg após uma
+                falha (0 = não reiniciar)
+            hls_time (float): Duração de cada segmento HLS, em segundos
+            hls_list_size (int): Segmentos mantidos na playlist HLS
+            ffmpeg_path (str): Executável do ffmpeg
+            profiler (StageProfiler): Se informado, recebe a latência de envio
+        
+        Raises:
+            RuntimeError: Se o ffmpeg não for encontrado
+        """
+        if shutil.which(ffmpeg_path) is None:
+            raise RuntimeError(f"ffmpeg não encontrado: {ffmpeg_path} (necessário para publicar em {url})")
+        
+        self.url = url
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.bitrate = bitrate
+        self.codec = codec
+        self.preset = preset
+        self.keyframe_interval = keyframe_interval
+        self.reconnect_interval = reconnect_interval
+        self.hls_time = hls_time
+        self.hls_list_size = hls_list_size
+        self.ffmpeg_path = ffmpeg_path
+        self.profiler = profiler
+        
+        self.frames_published = 0
+        self.frames_dropped = 0
+        self.failures = 0
+        self.error = None
+        
+        # O tamanho de entrada só é conhecido no primeiro frame
+        self.encoder = None
+        self._retry_at = 0.0
+        
+        if self._is_hls():
+            os.makedirs(os.path.dirname(self._output_path()) or ".", exist_ok=True)
+        
+        self._condition = threading.Condition()
+        self._frame = None
+        self._stopped = False
+        
+        self.publisher_thread = threading.Thread(target=self._publish_worker, daemon=True)
+        self.publisher_thread.start()
+    
+    @classmethod
+    def from_config(cls, config, fps, profiler=None):
+        """
+        Cria o publicador conforme a seção "livestream.publish" do config
+        
+        Args:
+            config (dict): Configurações do projeto
+            fps (float): Frames por segundo da transmissão
+            profiler (StageProfiler): Coletor de latências (opcional)
+        
+        Returns:
+            StreamPublisher: Publicador configurado ou None se estiver desligado
+        """
+        publish_config = config.get("livestream", {}).get("publish", {})
+        if not publish_config.get("enabled", False):
+            return None
+        
+        # Resolução publicada: a do vídeo de saída, se não for definida
+        dimensions = config.get("video_dimensions", {})
+        writer_config = config.get("video_writer", {})
+        
+        return cls(
+            publish_config.get("url", "rtmp://localhost:1935/live/anotado"),
+            fps,
+            publish_config.get("width") or dimensions.get("width", 1280),
+            publish_config.get("height") or dimensions.get("height", 720),
+            bitrate=publish_config.get("bitrate", "2500k"),
+            codec=publish_config.get("codec", "libx264"),
+            preset=publish_config.get("preset", "veryfast"),
+            keyframe_interval=publish_config.get("keyframe_interval", 2.0),
+            reconnect_interval=publish_config.get("reconnect_interval", 5.0),
+            hls_time=publish_config.get("hls_time", 2),
+            hls_list_size=publish_config.get("hls_list_size", 6),
+            ffmpeg_path=writer_config.get("ffmpeg_path", "ffmpeg"),
+            profiler=profiler
+        )
+    
+    def _is_hls(self):
+        """True se o destino for HLS local (qualquer coisa que não seja rtmp://)"""
+        return not self.url.lower().startswith(("rtmp://", "rtmps://"))
+    
+    def _output_path(self):
+        """Destino passado ao ffmpeg (pastas HLS recebem a playlist index.m3u8)"""
+        if self._is_hls() and not self.url.lower().endswith(".m3u8"):
+            return os.path.join(self.url, "index.m3u8")
+        return self.url
+    
+    def _output_args(self):
+        """Argumentos de codificação de baixa latência e do formato de saída"""
+        args = [
+            "-vf", f"scale={self.width}:{self.height}",
+            "-c:v", self.codec, "-preset", self.preset, "-pix_fmt", "yuv420p",
+            "-b:v", self.bitrate, "-maxrate", self.bitrate, "-bufsize", self.bitrate,
+            "-g", max(1, round(self.fps * self.keyframe_interval)),
+            "-r", self.fps
+        ]
+        if self.codec in ("libx264", "libx265"):
+            args += ["-tune", "zerolatency"]
+        
+        if self._is_hls():
+            args += [
+                "-f", "hls", "-hls_time", self.hls_time, "-hls_list_size", self.hls_list_size,
+                "-hls_flags", "delete_segments"
+            ]
+        else:
+            args += ["-f", "flv"]
+        return args
+    
+    def _open(self, frame):
+        """Inicia o ffmpeg para o tamanho dos frames recebidos"""
+        height, width = frame.shape[:2]
+        # Carimbo de tempo pelo relógio: frames descartados não aceleram o vídeo
+        return FFmpegEncoder(
+            self._output_path(), self.fps, width, height, self._output_args(),
+            binary=self.ffmpeg_path, input_args=["-use_wallclock_as_timestamps", 1]
+        )
+    
+    def _fail(self, error):
+        """Registra a falha, encerra o ffmpeg e agenda a reconexão"""
+        self.error = error
+        self.failures += 1
+        print(f"  Publicação interrompida ({self.url}): {error}")
+        
+        encoder, self.encoder = self.encoder, None
+        if encoder is not None:
+            try:
+                encoder.release()
+            except RuntimeError:
+                pass
+        
+        if self.reconnect_interval > 0:
+            self._retry_at = time.perf_counter() + self.reconnect_interval
+        else:
+            self._retry_at = float("inf")
+    
+    def _drop(self):
+        """Conta um frame descartado pela thread de publicação"""
+        with self._condition:
+            self.frames_dropped += 1
+    
+    def _publish_worker(self):
+        """Worker thread que envia o frame pendente ao ffmpeg"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._frame is not None or self._stopped)
+                if self._frame is None:
+                    break
+                frame, self._frame = self._frame, None
+            
+            if self.encoder is None:
+                if time.perf_counter() < self._retry_at:
+                    self._drop()
+                    continue
+                try:
+                    self.encoder = self._open(frame)
+                except RuntimeError as e:
+                    self._fail(e)
+                    self._drop()
+                    continue
+            
+            start = time.perf_counter()
+            try:
+                self.encoder.write(frame)
+            except (RuntimeError, ValueError) as e:
+                self._fail(e)
+                self._drop()
+                continue
+            
+            self.frames_published += 1
+            if self.profiler is not None:
+                self.profiler.record("publicação", time.perf_counter() - start)
+    
+    def publish(self, frame):
+        """
+        Entrega um frame para publicação (não bloqueia)
+        
+        O frame não deve ser alterado depois; um frame ainda pendente é
+        substituído e contado como descartado.
+        
+        Args:
+            frame: Frame anotado (BGR)
+        """
+        with self._condition:
+            if self._frame is not None:
+                self.frames_dropped += 1
+            self._frame = frame
+            self._condition.notify()
+    
+    def get_metrics(self):
+        """
+        Retorna as métricas da publicação
+        
+        Returns:
+            dict: Frames publicados, descartados e falhas do ffmpeg
+        """
+        return {
+            "frames_published": self.frames_published,
+            "frames_dropped": self.frames_dropped,
+            "failures": self.failures
+        }
+    
+    def release(self, timeout=5.0):
+        """
+        Publica o frame pendente e encerra o ffmpeg
+        
+        Args:
+            timeout (float): Espera máxima pelo envio pendente; depois disso o
+                ffmpeg é encerrado à força (rede travada)
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        
+        self.publisher_thread.join(timeout)
+        if self.publisher_thread.is_alive():
+            encoder = self.encoder
+            if encoder is not None:
+                encoder.process.kill()
+            self.publisher_thread.join()
+        
+        if self.encoder is not None:
+            try:
+                self.encoder.release()
+            except RuntimeError as e:
+                self.error = e
+            self.encoder = None
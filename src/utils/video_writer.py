@@ -2,14 +2,141 @@
 Módulo para gerenciar escrita de vídeos
 """
 import cv2
+import os
+import time
 import threading
 import queue
+import collections
+import shutil
+import subprocess
+import numpy as np
+
+
+# Backends de escrita disponíveis
+WRITER_BACKENDS = ("opencv", "ffmpeg")
+
+
+class OpenCVEncoder:
+    """Codificação com o cv2.VideoWriter (fourcc do OpenCV, ex.: mp4v)"""
+    
+    def __init__(self, output_path, fps, width, height, codec="mp4v"):
+        """
+        Abre o arquivo de saída
+        
+        Args:
+            output_path (str): Caminho do arquivo de saída
+            fps (int): Frames por segundo
+            width (int): Largura do vídeo
+            height (int): Altura do vídeo
+            codec (str): Fourcc do codec
+        """
+        fourcc = cv2.VideoWriter_fourcc(*codec)
+        self.out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+        
+        if not self.out.isOpened():
+            raise RuntimeError(f"Erro ao criar vídeo de saída: {output_path}")
+    
+    def write(self, frame):
+        """Codifica um frame BGR"""
+        self.out.write(frame)
+    
+    def release(self):
+        """Fecha o arquivo de saída"""
+        self.out.release()
+
+
+class FFmpegEncoder:
+    """
+    Codificação por um processo ffmpeg que recebe frames BGR crus pela entrada padrão
+    
+    Os argumentos de saída são livres, então o mesmo encoder grava arquivos
+    (libx264 com preset/CRF) ou publica transmissões (flv para RTMP, HLS).
+    """
+    
+    def __init__(self, output_path, fps, width, height, output_args, binary="ffmpeg", input_args=None):
+        """
+        Inicia o processo ffmpeg
+        
+        Args:
+            output_path (str): Arquivo ou URL de saída
+            fps (float): Frames por segundo da entrada
+            width (int): Largura dos frames
+            height (int): Altura dos frames
+            output_args (list): Argumentos de codificação/formato antes da saída
+            binary (str): Executável do ffmpeg
+            input_args (list): Argumentos extras da entrada (ex.: carimbo de tempo
+                pelo relógio, para transmissões com frames descartados)
+        """
+        executable = shutil.which(binary)
+        if executable is None:
+            raise RuntimeError(f"ffmpeg não encontrado: {binary} (instale ou ajuste video_writer.ffmpeg_path)")
+        
+        self.output_path = output_path
+        self.frame_shape = (height, width, 3)
+        
+        command = [
+            executable, "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps),
+            *[str(arg) for arg in input_args or []], "-i", "pipe:0", "-an", *[str(arg) for arg in output_args], output_path
+        ]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        
+        # Ler a saída de erro em paralelo (um pipe cheio travaria o ffmpeg)
+        self._stderr = collections.deque(maxlen=20)
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+    
+    def _drain_stderr(self):
+        """Guarda as últimas linhas de erro do ffmpeg"""
+        for line in self.process.stderr:
+            self._stderr.append(line.decode("utf-8", "replace").rstrip())
+    
+    def _error(self, message):
+        """Monta um RuntimeError com as últimas mensagens do ffmpeg"""
+        details = " | ".join(self._stderr)
+        return RuntimeError(f"{message}: {self.output_path}" + (f" ({details})" if details else ""))
+    
+    def write(self, frame):
+        """
+        Envia um frame BGR ao ffmpeg (sem cópia se já for contíguo)
+        
+        Raises:
+            ValueError: Se o frame não tiver a resolução do vídeo
+            RuntimeError: Se o ffmpeg tiver encerrado
+        """
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"Frame {frame.shape} diferente da saída {self.frame_shape}")
+        
+        try:
+            self.process.stdin.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+        except (BrokenPipeError, OSError):
+            self.process.wait()
+            self._stderr_thread.join()
+            raise self._error("ffmpeg encerrou durante a escrita")
+    
+    def release(self):
+        """
+        Fecha a entrada e aguarda o ffmpeg finalizar o arquivo
+        
+        Raises:
+            RuntimeError: Se o ffmpeg terminar com erro
+        """
+        try:
+            self.process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        returncode = self.process.wait()
+        self._stderr_thread.join()
+        
+        if returncode != 0:
+            raise self._error(f"ffmpeg terminou com código {returncode}")
 
 
 class VideoWriterManager:
     """Gerenciador de escrita de vídeos com threading"""
     
-    def __init__(self, output_path, fps, width, height, codec="mp4v"):
+    def __init__(self, output_path, fps, width, height, codec="mp4v", profiler=None,
+                 backend="opencv", queue_size=30, ffmpeg_options=None):
         """
         Inicializa o gerenciador de escrita de vídeo
         
@@ -18,26 +145,88 @@ class VideoWriterManager:
             fps (int): Frames por segundo
             width (int): Largura do vídeo
             height (int): Altura do vídeo
-            codec (str): Codec do vídeo
+            codec (str): Codec do vídeo (fourcc no OpenCV; encoder do ffmpeg,
+                ex.: libx264, no backend ffmpeg)
+            profiler (StageProfiler): Se informado, recebe a ocupação da fila de
+                escrita, o tempo bloqueado em write() e a latência de codificação
+            backend (str): "opencv" ou "ffmpeg"
+            queue_size (int): Frames aguardando codificação antes de write() bloquear
+            ffmpeg_options (dict): "preset", "crf", "pixel_format" e "ffmpeg_path"
+                do backend ffmpeg
         """
         self.output_path = output_path
         self.fps = fps
         self.width = width
         self.height = height
+        self.profiler = profiler
+        self.backend = backend
         
-        # Criar VideoWriter
-        fourcc = cv2.VideoWriter_fourcc(*codec)
-        self.out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+        # Criar codificador
+        if backend == "opencv":
+            self.out = OpenCVEncoder(output_path, fps, width, height, codec)
+        elif backend == "ffmpeg":
+            options = ffmpeg_options or {}
+            output_args = ["-c:v", codec, "-pix_fmt", options.get("pixel_format", "yuv420p")]
+            if options.get("preset"):
+                output_args += ["-preset", options["preset"]]
+            if options.get("crf") is not None:
+                output_args += ["-crf", options["crf"]]
+            self.out = FFmpegEncoder(output_path, fps, width, height, output_args, options.get("ffmpeg_path", "ffmpeg"))
+        else:
+            raise ValueError(f"Backend de escrita não suportado: {backend} (opções: {', '.join(WRITER_BACKENDS)})")
         
-        if not self.out.isOpened():
-            raise RuntimeError(f"Erro ao criar vídeo de saída: {output_path}")
+        # Métricas da fila: tempo bloqueado em write() e ocupação observada
+        self.frames_written = 0
+        self.frames_queued = 0
+        self.blocked_time = 0.0
+        self.max_depth = 0
+        self._depth_total = 0
+        self.error = None
         
         # Configurar fila e thread de escrita
-        self.write_queue = queue.Queue(maxsize=30)
+        self.write_queue = queue.Queue(maxsize=max(1, int(queue_size)))
         self.writer_thread = threading.Thread(target=self._writer_worker)
         self.writer_thread.start()
         self.is_writing = True
     
+    @classmethod
+    def from_config(cls, config, output_path, fps, width, height, profiler=None):
+        """
+        Cria o gerenciador a partir da seção "video_writer" das configurações
+        
+        Args:
+            config (dict): Configurações do projeto
+            output_path (str): Caminho do arquivo de saída
+            fps (int): Frames por segundo
+            width (int): Largura do vídeo
+            height (int): Altura do vídeo
+            profiler (StageProfiler): Coletor de latências (opcional)
+        
+        Returns:
+            VideoWriterManager: Gerenciador configurado
+        """
+        writer_config = config.get("video_writer", {})
+        backend = writer_config.get("backend", "opencv")
+        # "fourcc" vale para o OpenCV e "codec" (encoder do ffmpeg) para o ffmpeg
+        if backend == "ffmpeg":
+            codec = writer_config.get("codec", "libx264")
+        else:
+            codec = writer_config.get("fourcc", "mp4v")
+        
+        return cls(
+            output_path, fps, width, height,
+            codec=codec,
+            profiler=profiler,
+            backend=backend,
+            queue_size=writer_config.get("queue_size", 30),
+            ffmpeg_options={
+                "preset": writer_config.get("preset", "veryfast"),
+                "crf": writer_config.get("crf", 23),
+                "pixel_format": writer_config.get("pixel_format", "yuv420p"),
+                "ffmpeg_path": writer_config.get("ffmpeg_path", "ffmpeg")
+            }
+        )
+    
     def _writer_worker(self):
         """Worker thread para escrever frames"""
         while True:
@@ -46,7 +235,20 @@ class VideoWriterManager:
             if item is None:  # Sinal de parada
                 break
             
-            self.out.write(item)
+            # Após um erro, apenas esvaziar a fila para write() nunca travar
+            if self.error is not None:
+                continue
+            
+            try:
+                if self.profiler is not None:
+                    start = time.perf_counter()
+                    self.out.write(item)
+                    self.profiler.record("codificação", time.perf_counter() - start)
+                else:
+                    self.out.write(item)
+                self.frames_written += 1
+            except Exception as e:
+                self.error = e
             self.write_queue.task_done()
     
     def write(self, frame):
@@ -55,18 +257,120 @@ class VideoWriterManager:
         
         Args:
             frame: Frame a ser escrito
+        
+        Raises:
+            RuntimeError: Se a codificação já tiver falhado
         """
-        if self.is_writing:
-            self.write_queue.put(frame)
+        if not self.is_writing:
+            return
+        
+        if self.error is not None:
+            raise RuntimeError(f"Falha na escrita de {self.output_path}: {self.error}")
+        
+        # Fila cheia e espera longa: a codificação limita o pipeline
+        depth = self.write_queue.qsize()
+        self.frames_queued += 1
+        self._depth_total += depth
+        self.max_depth = max(self.max_depth, depth)
+        
+        start = time.perf_counter()
+        self.write_queue.put(frame)
+        blocked = time.perf_counter() - start
+        self.blocked_time += blocked
+        
+        if self.profiler is not None:
+            self.profiler.record_depth("escrita", depth)
+            self.profiler.record("espera_escrita", blocked)
+    
+    def get_metrics(self):
+        """
+        Retorna as métricas da fila de escrita
+        
+        Returns:
+            dict: Frames escritos, tempo total bloqueado em write() (s),
+                ocupação média e máxima da fila
+        """
+        return {
+            "frames_written": self.frames_written,
+            "blocked_time": self.blocked_time,
+            "mean_depth": self._depth_total / self.frames_queued if self.frames_queued else 0.0,
+            "max_depth": self.max_depth
+        }
     
     def release(self):
-        """Finaliza a escrita e libera recursos"""
+        """
+        Finaliza a escrita e libera recursos
+        
+        Raises:
+            RuntimeError: Se a codificação tiver falhado
+        """
+        if not self.is_writing:
+            return
+        
         # Sinalizar fim para thread
         self.write_queue.put(None)
         
         # Esperar thread terminar
         self.writer_thread.join()
         
-        # Liberar VideoWriter
-        self.out.release()
+        # Liberar codificador
         self.is_writing = False
+        self.out.release()
+        
+        if self.error is not None:
+            raise RuntimeError(f"Falha na escrita de {self.output_path}: {self.error}")
+
+
+def find_ffmpeg(config):
+    """
+    Localiza o executável do ffmpeg configurado em video_writer.ffmpeg_path
+    
+    Args:
+        config (dict): Configurações do projeto
+    
+    Returns:
+        str: Caminho do executável ou None se não estiver disponível
+    """
+    return shutil.which(config.get("video_writer", {}).get("ffmpeg_path", "ffmpeg"))
+
+
+def concatenate_videos(input_paths, output_path, binary="ffmpeg"):
+    """
+    Junta vídeos com o mesmo codec e resolução sem recodificar
+    
+    Usa o demuxer concat do ffmpeg com cópia de streams, então o custo é só o
+    de leitura e escrita dos arquivos e a qualidade dos trechos é preservada.
+    
+    Args:
+        input_paths (list): Vídeos a juntar, em ordem
+        output_path (str): Caminho do vídeo final
+        binary (str): Executável do ffmpeg
+    
+    Raises:
+        RuntimeError: Se o ffmpeg não for encontrado ou terminar com erro
+    """
+    executable = shutil.which(binary)
+    if executable is None:
+        raise RuntimeError(f"ffmpeg não encontrado: {binary} (instale ou ajuste video_writer.ffmpeg_path)")
+    
+    list_path = f"{output_path}.concat.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        for input_path in input_paths:
+            escaped = os.path.abspath(input_path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    
+    try:
+        result = subprocess.run(
+            [
+                executable, "-hide_banner", "-loglevel", "error", "-nostdin", "-y",
+                "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_path
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+    finally:
+        os.remove(list_path)
+    
+    if result.returncode != 0:
+        details = result.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"Erro ao concatenar vídeos em {output_path}" + (f" ({details})" if details else ""))
@@ -0,0 +1,7 @@
+"""
+Configuração dos testes: permite importar o pacote src a partir da raiz do projeto
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
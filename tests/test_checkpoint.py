@@ -0,0 +1,56 @@
+"""
+Testes dos checkpoints de processamento
+"""
+import os
+import numpy as np
+from src.core.tracker import BoxTracker
+from src.core.detections import Detections
+from src.utils.checkpoint import save_checkpoint, load_checkpoint
+from src.utils.stats import StatisticsTracker
+
+
+def test_round_trip_keeps_arrays_and_values(tmp_path):
+    checkpoint_path = str(tmp_path / "run" / "video.npz")
+    save_checkpoint(checkpoint_path, {
+        "progress": {"frame": 42, "signature": {"conf": 0.5, "classes": [0]}},
+        "tracker": {"boxes": np.arange(8, dtype=np.float32).reshape(2, 4), "initialized": True}
+    })
+    
+    sections = load_checkpoint(checkpoint_path)
+    
+    assert sections["progress"] == {"frame": 42, "signature": {"conf": 0.5, "classes": [0]}}
+    assert sections["tracker"]["initialized"] is True
+    np.testing.assert_array_equal(sections["tracker"]["boxes"], np.arange(8).reshape(2, 4))
+    assert not os.path.exists(f"{checkpoint_path}.tmp.npz")
+
+
+def test_missing_or_corrupt_checkpoint_returns_none(tmp_path):
+    checkpoint_path = tmp_path / "video.npz"
+    assert load_checkpoint(str(checkpoint_path)) is None
+    
+    checkpoint_path.write_bytes(b"incompleto")
+    assert load_checkpoint(str(checkpoint_path)) is None
+
+
+def test_component_states_resume_from_checkpoint(tmp_path):
+    stats = StatisticsTracker(zone_names=["entrada"])
+    for count in [1, 4, 2]:
+        stats.update(count, [count])
+    tracker = BoxTracker(smoothing=1.0)
+    tracker.update(Detections([[0, 0, 10, 10]], [0.9], [0]))
+    tracker.predict()
+    tracker.update(Detections([[3, 0, 13, 10]], [0.9], [0]))
+    
+    checkpoint_path = str(tmp_path / "video.npz")
+    save_checkpoint(checkpoint_path, {"stats": stats.get_state(), "tracker": tracker.get_state()})
+    sections = load_checkpoint(checkpoint_path)
+    
+    restored_stats = StatisticsTracker()
+    restored_stats.set_state(sections["stats"])
+    restored_tracker = BoxTracker(smoothing=1.0)
+    restored_tracker.set_state(sections["tracker"])
+    
+    np.testing.assert_array_equal(restored_stats.get_frame_series()["people_count"], [1, 4, 2])
+    np.testing.assert_array_equal(restored_stats.get_frame_series()["zone_counts"], [[1], [4], [2]])
+    assert restored_stats.max_people_in_frame == 4
+    np.testing.assert_allclose(restored_tracker.predict().xyxy, tracker.predict().xyxy)
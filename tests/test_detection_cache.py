@@ -0,0 +1,110 @@
+"""
+Testes do cache de detecções em disco
+"""
+import os
+import numpy as np
+import src.core.detection_cache as detection_cache
+from src.core.detection_cache import DetectionCache, DetectionSequence, create_detection_cache
+from src.core.detections import Detections
+
+
+def _sequence(boxes_per_frame):
+    sequence = DetectionSequence(capacity=1)
+    for count in boxes_per_frame:
+        xyxy = np.tile(np.float32([0, 0, 10, 20]), (count, 1))
+        sequence.append(Detections(xyxy, np.full(count, 0.5), np.zeros(count)))
+    return sequence
+
+
+def _entry_size(cache, key):
+    return os.path.getsize(os.path.join(cache.cache_directory, f"{key}.npz"))
+
+
+def test_sequence_round_trip(tmp_path):
+    cache = DetectionCache(str(tmp_path))
+    cache.save("video", _sequence([2, 0, 3]))
+    
+    loaded = cache.load("video")
+    
+    assert len(loaded) == 3
+    assert [len(loaded[index]) for index in range(3)] == [2, 0, 3]
+    np.testing.assert_allclose(loaded[2].xyxy, np.tile([0, 0, 10, 20], (3, 1)))
+    assert cache.load("outro") is None
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = DetectionCache(str(tmp_path))
+    cache.save("a", _sequence([5]))
+    cache.save("b", _sequence([5]))
+    cache.max_bytes = _entry_size(cache, "a") * 2
+    
+    # "a" é mais antiga, mas foi lida por último
+    os.utime(os.path.join(str(tmp_path), "a.npz"), (1000, 1000))
+    os.utime(os.path.join(str(tmp_path), "b.npz"), (2000, 2000))
+    cache.load("a")
+    cache.save("c", _sequence([5]))
+    
+    assert cache.load("b") is None
+    assert cache.load("a") is not None
+    assert cache.load("c") is not None
+    assert cache._total_size == cache._scan_size()
+
+
+def test_overwrite_and_invalidate_keep_size_total(tmp_path):
+    cache = DetectionCache(str(tmp_path))
+    cache.save("a", _sequence([1]))
+    cache.save("a", _sequence([200]))
+    cache.save("b", _sequence([50]))
+    assert cache._total_size == cache._scan_size()
+    
+    cache.invalidate("a")
+    assert cache.load("a") is None
+    assert cache._total_size == cache._scan_size() == _entry_size(cache, "b")
+    
+    cache.clear()
+    assert cache._total_size == 0
+    assert cache.load("b") is None
+
+
+def test_invalidate_file_removes_every_parameter_set(tmp_path):
+    cache = DetectionCache(str(tmp_path / "cache"))
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"frames")
+    other_path = tmp_path / "outro.mp4"
+    other_path.write_bytes(b"outros frames")
+    
+    keys = [cache.make_key(str(video_path), {"conf": conf}) for conf in (0.25, 0.5)]
+    other_key = cache.make_key(str(other_path), {"conf": 0.25})
+    assert keys[0] != keys[1]
+    for key in keys + [other_key]:
+        cache.save(key, _sequence([1]))
+    
+    cache.invalidate_file(str(video_path))
+    
+    assert all(cache.load(key) is None for key in keys)
+    assert cache.load(other_key) is not None
+    assert cache._total_size == cache._scan_size()
+
+
+def test_weights_hash_is_memoized(tmp_path, monkeypatch):
+    weights_path = tmp_path / "modelo.pt"
+    weights_path.write_bytes(b"pesos")
+    calls = []
+    sha256_file = detection_cache.sha256_file
+    monkeypatch.setattr(detection_cache, "sha256_file", lambda path: calls.append(path) or sha256_file(path))
+    
+    cache = DetectionCache(str(tmp_path / "cache"))
+    first = cache.detector_parameters({"weights": str(weights_path), "conf": 0.5})
+    second = cache.detector_parameters({"weights": str(weights_path), "conf": 0.5})
+    
+    assert first == second
+    assert first["weights"] != str(weights_path)
+    assert len(calls) == 1
+    assert cache.detector_parameters({"weights": "yolov8n.pt"})["weights"] == "yolov8n.pt"
+
+
+def test_create_from_config(tmp_path):
+    assert create_detection_cache({}) is None
+    
+    cache = create_detection_cache({"cache": {"enabled": True, "directory": str(tmp_path), "max_size_mb": 1}})
+    assert cache.max_bytes == 1024 * 1024
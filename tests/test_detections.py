@@ -0,0 +1,83 @@
+"""
+Testes das operações sobre caixas: sobreposição, NMS e emendas entre tiles
+"""
+import numpy as np
+import pytest
+from src.core.detections import Detections, box_iou, box_ios, non_max_suppression, merge_tile_seams
+
+
+def test_ios_is_high_for_contained_boxes():
+    full = [[0, 0, 40, 100]]
+    partial = [[0, 0, 20, 100]]
+    
+    assert box_ios(full, partial)[0, 0] == pytest.approx(1.0)
+    assert box_iou(full, partial)[0, 0] == pytest.approx(0.5)
+    assert box_ios(full, [[50, 0, 60, 10]])[0, 0] == 0
+    assert box_ios(full, [[5, 5, 5, 5]])[0, 0] == 0
+
+
+def test_nms_keeps_highest_confidence():
+    detections = Detections(
+        [[0, 0, 20, 100], [0, 0, 40, 100], [100, 0, 140, 100]],
+        [0.6, 0.9, 0.7],
+        [0, 0, 0]
+    )
+    
+    kept = non_max_suppression(detections)
+    
+    np.testing.assert_allclose(kept.xyxy, [[0, 0, 40, 100], [100, 0, 140, 100]])
+    np.testing.assert_allclose(kept.conf, [0.9, 0.7])
+    assert len(non_max_suppression(detections, threshold=0.6, metric="iou")) == 3
+
+
+def test_nms_merge_extends_kept_box():
+    detections = Detections([[10, 0, 40, 100], [0, 0, 25, 100]], [0.9, 0.5], [0, 0])
+    
+    kept = non_max_suppression(detections, threshold=0.5, merge=True)
+    
+    np.testing.assert_allclose(kept.xyxy, [[0, 0, 40, 100]])
+    np.testing.assert_allclose(kept.conf, [0.9])
+
+
+TILES = [(0, 0, 100, 100), (80, 0, 180, 100), (160, 0, 260, 100)]
+
+
+def test_seam_merges_person_cut_by_neighbouring_tiles():
+    detections = Detections([[70, 10, 100, 50], [80, 10, 110, 50]], [0.9, 0.8], [0, 0])
+    
+    merged = merge_tile_seams(detections, [0, 1], TILES)
+    
+    np.testing.assert_allclose(merged.xyxy, [[70, 10, 110, 50]])
+    np.testing.assert_allclose(merged.conf, [0.9])
+
+
+def test_seam_keeps_close_people_from_same_tile():
+    detections = Detections([[10, 10, 40, 80], [15, 10, 35, 70]], [0.9, 0.8], [0, 0])
+    
+    assert len(merge_tile_seams(detections, [0, 0], TILES)) == 2
+
+
+def test_seam_keeps_neighbours_side_by_side_at_the_seam():
+    # Duas pessoas lado a lado na faixa entre os tiles: pouca sobreposição
+    detections = Detections([[60, 10, 90, 80], [84, 10, 120, 80]], [0.9, 0.8], [0, 0])
+    
+    assert len(merge_tile_seams(detections, [0, 1], TILES)) == 2
+
+
+def test_seam_absorbs_one_box_per_neighbouring_tile():
+    detections = Detections(
+        [[70, 10, 100, 50], [80, 10, 110, 50], [82, 12, 108, 48]],
+        [0.9, 0.8, 0.7],
+        [0, 0, 0]
+    )
+    
+    merged = merge_tile_seams(detections, [0, 1, 1], TILES)
+    
+    # A caixa do tile 0 absorve só a de maior sobreposição do tile 1
+    np.testing.assert_allclose(merged.xyxy, [[70, 10, 108, 50], [80, 10, 110, 50]])
+
+
+def test_seam_without_enough_boxes_returns_input():
+    detections = Detections([[0, 0, 10, 10]], [0.9], [0])
+    
+    assert merge_tile_seams(detections, [0], TILES) is detections
@@ -0,0 +1,39 @@
+"""
+Testes do agendamento de câmeras no modo multi-câmera
+"""
+import pytest
+from src.processors.multi_camera import FrameScheduler
+
+
+def test_oldest_deadline_goes_first():
+    scheduler = FrameScheduler([10, 0])
+    
+    assert scheduler.select([0, 1], now=0.0, batch_size=1) == [0]
+    assert scheduler.select([0, 1], now=0.05, batch_size=1) == [1]
+    assert scheduler.select([0, 1], now=0.2, batch_size=2) == [1, 0]
+
+
+def test_camera_waits_for_target_fps():
+    scheduler = FrameScheduler([10])
+    
+    assert scheduler.select([0], now=0.0, batch_size=4) == [0]
+    assert scheduler.select([0], now=0.05, batch_size=4) == []
+    assert scheduler.next_deadline([0]) == pytest.approx(0.1)
+    assert scheduler.select([0], now=0.1, batch_size=4) == [0]
+
+
+def test_late_camera_does_not_accumulate_credit():
+    scheduler = FrameScheduler([10])
+    scheduler.select([0], now=0.0, batch_size=1)
+    
+    # Atendida com atraso: volta a concorrer a partir de agora, sem recuperar os frames perdidos
+    assert scheduler.select([0], now=1.0, batch_size=1) == [0]
+    assert scheduler.select([0], now=1.01, batch_size=1) == [0]
+    assert scheduler.select([0], now=1.02, batch_size=1) == []
+
+
+def test_only_ready_cameras_are_selected():
+    scheduler = FrameScheduler([0, 0, 0])
+    
+    assert scheduler.select([2], now=0.0, batch_size=3) == [2]
+    assert scheduler.next_deadline([]) is None
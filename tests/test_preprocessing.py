@@ -0,0 +1,58 @@
+"""
+Testes do letterbox de entrada do modelo
+"""
+import numpy as np
+import pytest
+from src.core.preprocessing import Letterbox, PAD_VALUE
+
+
+def test_rect_transform_pads_to_stride():
+    transform = Letterbox(imgsz=640, stride=32).get_transform((720, 1280, 3))
+    
+    assert transform == (0.5, 0, 12, 640, 360, 640, 384)
+
+
+def test_square_transform_centers_frame():
+    transform = Letterbox(imgsz=640, stride=32, rect=False).get_transform((720, 1280, 3))
+    
+    assert transform[1:] == (0, 140, 640, 360, 640, 640)
+
+
+def test_fixed_scale_is_capped_by_input_size():
+    letterbox = Letterbox(imgsz=640)
+    
+    assert letterbox.get_transform((200, 300, 3), scale=0.5)[0] == 0.5
+    assert letterbox.get_transform((2000, 3000, 3), scale=0.5)[0] == pytest.approx(640 / 3000)
+
+
+def test_map_boxes_to_source_and_output_size():
+    frame_shape = (720, 1280, 3)
+    transform = Letterbox(imgsz=640).get_transform(frame_shape)
+    boxes = [[0, 12, 640, 372], [100, 62, 200, 162], [-10, 0, 700, 400]]
+    
+    np.testing.assert_allclose(
+        Letterbox.map_boxes(boxes, transform, frame_shape),
+        [[0, 0, 1280, 720], [200, 100, 400, 300], [0, 0, 1280, 720]]
+    )
+    np.testing.assert_allclose(
+        Letterbox.map_boxes(boxes, transform, frame_shape, output_size=(640, 360))[1],
+        [100, 50, 200, 150]
+    )
+
+
+def test_call_fills_tensor_once_per_frame():
+    torch = pytest.importorskip("torch")
+    letterbox = Letterbox(imgsz=64, stride=32)
+    frame = np.zeros((32, 64, 3), dtype=np.uint8)
+    frame[..., 2] = 255
+    
+    tensor, transforms = letterbox([frame, frame])
+    
+    assert tuple(tensor.shape) == (2, 3, 32, 64)
+    assert transforms[0] == (1.0, 0, 0, 64, 32, 64, 32)
+    # BGR -> RGB: o canal vermelho vem primeiro
+    assert torch.all(tensor[:, 0] == 1) and torch.all(tensor[:, 2] == 0)
+    
+    tensor, _ = letterbox([np.zeros((16, 64, 3), dtype=np.uint8)])
+    assert tensor.shape[2] == 32
+    assert float(tensor[0, 0, 0, 0]) == pytest.approx(PAD_VALUE / 255)
@@ -0,0 +1,89 @@
+"""
+Testes do buffer circular de frames em memória compartilhada
+"""
+import multiprocessing
+import numpy as np
+import pytest
+from src.utils.shared_frames import SharedFrameRing, capture_to_ring
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(8, 4, slots=3)
+    yield ring
+    ring.close()
+
+
+def _frame(value, width=8, height=4):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_reader_gets_latest_frame(ring):
+    assert ring.read_latest() is None
+    
+    ring.write(_frame(1), timestamp=10.0)
+    ring.write(_frame(2), timestamp=11.0)
+    sequence, frame, timestamp = ring.read_latest()
+    
+    assert sequence == 2 and timestamp == 11.0
+    assert np.all(frame == 2)
+    assert ring.read_latest(after_sequence=sequence) is None
+    assert ring.frames_written == ring.latest_sequence == 2
+
+
+def test_reserved_slot_is_never_overwritten(ring):
+    producer = SharedFrameRing.attach(ring.get_spec())
+    producer.write(_frame(1))
+    sequence, frame, _ = ring.read_latest()
+    
+    for value in range(2, 10):
+        producer.write(_frame(value))
+    
+    assert ring.is_current(sequence)
+    assert np.all(frame == 1)
+    
+    ring.release_read()
+    assert not ring.is_current(sequence)
+    assert np.all(ring.read_latest(sequence)[1] == 9)
+    producer.close()
+
+
+def test_slot_in_write_is_not_current(ring):
+    ring.write(_frame(1))
+    sequence, _, _ = ring.read_latest()
+    
+    # Produtor sem a reserva (ex.: slot reaproveitado antes dela) marca o slot em escrita
+    ring._sequences[ring._reading_slot] = -1
+    assert not ring.is_current(sequence)
+
+
+def test_frames_of_other_sizes_are_resized(ring):
+    ring.write(_frame(7, width=16, height=8))
+    
+    assert np.all(ring.read_latest()[1] == 7)
+
+
+def test_flags_are_shared_between_processes(ring):
+    consumer = SharedFrameRing.attach(ring.get_spec())
+    assert not consumer.finished and not consumer.failed
+    
+    ring.finish()
+    ring.fail()
+    assert consumer.finished and consumer.failed
+    consumer.close()
+
+
+def test_capture_marks_unopened_source_as_failed(ring, tmp_path):
+    capture_to_ring(ring.get_spec(), str(tmp_path / "inexistente.mp4"), False, multiprocessing.Event())
+    
+    assert ring.failed and ring.finished
+    assert ring.frames_written == 0
+
+
+def test_owner_close_removes_block():
+    ring = SharedFrameRing.create(8, 4)
+    spec = ring.get_spec()
+    ring.close()
+    
+    with pytest.raises(FileNotFoundError):
+        SharedFrameRing.attach(spec)
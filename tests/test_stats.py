@@ -0,0 +1,72 @@
+"""
+Testes das estatísticas por frame
+"""
+import numpy as np
+from src.utils.stats import StatisticsTracker
+
+
+def _tracker(counts, zone_counts=None, start_time=0.0):
+    tracker = StatisticsTracker(capacity=2, zone_names=["a", "b"] if zone_counts else None)
+    for index, count in enumerate(counts):
+        tracker.update(count, zone_counts[index] if zone_counts else None)
+    
+    # Tempo decorrido fixo por frame, relativo ao início do segmento
+    tracker.start_time = start_time
+    tracker._columns["elapsed_time"][:len(counts)] = np.arange(len(counts)) * 0.1
+    return tracker
+
+
+def test_merge_makes_series_global():
+    first = _tracker([1, 3, 2], [[1, 0], [2, 1], [0, 2]], start_time=100.0)
+    second = _tracker([0, 2], [[0, 0], [1, 1]], start_time=100.5)
+    
+    merged = StatisticsTracker.merge([first, second])
+    series = merged.get_frame_series()
+    
+    np.testing.assert_array_equal(series["frame"], [1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(series["people_count"], [1, 3, 2, 0, 2])
+    np.testing.assert_array_equal(series["max_people"], [1, 3, 3, 3, 3])
+    np.testing.assert_allclose(series["elapsed_time"], [0.0, 0.1, 0.2, 0.5, 0.6], atol=1e-6)
+    np.testing.assert_array_equal(series["zone_counts"][3:], [[0, 0], [1, 1]])
+    
+    assert merged.frame_count == 5
+    assert merged.total_people_detected == 8
+    assert merged.max_people_in_frame == 3
+    np.testing.assert_array_equal(merged.zone_totals, [4, 4])
+    np.testing.assert_array_equal(merged.zone_max, [2, 2])
+
+
+def test_merge_skips_empty_segments():
+    merged = StatisticsTracker.merge([_tracker([]), _tracker([4, 1])])
+    
+    np.testing.assert_array_equal(merged.get_frame_series()["frame"], [1, 2])
+    assert merged.max_people_in_frame == 4
+
+
+def test_state_round_trip_continues_series():
+    tracker = _tracker([2, 5, 1], [[1, 1], [3, 2], [0, 1]])
+    tracker.set_parameter("conf", 0.5)
+    
+    restored = StatisticsTracker(zone_names=["a", "b"])
+    restored.set_state(tracker.get_state())
+    restored.update(3, [1, 2])
+    
+    series = restored.get_frame_series()
+    np.testing.assert_array_equal(series["frame"], [1, 2, 3, 4])
+    np.testing.assert_array_equal(series["people_count"], [2, 5, 1, 3])
+    np.testing.assert_array_equal(series["max_people"], [2, 5, 5, 5])
+    np.testing.assert_array_equal(restored.zone_totals, [5, 6])
+    assert restored.total_people_detected == 11
+    assert restored.parameters == {"conf": 0.5}
+
+
+def test_ring_state_keeps_last_frames():
+    tracker = StatisticsTracker(ring_size=3)
+    for count in [1, 2, 3, 4, 5]:
+        tracker.update(count)
+    
+    restored = StatisticsTracker(ring_size=3)
+    restored.set_state(tracker.get_state())
+    restored.update(6)
+    
+    np.testing.assert_array_equal(restored.get_frame_series()["people_count"], [4, 5, 6])
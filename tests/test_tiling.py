@@ -0,0 +1,65 @@
+"""
+Testes da escolha de tiles por keyframe
+"""
+import numpy as np
+from src.core.detections import Detections
+from src.core.tiling import TileScheduler
+
+
+FRAME = np.zeros((100, 260, 3), dtype=np.uint8)
+TILES = [(0, 0, 100, 100), (80, 0, 180, 100), (160, 0, 260, 100)]
+
+
+def _scheduler(**kwargs):
+    parameters = dict(tile_size=100, overlap=0.2, hold_frames=1, revisit_interval=3)
+    parameters.update(kwargs)
+    return TileScheduler(**parameters)
+
+
+def test_grid_covers_frame_with_edge_aligned_tiles():
+    scheduler = _scheduler()
+    
+    assert scheduler.get_tiles(260, 100) == TILES
+    assert scheduler.get_tiles(260, 100, regions=[(0, 0, 50, 50)]) == TILES[:1]
+    assert scheduler.get_tiles(50, 40) == [(0, 0, 50, 40)]
+
+
+def test_without_skip_idle_every_tile_is_selected():
+    scheduler = _scheduler(skip_idle=False)
+    
+    for _ in range(5):
+        assert scheduler.select(FRAME) == TILES
+
+
+def test_static_tiles_are_skipped_until_revisit():
+    scheduler = _scheduler()
+    
+    # Primeiro frame inteiro, um keyframe de espera e depois nada até a revisita
+    selected = [len(scheduler.select(FRAME)) for _ in range(6)]
+    
+    assert selected == [3, 3, 0, 0, 3, 0]
+
+
+def test_motion_and_detections_keep_tiles_active():
+    scheduler = _scheduler(revisit_interval=10)
+    for _ in range(3):
+        scheduler.select(FRAME)
+    
+    moved = FRAME.copy()
+    moved[:, :60] = 255
+    assert scheduler.select(moved) == TILES[:1]
+    
+    # Pessoa parada no último tile: mantido ativo pelas detecções
+    scheduler.update(Detections([[200, 10, 240, 90]], [0.9], [0]), moved.shape)
+    assert scheduler.select(moved) == [TILES[0], TILES[2]]
+
+
+def test_state_round_trip():
+    scheduler = _scheduler()
+    for _ in range(3):
+        scheduler.select(FRAME)
+    
+    restored = _scheduler()
+    restored.set_state(scheduler.get_state())
+    
+    assert restored.select(FRAME) == scheduler.select(FRAME) == []
@@ -0,0 +1,56 @@
+"""
+Testes do rastreador de caixas entre keyframes
+"""
+import numpy as np
+from src.core.detections import Detections
+from src.core.tracker import BoxTracker
+
+
+def test_predict_extrapolates_measured_velocity():
+    tracker = BoxTracker(smoothing=1.0)
+    tracker.update(Detections([[0, 0, 10, 10]], [0.9], [0]))
+    
+    # Segundo keyframe dois frames depois: deslocamento de 4 px = 2 px por frame
+    tracker.predict()
+    tracker.predict()
+    tracker.update(Detections([[4, 0, 14, 10]], [0.8], [0]))
+    
+    predicted = tracker.predict()
+    np.testing.assert_allclose(predicted.xyxy, [[6, 0, 16, 10]])
+    np.testing.assert_allclose(predicted.conf, [0.8])
+
+
+def test_unmatched_detection_starts_without_velocity():
+    tracker = BoxTracker()
+    tracker.update(Detections([[0, 0, 10, 10]], [0.9], [0]))
+    tracker.update(Detections([[100, 100, 110, 110]], [0.9], [0]))
+    
+    np.testing.assert_allclose(tracker.predict().xyxy, [[100, 100, 110, 110]])
+
+
+def test_predict_clips_and_drops_tracks_outside_frame():
+    tracker = BoxTracker(smoothing=1.0)
+    tracker.frame_size = (50, 50)
+    tracker.update(Detections([[0, 0, 10, 10], [30, 0, 40, 10]], [0.9, 0.8], [0, 0]))
+    tracker.predict()
+    tracker.update(Detections([[-5, 0, 5, 10], [34, 0, 44, 10]], [0.9, 0.8], [0, 0]))
+    
+    # A primeira trilha sai pela esquerda; a segunda é cortada na borda direita
+    tracker.predict()
+    predicted = tracker.predict()
+    np.testing.assert_allclose(predicted.xyxy, [[42, 0, 50, 10]])
+    np.testing.assert_allclose(predicted.conf, [0.8])
+
+
+def test_state_round_trip():
+    tracker = BoxTracker(smoothing=1.0)
+    tracker.update(Detections([[0, 0, 10, 10]], [0.9], [0]))
+    tracker.predict()
+    tracker.update(Detections([[2, 0, 12, 10]], [0.9], [0]))
+    tracker.predict()
+    
+    restored = BoxTracker(smoothing=1.0)
+    restored.set_state(tracker.get_state())
+    
+    np.testing.assert_allclose(restored.predict().xyxy, tracker.predict().xyxy)
+    assert restored.initialized
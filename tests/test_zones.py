@@ -0,0 +1,53 @@
+"""
+Testes das zonas de interesse
+"""
+import numpy as np
+import pytest
+from src.core.detections import Detections
+from src.core.zones import ZoneSet
+
+
+def _zones():
+    return ZoneSet([
+        {"name": "esquerda", "polygon": [[0, 0], [0.5, 0], [0.5, 1], [0, 1]]},
+        {"name": "centro", "polygon": [[0.25, 0], [0.75, 0], [0.75, 1], [0.25, 1]]}
+    ], margin=0)
+
+
+def test_filter_and_count_by_box_center():
+    detections = Detections(
+        [[10, 10, 30, 30], [70, 10, 90, 30], [170, 10, 190, 30], [130, 10, 150, 30]],
+        [0.9, 0.8, 0.7, 0.6],
+        [0, 0, 0, 0]
+    )
+    
+    filtered, counts = _zones().filter_and_count(detections, 200, 100)
+    
+    # Centros em x = 20 (esquerda), 80 (ambas), 180 (nenhuma) e 140 (centro)
+    np.testing.assert_allclose(filtered.xyxy[:, 0], [10, 70, 130])
+    np.testing.assert_allclose(filtered.conf, [0.9, 0.8, 0.6])
+    assert counts == [2, 2]
+
+
+def test_filter_and_count_without_detections():
+    filtered, counts = _zones().filter_and_count(Detections(), 200, 100)
+    
+    assert len(filtered) == 0
+    assert counts == [0, 0]
+
+
+def test_overlapping_regions_are_merged():
+    zones = _zones()
+    
+    assert zones.get_regions(200, 100) == [(0, 0, 150, 100)]
+    assert zones.get_area_ratio(200, 100) == 0.75
+
+
+def test_from_config_and_validation():
+    assert ZoneSet.from_config({"zones": {"enabled": False, "regions": [{"polygon": [[0, 0], [1, 0], [1, 1]]}]}}) is None
+    
+    zones = ZoneSet.from_config({"zones": {"enabled": True, "regions": [{"polygon": [[0, 0], [1, 0], [1, 1]]}]}})
+    assert zones.names == ["zona_1"]
+    
+    with pytest.raises(ValueError):
+        ZoneSet([{"name": "linha", "polygon": [[0, 0], [1, 1]]}])